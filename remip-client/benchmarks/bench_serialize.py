@@ -0,0 +1,73 @@
+"""
+Benchmark for serializing PuLP problems into request bodies.
+
+Builds random PuLP problems of increasing size and reports the time to produce
+the request body:
+
+- `toDict`: `json.dumps(lp.toDict())`, the JSON document sent before;
+- `csr`: the columnar CSR JSON body written by `ProblemSerializer` from scratch;
+- `cached`: the same problem again, with the serializer's cache;
+- `changed`: the same problem again after changing the right-hand side of 1% of
+  its constraints, so only the blocks of values that changed are re-encoded.
+
+Run from the `remip-client` directory:
+
+    uv run python benchmarks/bench_serialize.py --sizes 10000 100000 --nnz-per-row 10
+"""
+
+import argparse
+import json
+import random
+
+from bench_upload import best_time, generate_problem
+
+from remip_client.serializer import ProblemSerializer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--nnz-per-row", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'vars':>8} {'nnz':>10} {'toDict [s]':>11} {'csr [s]':>8} {'cached [s]':>11}"
+        f" {'changed [s]':>12} {'json [MB]':>10} {'csr [MB]':>9}"
+    )
+    for size in args.sizes:
+        lp = generate_problem(size, args.nnz_per_row)
+        body = json.dumps(lp.toDict()).encode("utf-8")
+        to_dict = best_time(
+            lambda lp=lp: json.dumps(lp.toDict()).encode("utf-8"), args.repeat
+        )
+        csr = best_time(
+            lambda lp=lp: ProblemSerializer(cache=False).serialize(lp), args.repeat
+        )
+
+        serializer = ProblemSerializer()
+        csr_body = serializer.serialize(lp)
+        cached = best_time(lambda s=serializer, lp=lp: s.serialize(lp), args.repeat)
+
+        rng = random.Random(0)
+        constraints = list(lp._constraints.values())
+
+        def change_and_serialize(
+            rng=rng, constraints=constraints, serializer=serializer, lp=lp
+        ):
+            for constraint in rng.sample(constraints, len(constraints) // 100):
+                constraint.constant = -rng.uniform(1, args.nnz_per_row)
+            serializer.serialize(lp)
+
+        changed = best_time(change_and_serialize, args.repeat)
+        print(
+            f"{size:>8} {size * args.nnz_per_row:>10} {to_dict:>11.2f} {csr:>8.2f}"
+            f" {cached:>11.2f} {changed:>12.2f} {len(body) / 1e6:>10.1f}"
+            f" {len(csr_body) / 1e6:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark for solving batches of problems.
+
+Solves a batch of random PuLP problems against a running server one after the
+other with `lp.solve(solver)`, then with `solver.solve_many` and
+`solver.solve_many_async` for each of the given concurrencies, and reports the
+wall-clock time of each run. Run from the `remip-client` directory, with a server
+started e.g. with `uv run remip --solver-workers 0` in `remip/`:
+
+    uv run python benchmarks/bench_solve_many.py --url http://localhost:8000 --problems 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from bench_upload import generate_problem
+
+from remip_client.solver import ReMIPSolver
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--problems", type=int, default=200)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[2, 4, 8, 16])
+    args = parser.parse_args()
+
+    problems = [generate_problem(args.size, seed=i) for i in range(args.problems)]
+    solver = ReMIPSolver(url=args.url, msg=False)
+
+    start = time.perf_counter()
+    for lp in problems:
+        lp.solve(solver)
+    serial = time.perf_counter() - start
+    print(f"{'run':>22} {'time [s]':>9} {'problems/s':>11} {'errors':>7}")
+    print(f"{'serial':>22} {serial:>9.2f} {args.problems / serial:>11.1f} {'':>7}")
+
+    for concurrency in args.concurrency:
+        runs = [
+            ("solve_many", lambda c=concurrency: solver.solve_many(problems, c)),
+            (
+                "solve_many_async",
+                lambda c=concurrency: asyncio.run(solver.solve_many_async(problems, c)),
+            ),
+        ]
+        for name, run in runs:
+            start = time.perf_counter()
+            results = run()
+            seconds = time.perf_counter() - start
+            errors = sum(result.error is not None for result in results)
+            label = f"{name} x{concurrency}"
+            print(
+                f"{label:>22} {seconds:>9.2f} {args.problems / seconds:>11.1f}"
+                f" {errors:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark for decoding SSE progress streams.
+
+Builds a stream of log and metric events ending with a result, as the server
+sends it, and reports:
+
+- the time to handle the stream's lines as `ReMIPSolver` did before (every
+  `data:` line JSON-decoded) and through the shared SSE decoder, which skips the
+  events nobody listens to;
+- the time to split the stream into lines as `PyodideResponse.iter_lines` did
+  before (`buffer += ...` / `split("\\n", 1)`) and with the shared `LineSplitter`,
+  for chunks of each of the given sizes.
+
+Run from the `remip-client` directory:
+
+    uv run python benchmarks/bench_sse.py --events 100000
+"""
+
+import argparse
+import json
+import time
+
+from pulp import LpMinimize, LpProblem, LpVariable
+
+from remip_client.solver import ReMIPSolver
+from remip_client.sse import iter_lines, iter_messages
+
+
+def generate_stream(num_events: int, num_vars: int = 1000) -> bytes:
+    """Returns an SSE stream of log events with a metric event every 20, then the result."""
+    events = []
+    for i in range(num_events - 1):
+        if i % 20:
+            event = {
+                "type": "log",
+                "timestamp": "2025-01-01T00:00:00+00:00",
+                "level": "info",
+                "stage": "solving",
+                "message": f"  {i:>6}s|  1234 |  5678 | 12.3 | 1.000e+00 | 1.234e+00 | 23.45%",
+                "sequence": i,
+            }
+        else:
+            event = {
+                "type": "metric",
+                "timestamp": "2025-01-01T00:00:00+00:00",
+                "objective_value": 1.0,
+                "gap": 0.2345,
+                "iteration": i * 10,
+                "sequence": i,
+                "dual_bound": 0.9,
+                "nodes": i,
+                "elapsed_seconds": i / 100,
+                "trigger": "progress",
+            }
+        events.append(event)
+    solution = {
+        "name": "bench",
+        "status": "optimal",
+        "objective_value": 1.0,
+        "variables": {f"x_{j}": 1.0 for j in range(num_vars)},
+    }
+    events.append({"type": "result", "solution": solution, "sequence": num_events})
+    return "".join(
+        f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events
+    ).encode()
+
+
+def handle_lines_before(lines) -> dict | None:
+    """The per-line handling `ReMIPSolver` used before the shared decoder."""
+    solution = None
+    for line in lines:
+        if line:
+            try:
+                data = json.loads(line.decode("utf-8").split("data: ")[1])
+            except (json.JSONDecodeError, IndexError):
+                continue
+            solution = data.get("solution") or solution
+    return solution
+
+
+def handle_lines_after(solver: ReMIPSolver, lp: LpProblem, lines) -> dict | None:
+    solution = None
+    for event, data in iter_messages(lines):
+        solution = solver._handle_message(lp, event, data) or solution
+    return solution
+
+
+def split_lines_before(chunks) -> list[bytes]:
+    """The line splitting `PyodideResponse.iter_lines` used before `LineSplitter`."""
+    lines = []
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk.decode("utf-8")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            lines.append(line.encode("utf-8"))
+    if buffer:
+        lines.append(buffer.encode("utf-8"))
+    return lines
+
+
+def best_time(run, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument(
+        "--chunk-sizes", type=int, nargs="+", default=[4 * 1024, 64 * 1024, 256 * 1024]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stream = generate_stream(args.events)
+    lines = stream.split(b"\n")
+    lp = LpProblem("bench", LpMinimize)
+    lp += LpVariable("x_0")
+    solver = ReMIPSolver(env="cpython", stream=True)
+    assert handle_lines_before(lines) == handle_lines_after(solver, lp, lines)
+
+    print(f"{args.events} events, {len(stream) / 1e6:.1f} MB")
+    print()
+    print(f"{'handling':>28} {'time [ms]':>10} {'us/event':>9}")
+    solver_with_metrics = ReMIPSolver(env="cpython", on_metric=lambda event: None)
+    runs = [
+        ("per-line json.loads", lambda: handle_lines_before(lines)),
+        ("SSE decoder", lambda: handle_lines_after(solver, lp, lines)),
+        (
+            "SSE decoder, on_metric",
+            lambda: handle_lines_after(solver_with_metrics, lp, lines),
+        ),
+    ]
+    for name, run in runs:
+        seconds = best_time(run, args.repeat)
+        print(f"{name:>28} {seconds * 1e3:>10.1f} {seconds * 1e6 / args.events:>9.2f}")
+
+    print()
+    print(f"{'chunk [KiB]':>12} {'before [ms]':>12} {'LineSplitter [ms]':>18}")
+    for chunk_size in args.chunk_sizes:
+        chunks = [stream[i : i + chunk_size] for i in range(0, len(stream), chunk_size)]
+        assert split_lines_before(chunks) == list(iter_lines(chunks))
+        before = best_time(
+            lambda chunks=chunks: split_lines_before(chunks), args.repeat
+        )
+        after = best_time(lambda chunks=chunks: list(iter_lines(chunks)), args.repeat)
+        print(f"{chunk_size // 1024:>12} {before * 1e3:>12.1f} {after * 1e3:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
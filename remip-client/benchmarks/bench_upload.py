@@ -0,0 +1,106 @@
+"""
+Benchmark for compressed problem uploads.
+
+Builds random PuLP problems of increasing size and reports the size of their
+`lp.toDict()` JSON body, uncompressed and gzipped as the client sends it, with
+the time spent serializing and compressing, and the upload time over a link of
+the given bandwidth. Run from the `remip-client` directory:
+
+    uv run python benchmarks/bench_upload.py --bandwidth 50
+
+With `--url`, each problem is also solved by a running server with and without
+compression, and the measured wall-clock latency is reported.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from pulp import LpMinimize, LpProblem, LpVariable, lpSum
+
+from remip_client.encoding import compress_body
+from remip_client.solver import ReMIPSolver
+
+
+def generate_problem(size: int, nnz_per_row: int = 5, seed: int = 0) -> LpProblem:
+    """Generates a random sparse LP with `size` variables and constraints."""
+    rng = random.Random(seed)
+    lp = LpProblem(f"bench_{size}", LpMinimize)
+    x = [LpVariable(f"x_{j}", 0, 1) for j in range(size)]
+    lp += lpSum(rng.uniform(-1, 1) * v for v in x)
+    for i in range(size):
+        lp += (
+            lpSum(
+                rng.uniform(1, 10) * x[j] for j in rng.sample(range(size), nnz_per_row)
+            )
+            <= nnz_per_row,
+            f"c_{i}",
+        )
+    return lp
+
+
+def best_time(run, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def solve_latency(
+    url: str, lp: LpProblem, compress_threshold: int | None, repeat: int
+) -> float:
+    solver = ReMIPSolver(url=url, compress_threshold=compress_threshold, msg=False)
+    return best_time(lambda: lp.solve(solver), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument(
+        "--bandwidth", type=float, default=50.0, help="Link bandwidth in Mbit/s"
+    )
+    parser.add_argument(
+        "--url", default=None, help="ReMIP server to measure solve latency against"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'vars':>8} {'json [MB]':>10} {'gzip [MB]':>10} {'dump [ms]':>10} {'gzip [ms]':>10}"
+        f" {'upload [ms]':>12} {'gzipped [ms]':>13}"
+    )
+    for size in args.sizes:
+        lp = generate_problem(size)
+        body = json.dumps(lp.toDict()).encode("utf-8")
+        compressed, _ = compress_body(body, threshold=0)
+        dump_s = best_time(
+            lambda lp=lp: json.dumps(lp.toDict()).encode("utf-8"), args.repeat
+        )
+        gzip_s = best_time(
+            lambda body=body: compress_body(body, threshold=0), args.repeat
+        )
+        bits_per_second = args.bandwidth * 1e6 / 8
+        upload = len(body) / bits_per_second
+        gzipped = gzip_s + len(compressed) / bits_per_second
+        print(
+            f"{size:>8} {len(body) / 1e6:>10.2f} {len(compressed) / 1e6:>10.2f} {dump_s * 1e3:>10.1f}"
+            f" {gzip_s * 1e3:>10.1f} {upload * 1e3:>12.1f} {gzipped * 1e3:>13.1f}"
+        )
+
+    if args.url:
+        print()
+        print(f"{'vars':>8} {'plain solve [ms]':>17} {'gzipped solve [ms]':>19}")
+        for size in args.sizes:
+            lp = generate_problem(size)
+            plain = solve_latency(args.url, lp, None, args.repeat)
+            gzipped = solve_latency(args.url, lp, 0, args.repeat)
+            print(f"{size:>8} {plain * 1e3:>17.1f} {gzipped * 1e3:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import gzip
+import json
+import math
+import sys
+from array import array
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Request bodies from this size on are gzipped; below it, compressing saves little time
+COMPRESS_THRESHOLD = 64 * 1024
+
+# `array` typecodes of the dtypes the server sends
+TYPECODES = {"float64": "d", "int8": "b", "int16": "h", "int32": "i", "int64": "q"}
+
+# Columns of the compact layout, by the table of names they follow
+COLUMNS = {
+    "variable_names": ("variables", "reduced_costs"),
+    "constraint_names": ("slacks", "duals"),
+}
+
+
+def compress_body(body: bytes, threshold: int | None) -> tuple[bytes, dict]:
+    """
+    Gzips a request body of at least `threshold` bytes (never if it is None).
+
+    Returns the body with the headers to send along. gzip is used rather than zstd
+    because every server can decode it; level 1 is nearly as small as higher levels
+    for problem JSON at a fraction of the time.
+    """
+    if threshold is None or len(body) < threshold:
+        return body, {}
+    return gzip.compress(body, compresslevel=1, mtime=0), {"Content-Encoding": "gzip"}
+
+
+def solution_accept_header() -> str | None:
+    """Returns the Accept header asking for the most compact solution encoding installed."""
+    try:
+        import msgpack  # noqa: F401
+
+        return f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.5"
+    except ImportError:
+        pass
+    try:
+        import pyarrow  # noqa: F401
+
+        return f"{ARROW_MEDIA_TYPE}, application/json;q=0.5"
+    except ImportError:
+        return None
+
+
+def decode_body(content: bytes, content_type: str | None):
+    """Decodes a JSON, msgpack or Arrow response body."""
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in (MSGPACK_MEDIA_TYPE, "application/x-msgpack"):
+        import msgpack
+
+        return msgpack.unpackb(content)
+    if media_type == ARROW_MEDIA_TYPE:
+        import pyarrow as pa
+
+        table = pa.ipc.open_stream(content).read_all()
+        document = json.loads(table.schema.metadata[b"remip.solution"])
+        for name in table.column_names:
+            column = table.column(name)[0]
+            document[name] = column.values.to_pylist() if column.is_valid else None
+        return document
+    return json.loads(content)
+
+
+def _values(column) -> list | None:
+    if column is None or isinstance(column, list):
+        return column
+    values = array(TYPECODES[column["dtype"]])
+    values.frombytes(column["data"])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+def expand_solution(solution: dict) -> dict:
+    """
+    Turns a solution in the compact layout of the binary encodings into the usual
+    `{name: value}` dictionaries. Other solutions are returned unchanged.
+    """
+    if "variable_names" not in solution:
+        return solution
+    solution = dict(solution)
+    for names_key, keys in COLUMNS.items():
+        names = solution.pop(names_key) or []
+        for key in keys:
+            values = _values(solution.get(key))
+            if values is not None:
+                # NaN marks a name without a value
+                values = {
+                    name: value
+                    for name, value in zip(names, values)
+                    if not math.isnan(value)
+                }
+            solution[key] = values
+    solution["variables"] = solution["variables"] or {}
+    return solution
@@ -1,5 +1,18 @@
+import hashlib
 import json
+import threading
 from abc import ABC, abstractmethod
+from urllib.parse import urlencode
+
+from .encoding import (
+    COMPRESS_THRESHOLD,
+    compress_body,
+    decode_body,
+    solution_accept_header,
+)
+from .sse import aiter_lines, iter_lines
+
+JSON_MEDIA_TYPE = "application/json"
 
 try:
     import js
@@ -8,11 +21,38 @@ except ImportError:
     pass
 
 
+def _encode(json_data: dict | bytes) -> bytes:
+    return (
+        json_data
+        if isinstance(json_data, bytes)
+        else json.dumps(json_data).encode("utf-8")
+    )
+
+
+def parse_server_timing(header: str | None) -> dict[str, float]:
+    """Returns `{phase: milliseconds}` of a `Server-Timing` header."""
+    timings = {}
+    for entry in (header or "").split(","):
+        name, *params = (part.strip() for part in entry.split(";"))
+        for param in params:
+            key, _, value = param.partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
 class Response(ABC):
     @abstractmethod
     def json(self):
         pass
 
+    def server_timing(self) -> dict[str, float]:
+        """Returns the phase durations of the server's `Server-Timing` header, in milliseconds."""
+        return {}
+
     @abstractmethod
     def iter_lines(self):
         pass
@@ -27,10 +67,17 @@ class RequestsResponse(Response):
         self._response = response
 
     def json(self):
-        return self._response.json()
+        """Returns the decoded body, which may also be a msgpack or Arrow solution."""
+        return decode_body(
+            self._response.content, self._response.headers.get("content-type")
+        )
 
     def iter_lines(self):
-        return self._response.iter_lines()
+        # chunk_size=None yields each chunk as it arrives rather than 512-byte reads
+        return iter_lines(self._response.iter_content(chunk_size=None))
+
+    def server_timing(self) -> dict[str, float]:
+        return parse_server_timing(self._response.headers.get("server-timing"))
 
     def raise_for_status(self):
         return self._response.raise_for_status()
@@ -51,19 +98,37 @@ class ErrorResponse(Response):
 
 
 class HttpClient(ABC):
-    def __init__(self, base_url: str, stream: bool):
+    def __init__(self, base_url: str, stream: bool, incumbents: bool = False):
         self.base_url = base_url
         self.stream = stream
+        self.incumbents = incumbents
 
-    def _build_url(self) -> str:
-        url = f"{self.base_url}/solve"
+    def _build_url(self, path: str = "/solve") -> str:
+        url = f"{self.base_url}{path}"
         if self.stream:
             url += "?stream=sse"
+            if self.incumbents:
+                url += "&incumbents=true"
         return url
 
     @abstractmethod
-    def solve(self, json_data: dict) -> Response:
-        pass
+    def solve(
+        self, json_data: dict | bytes, content_type: str = JSON_MEDIA_TYPE
+    ) -> Response:
+        """Posts a problem to /solve: a JSON document, or a body already encoded as `content_type`."""
+
+    @abstractmethod
+    def solve_file(self, data: bytes, params: dict) -> Response:
+        """Uploads a problem file (e.g. MPS) to the /solve/file endpoint."""
+
+    @abstractmethod
+    def solve_stored(
+        self, body: bytes, content_type: str = JSON_MEDIA_TYPE
+    ) -> Response:
+        """
+        Solves a problem through the server's problem store, addressed by the SHA-256 of
+        its body, which is only uploaded if the server does not have it yet.
+        """
 
     def close(self):
         pass
@@ -72,28 +137,124 @@ class HttpClient(ABC):
 class RequestsHttpClient(HttpClient):
     """HttpClient implementation using the requests library for CPython."""
 
-    def __init__(self, base_url: str, stream: bool):
-        import requests
-
-        self.session = requests.Session()
-        super().__init__(base_url, stream)
+    def __init__(
+        self,
+        base_url: str,
+        stream: bool,
+        incumbents: bool = False,
+        compress_threshold: int | None = COMPRESS_THRESHOLD,
+    ):
+        # Request bodies of at least this many bytes are gzipped (None: never)
+        self.compress_threshold = compress_threshold
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+        super().__init__(base_url, stream, incumbents)
+
+    @property
+    def session(self):
+        """
+        The calling thread's session.
+
+        `requests.Session` is not safe to share between threads, so each thread gets
+        its own, which keeps its connection alive between requests. Solving from N
+        threads thus pools N connections.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = self._local.session = requests.Session()
+            accept = solution_accept_header()
+            if accept:
+                # Large solutions are much cheaper to send in a binary encoding
+                session.headers["Accept"] = accept
+            with self._lock:
+                self._sessions.append(session)
+        return session
 
-    def solve(self, json_data: dict, timeout: float | None) -> Response:
+    def close(self):
+        """Closes the connections of every thread's session."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    def solve(
+        self,
+        json_data: dict | bytes,
+        timeout: float | None,
+        content_type: str = JSON_MEDIA_TYPE,
+    ) -> Response:
         import requests
 
         full_url = self._build_url()
         try:
+            body, headers = compress_body(_encode(json_data), self.compress_threshold)
             response = self.session.post(
                 full_url,
-                json=json_data,
+                data=body,
                 stream=self.stream,
                 params={"timeout": timeout},
+                headers={"Content-Type": content_type, **headers},
             )
             response.raise_for_status()
             return RequestsResponse(response)
         except requests.exceptions.RequestException as e:
-            # TODO: Add more specific error handling
-            print(f"An error occurred: {e}")
+            return ErrorResponse(str(e))
+
+    def solve_file(self, data: bytes, params: dict, timeout: float | None) -> Response:
+        import requests
+
+        full_url = self._build_url("/solve/file")
+        try:
+            body, headers = compress_body(data, self.compress_threshold)
+            response = self.session.post(
+                full_url,
+                data=body,
+                stream=self.stream,
+                params={**params, "timeout": timeout},
+                headers={"Content-Type": "application/octet-stream", **headers},
+            )
+            response.raise_for_status()
+            return RequestsResponse(response)
+        except requests.exceptions.RequestException as e:
+            return ErrorResponse(str(e))
+
+    def solve_stored(
+        self, body: bytes, timeout: float | None, content_type: str = JSON_MEDIA_TYPE
+    ) -> Response:
+        import requests
+
+        url = f"{self.base_url}/problems/{hashlib.sha256(body).hexdigest()}"
+        try:
+            stored = self.session.head(url).status_code == 200
+            for retry in (False, True):
+                if not stored:
+                    data, headers = compress_body(body, self.compress_threshold)
+                    response = self.session.put(
+                        url,
+                        data=data,
+                        headers={"Content-Type": content_type, **headers},
+                    )
+                    if response.status_code == 501:
+                        # The server runs without a problem store
+                        return self.solve(body, timeout, content_type)
+                    response.raise_for_status()
+
+                response = self.session.post(
+                    self._build_url(url[len(self.base_url) :] + "/solve"),
+                    stream=self.stream,
+                    params={"timeout": timeout},
+                )
+                if response.status_code == 404 and not retry:
+                    # Evicted since it was checked, so it is uploaded again
+                    stored = False
+                    continue
+                response.raise_for_status()
+                return RequestsResponse(response)
+        except requests.exceptions.RequestException as e:
             return ErrorResponse(str(e))
 
 
@@ -111,28 +272,28 @@ class PyodideResponse:
         if not self._js_response.body:
             yield b""
             return
+        async for line in aiter_lines(self._iter_chunks()):
+            yield line
+
+    async def _iter_chunks(self):
         # Based on https://pyodide.org/en/stable/usage/api/python-api/http.html#pyodide.http.pyfetch
         reader = self._js_response.body.getReader()
-        decoder = js.TextDecoder.new()
-        buffer = ""
-
         while True:
             chunk = await reader.read()
             # Handle both JS objects with .done attribute and Python dicts
             done = chunk.done if hasattr(chunk, "done") else chunk.get("done", False)
             if done:
-                if buffer:
-                    yield buffer.encode("utf-8")
                 break
 
             # Handle both JS objects with .value attribute and Python dicts
             value = chunk.value if hasattr(chunk, "value") else chunk.get("value")
             if value:
-                buffer += decoder.decode(value)
+                # Lines are split as bytes, so a character split across chunks stays whole
+                yield value.to_bytes() if hasattr(value, "to_bytes") else bytes(value)
 
-            while "\n" in buffer:
-                line, buffer = buffer.split("\n", 1)
-                yield line.encode("utf-8")
+    def server_timing(self) -> dict[str, float]:
+        headers = getattr(self._js_response, "headers", None)
+        return parse_server_timing(headers.get("Server-Timing") if headers else None)
 
     def raise_for_status(self):
         # The check is done in the client, so this can pass
@@ -140,11 +301,19 @@ class PyodideResponse:
 
 
 class PyodideHttpClient(HttpClient):
-    async def solve(self, json_data: dict, timeout: float | None = None) -> Response:
-        return await self._post_async(json_data, timeout)
+    async def solve(
+        self,
+        json_data: dict | bytes,
+        timeout: float | None = None,
+        content_type: str = JSON_MEDIA_TYPE,
+    ) -> Response:
+        return await self._post_async(json_data, timeout, content_type)
 
     async def _post_async(
-        self, json_data: dict, timeout: float | None = None
+        self,
+        json_data: dict | bytes,
+        timeout: float | None = None,
+        content_type: str = JSON_MEDIA_TYPE,
     ) -> Response:
         full_url = self._build_url()
 
@@ -156,10 +325,10 @@ class PyodideHttpClient(HttpClient):
             fetch_func = js.fetch
 
         headers = js.Headers.new()
-        headers.append("Content-Type", "application/json")
+        headers.append("Content-Type", content_type)
         kwargs = {
             "method": "POST",
-            "body": json.dumps(json_data),
+            "body": _encode(json_data).decode("utf-8"),
             "headers": headers,
         }
         response = await fetch_func(full_url, **kwargs)
@@ -168,3 +337,79 @@ class PyodideHttpClient(HttpClient):
             raise IOError(f"HTTP Error: {response.status} {response.statusText}")
 
         return PyodideResponse(response)
+
+    async def solve_stored(
+        self,
+        body: bytes,
+        timeout: float | None = None,
+        content_type: str = JSON_MEDIA_TYPE,
+    ) -> Response:
+        try:
+            from js import solverMockFetch
+
+            fetch_func = solverMockFetch
+        except ImportError:
+            fetch_func = js.fetch
+
+        path = f"/problems/{hashlib.sha256(body).hexdigest()}"
+        response = await fetch_func(f"{self.base_url}{path}", method="HEAD")
+        stored = response.ok
+        for retry in (False, True):
+            if not stored:
+                headers = js.Headers.new()
+                headers.append("Content-Type", content_type)
+                response = await fetch_func(
+                    f"{self.base_url}{path}",
+                    method="PUT",
+                    body=body.decode("utf-8"),
+                    headers=headers,
+                )
+                if response.status == 501:
+                    # The server runs without a problem store
+                    return await self.solve(body, timeout, content_type)
+                if not response.ok:
+                    raise OSError(
+                        f"HTTP Error: {response.status} {response.statusText}"
+                    )
+
+            url = self._build_url(f"{path}/solve")
+            if timeout is not None:
+                url += ("&" if "?" in url else "?") + urlencode({"timeout": timeout})
+            response = await fetch_func(url, method="POST")
+            if response.status == 404 and not retry:
+                # Evicted since it was checked, so it is uploaded again
+                stored = False
+                continue
+            if not response.ok:
+                raise OSError(f"HTTP Error: {response.status} {response.statusText}")
+            return PyodideResponse(response)
+
+    async def solve_file(
+        self, data: bytes, params: dict, timeout: float | None = None
+    ) -> Response:
+        query = {**params}
+        if timeout is not None:
+            query["timeout"] = timeout
+        full_url = self._build_url("/solve/file")
+        full_url += ("&" if "?" in full_url else "?") + urlencode(query)
+
+        try:
+            from js import solverMockFetch
+
+            fetch_func = solverMockFetch
+        except ImportError:
+            fetch_func = js.fetch
+
+        headers = js.Headers.new()
+        headers.append("Content-Type", "application/octet-stream")
+        kwargs = {
+            "method": "POST",
+            "body": data.decode("utf-8"),
+            "headers": headers,
+        }
+        response = await fetch_func(full_url, **kwargs)
+
+        if not response.ok:
+            raise OSError(f"HTTP Error: {response.status} {response.statusText}")
+
+        return PyodideResponse(response)
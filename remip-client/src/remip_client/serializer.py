@@ -0,0 +1,194 @@
+import json
+import weakref
+from array import array
+from itertools import accumulate, chain
+
+from pulp import LpProblem
+
+CSR_JSON_MEDIA_TYPE = "application/vnd.remip.csr+json"
+
+# Values per cached block: a changed coefficient re-encodes only its block
+BLOCK_SIZE = 4096
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+# Top-level arrays of the body; the CSR matrix is nested under "matrix"
+ARRAYS = (
+    "variable_names",
+    "categories",
+    "lower_bounds",
+    "upper_bounds",
+    "objective",
+    "constraint_names",
+    "senses",
+    "rhs",
+)
+
+
+def _constraints(lp: LpProblem) -> dict:
+    # PuLP 3.x keeps the mapping in `_constraints` and deprecates `lp.constraints` as a dict
+    constraints = getattr(lp, "_constraints", None)
+    return lp.constraints if constraints is None else constraints
+
+
+class _Column:
+    """The JSON encoding of one column, kept in blocks so that unchanged blocks are reused."""
+
+    def __init__(self):
+        self.values = None
+        self.blocks: list[bytes] = []
+        self.encoded = b"[]"
+
+    def encode(self, values) -> bytes:
+        if self.values is not None and len(values) == len(self.values):
+            if values == self.values:
+                return self.encoded
+            blocks = self.blocks
+            for k, start in enumerate(range(0, len(values), BLOCK_SIZE)):
+                block = values[start : start + BLOCK_SIZE]
+                if block != self.values[start : start + BLOCK_SIZE]:
+                    blocks[k] = _dumps(_as_list(block))[1:-1].encode("utf-8")
+        else:
+            blocks = [
+                _dumps(_as_list(values[start : start + BLOCK_SIZE]))[1:-1].encode(
+                    "utf-8"
+                )
+                for start in range(0, len(values), BLOCK_SIZE)
+            ]
+        self.values, self.blocks = values, blocks
+        self.encoded = b"[" + b",".join(blocks) + b"]"
+        return self.encoded
+
+
+def _as_list(values) -> list:
+    return values.tolist() if isinstance(values, array) else values
+
+
+class ProblemSerializer:
+    """
+    Writes an LpProblem straight into the server's columnar CSR JSON body
+    (`application/vnd.remip.csr+json`), without building `lp.toDict()`.
+
+    With `cache`, the variable index and the encoding of every column are kept for
+    the last problem serialized. Solving the same problem again then walks its
+    constraints once more but only re-encodes the blocks of values that changed, so
+    e.g. a new right-hand side or a handful of changed coefficients cost little.
+    """
+
+    def __init__(self, cache: bool = True):
+        self.cache = cache
+        self._reset(None)
+
+    def _reset(self, lp: LpProblem | None):
+        self._problem = weakref.ref(lp) if lp is not None else None
+        self._variables: list = []
+        self._index: dict[int, int] = {}
+        self._ids = self._indices = array("q")
+        self._columns: dict[str, _Column] = {}
+
+    def _index_variables(self, lp: LpProblem):
+        # The variables are kept referenced, so their ids stay unique while cached
+        self._variables = list(lp.variables())
+        self._index = {id(var): j for j, var in enumerate(self._variables)}
+        self._ids = self._indices = array("q")
+
+    def _arrays(self, lp: LpProblem) -> dict:
+        """Walks the problem once and returns its columns, or raises KeyError on an unknown variable."""
+        position = self._index.__getitem__
+        constraints = _constraints(lp)
+        # PuLP 3.x wraps the expression in `expr`; older versions subclass it
+        expressions = [getattr(c, "expr", c) for c in constraints.values()]
+
+        indptr = array("q", accumulate(map(len, expressions), initial=0))
+        # Comparing the variables' ids with the last solve's is much cheaper than
+        # looking every one of them up when the sparsity pattern did not change
+        ids = array("q", map(id, chain.from_iterable(expressions)))
+        if ids == self._ids:
+            indices = self._indices
+        else:
+            indices = array("q", map(position, ids))
+            self._ids, self._indices = ids, indices
+        data = array("d", chain.from_iterable(map(dict.values, expressions)))
+
+        objective = array("d", bytes(8 * len(self._variables)))
+        for var, coefficient in (lp.objective or {}).items():
+            objective[position(id(var))] = coefficient
+
+        values = constraints.values()
+        return {
+            "variable_names": [var.name for var in self._variables],
+            "categories": [var.cat for var in self._variables],
+            "lower_bounds": [var.lowBound for var in self._variables],
+            "upper_bounds": [var.upBound for var in self._variables],
+            "objective": objective,
+            "constraint_names": [c.name for c in values],
+            "senses": [c.sense for c in values],
+            "rhs": array("d", [-c.constant for c in values]),
+            "indptr": indptr,
+            "indices": indices,
+            "data": data,
+        }
+
+    def serialize(
+        self,
+        lp: LpProblem,
+        warm_start: bool = False,
+        objective_cutoff: float | None = None,
+    ) -> bytes:
+        """Returns the request body for `lp`, reusing the cached encoding where it is unchanged."""
+        if not self.cache or self._problem is None or self._problem() is not lp:
+            self._reset(lp)
+        variables = getattr(lp, "_variables", None)
+        if not self._index or (
+            variables is not None and len(variables) != len(self._variables)
+        ):
+            self._index_variables(lp)
+        try:
+            arrays = self._arrays(lp)
+        except KeyError:
+            # A variable was added since the last solve
+            self._index_variables(lp)
+            arrays = self._arrays(lp)
+
+        columns = self._columns
+        encoded = {}
+        for name, values in arrays.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = _Column()
+            encoded[name] = column.encode(values)
+
+        def sos(constraints: dict) -> list:
+            return [
+                {getattr(var, "name", var): weight for var, weight in weights.items()}
+                for weights in constraints.values()
+            ]
+
+        meta = {
+            # The outcome of a previous solve is left out, so the body of a problem
+            # (and its hash in the server's problem store) stays the same across solves
+            "parameters": {
+                "name": lp.name,
+                "sense": lp.sense,
+                "status": 0,
+                "sol_status": 0,
+            },
+            "sos1": sos(lp.sos1),
+            "sos2": sos(lp.sos2),
+            "objective_cutoff": objective_cutoff,
+        }
+        if warm_start:
+            initial_values = [var.varValue for var in self._variables]
+            if any(value is not None for value in initial_values):
+                meta["initial_values"] = initial_values
+
+        parts = [_dumps(meta)[:-1].encode("utf-8")]
+        for name in ARRAYS:
+            parts.append(b',"%s":%s' % (name.encode(), encoded[name]))
+        parts.append(
+            b',"matrix":{"indptr":%s,"indices":%s,"data":%s}}'
+            % (encoded["indptr"], encoded["indices"], encoded["data"])
+        )
+        if not self.cache:
+            self._reset(None)
+        return b"".join(parts)
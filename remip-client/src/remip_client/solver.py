@@ -1,7 +1,26 @@
-import json
+import asyncio
+import copy
+import os
+import tempfile
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
 from pulp import LpProblem, constants
 from pulp.apis import LpSolver
+from .encoding import COMPRESS_THRESHOLD, expand_solution
 from .environment import get_environment
+from .http_client import JSON_MEDIA_TYPE, _encode
+from .serializer import CSR_JSON_MEDIA_TYPE, ProblemSerializer
+from .sse import (
+    LogEvent,
+    MetricEvent,
+    ResultEvent,
+    aiter_messages,
+    decode_event,
+    iter_messages,
+    parse_data,
+)
 
 ENV = get_environment()
 
@@ -20,10 +39,52 @@ class AtributeDict(dict):
         return self[name]
 
 
+@dataclass
+class SolveResult:
+    """The outcome of one problem of `ReMIPSolver.solve_many`."""
+
+    problem: LpProblem
+    status: int
+    solution: dict | None = None
+    error: Exception | None = None
+
+
 class ReMIPSolver(BaseSolver):
     """
     A PuLP solver that sends problems to a remote ReMIP server.
     It uses the standard PuLP API in CPython, but a custom async API in Pyodide.
+
+    By default (`upload_format="csr"`), problems are written straight into the
+    server's columnar CSR JSON body by a `ProblemSerializer`. With `cache_problem`, it
+    keeps the encoding of the last problem, so solving it again only re-encodes what
+    changed. `upload_format="json"` sends the `lp.toDict()` document instead, and
+    `upload_format="mps"` writes the problem with `LpProblem.writeMPS` and uploads it
+    to the server's `/solve/file` endpoint.
+
+    As with PuLP's own solvers, `warmStart=True` starts the solve from the current
+    variable values. The values travel in the CSR and JSON bodies, also through the
+    problem store, but not in MPS uploads. `objective_cutoff` restricts the search to
+    solutions strictly better than the given objective value.
+
+    `on_incumbent(objective_value, values)` is called with every improving solution
+    while the server keeps solving (this implies streaming). `values` is the full
+    incumbent, `{variable name: value}`, which is also kept in `self.incumbent`. It is
+    updated in place from the server's deltas, so copy it to keep a snapshot.
+
+    `on_log`, `on_metric` and `on_result` are called with the stream's `LogEvent`s,
+    `MetricEvent`s and `ResultEvent` (from `remip_client.sse`); setting any of them
+    also implies streaming. Events nobody listens to are skipped without decoding.
+
+    With `problem_store`, the body is addressed by its SHA-256 on the server and only
+    uploaded if the server does not have it yet, so re-solving an unchanged model
+    skips both the upload and the server's model build.
+
+    Uploads of at least `compress_threshold` bytes are gzipped (CPython only; None
+    disables it). Responses are compressed whenever the server supports it.
+
+    `solve_many(problems, max_concurrency)` and `await solve_many_async(...)` solve a
+    batch of problems concurrently over a pool of keep-alive connections and return
+    a `SolveResult` per problem, errors included.
     """
 
     def __init__(
@@ -32,28 +93,76 @@ class ReMIPSolver(BaseSolver):
         stream: bool = False,
         timeout: int = 60,
         env=ENV,
+        upload_format: str = "csr",
+        objective_cutoff: float | None = None,
+        on_incumbent: Callable[[float, dict[str, float]], None] | None = None,
+        compress_threshold: int | None = COMPRESS_THRESHOLD,
+        on_log: Callable[[LogEvent], None] | None = None,
+        on_metric: Callable[[MetricEvent], None] | None = None,
+        on_result: Callable[[ResultEvent], None] | None = None,
+        cache_problem: bool = True,
+        problem_store: bool = False,
         **kwargs,
     ):
         if env == "cpython":
             super().__init__(**kwargs)
+        else:
+            self.optionsDict = {k: v for k, v in kwargs.items() if v is not None}
+
+        if upload_format not in ("csr", "json", "mps"):
+            raise ValueError(f"Unsupported upload_format: {upload_format}")
 
         self.env = env
         self.url = url
-        self.stream = stream
+        callbacks = (on_incumbent, on_log, on_metric, on_result)
+        self.stream = stream or any(callback is not None for callback in callbacks)
         self.timeout = timeout
+        self.upload_format = upload_format
+        self.serializer = ProblemSerializer(cache=cache_problem)
+        self.problem_store = problem_store
+        self.objective_cutoff = objective_cutoff
+        self.on_incumbent = on_incumbent
+        self.on_log = on_log
+        self.on_metric = on_metric
+        self.on_result = on_result
         self.solution = None
+        self.incumbent: dict[str, float] | None = None
+
+        self.compress_threshold = compress_threshold
+        self.http_client = self._make_http_client()
 
-        if env in ("pyodide-node", "pyodide-browser"):
+    def _make_http_client(self):
+        incumbents = self.on_incumbent is not None
+        if self.env in ("pyodide-node", "pyodide-browser"):
             from .http_client import PyodideHttpClient
 
-            self.http_client = PyodideHttpClient(base_url=self.url, stream=self.stream)
-        else:
-            from .http_client import RequestsHttpClient
+            return PyodideHttpClient(
+                base_url=self.url, stream=self.stream, incumbents=incumbents
+            )
+        from .http_client import RequestsHttpClient
 
-            self.http_client = RequestsHttpClient(base_url=self.url, stream=self.stream)
+        return RequestsHttpClient(
+            base_url=self.url,
+            stream=self.stream,
+            incumbents=incumbents,
+            compress_threshold=self.compress_threshold,
+        )
 
-    def _parse_solution(self, lp: LpProblem, solution: dict):
-        """Helper function to update the LpProblem with the solution."""
+    def _parse_solution(
+        self, lp: LpProblem, solution: dict, server_timing: dict | None = None
+    ) -> dict:
+        """
+        Helper function to update the LpProblem with the solution.
+
+        Solutions in the compact layout of the binary encodings are expanded first.
+        The phases of the response's `Server-Timing` header are merged into
+        `timings_milliseconds`. Returns the solution with `{name: value}` dictionaries.
+        """
+        solution = expand_solution(solution)
+        if server_timing:
+            # The header also has the time the server took to encode the response
+            timings = {**(solution.get("timings_milliseconds") or {}), **server_timing}
+            solution = {**solution, "timings_milliseconds": timings}
         status_str = solution.get("status", "Not Solved").lower()
         lp.status = STATUS_MAP.get(status_str, constants.LpStatusNotSolved)
         lp.objective.value = solution.get("objective_value")
@@ -73,6 +182,154 @@ class ReMIPSolver(BaseSolver):
                 constraint.pi = duals[name]
             if name in slacks:
                 constraint.slack = slacks[name]
+        return solution
+
+    def _handle_message(self, lp: LpProblem, event: str, data: bytes) -> dict | None:
+        """Handles one SSE message. Returns the solution if the message carries it."""
+        if (
+            (event == "log" and self.on_log is None)
+            or (event == "metric" and self.on_metric is None)
+            or event == "end"
+        ):
+            # Nobody listens, so the JSON is not decoded
+            return None
+        document = parse_data(data)
+        if document is None:
+            # Ignore messages that are not valid SSE JSON
+            return None
+        if event == "message":
+            # Messages without an event field name their type in the document
+            event = document.get("type")
+
+        if event == "incumbent":
+            if self.incumbent is None:
+                # The server sends only the values that changed, starting from all zeros
+                self.incumbent = dict.fromkeys(
+                    (var.name for var in lp.variables()), 0.0
+                )
+            self.incumbent.update(document["variables"])
+            if self.on_incumbent is not None:
+                self.on_incumbent(document["objective_value"], self.incumbent)
+        elif event == "log" and self.on_log is not None:
+            self.on_log(decode_event(LogEvent, document))
+        elif event == "metric" and self.on_metric is not None:
+            self.on_metric(decode_event(MetricEvent, document))
+        elif event == "result":
+            if self.on_result is not None:
+                self.on_result(decode_event(ResultEvent, document))
+            return document.get("solution")
+        return None
+
+    def _problem_dict(self, lp: LpProblem) -> dict:
+        """Returns the JSON document sent to `/solve`."""
+        problem = lp.toDict()
+        if not self.optionsDict.get("warmStart"):
+            # Values left over from a previous solve would otherwise become the starting solution
+            for var in problem["variables"]:
+                var["varValue"] = None
+        if self.objective_cutoff is not None:
+            problem["objective_cutoff"] = self.objective_cutoff
+        return problem
+
+    def _problem_body(self, lp: LpProblem) -> bytes:
+        """Returns the columnar CSR JSON body sent to `/solve`."""
+        return self.serializer.serialize(
+            lp,
+            warm_start=bool(self.optionsDict.get("warmStart")),
+            objective_cutoff=self.objective_cutoff,
+        )
+
+    def _stored_body(self, lp: LpProblem) -> tuple[bytes, str]:
+        """Returns the body stored on the server for `lp`, with its content type."""
+        if self.upload_format == "json":
+            problem = self._problem_dict(lp)
+            # As in the CSR body, the outcome of a previous solve must not change the hash
+            problem["parameters"].update(status=0, sol_status=0)
+            return _encode(problem), JSON_MEDIA_TYPE
+        return self._problem_body(lp), CSR_JSON_MEDIA_TYPE
+
+    def _write_mps(self, lp: LpProblem) -> tuple[bytes, dict]:
+        """Writes the problem as MPS and returns its bytes with the /solve/file parameters."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "problem.mps")
+            lp.writeMPS(path)
+            with open(path, "rb") as f:
+                data = f.read()
+
+        # MPS has no portable objective sense, so it is passed alongside the file.
+        sense = "maximize" if lp.sense == constants.LpMaximize else "minimize"
+        params = {"format": "mps", "name": lp.name, "sense": sense}
+        if self.objective_cutoff is not None:
+            params["objective_cutoff"] = self.objective_cutoff
+        return data, params
+
+    def _solve(self, lp: LpProblem) -> int:
+        """Solves `lp` on the server and updates it with the solution. Raises on errors."""
+        if self.upload_format == "mps":
+            data, params = self._write_mps(lp)
+            response = self.http_client.solve_file(data, params, timeout=self.timeout)
+        elif self.problem_store:
+            body, content_type = self._stored_body(lp)
+            response = self.http_client.solve_stored(
+                body, timeout=self.timeout, content_type=content_type
+            )
+        elif self.upload_format == "json":
+            response = self.http_client.solve(
+                self._problem_dict(lp), timeout=self.timeout
+            )
+        else:
+            response = self.http_client.solve(
+                self._problem_body(lp),
+                timeout=self.timeout,
+                content_type=CSR_JSON_MEDIA_TYPE,
+            )
+
+        if self.stream:
+            solution = None
+            self.incumbent = None
+            for event, data in iter_messages(response.iter_lines()):
+                solution = self._handle_message(lp, event, data) or solution
+        else:
+            solution = response.json()
+
+        solution = self._parse_solution(lp, solution, response.server_timing())
+        self.solution = AtributeDict(solution)
+        return lp.status
+
+    async def _solve_async(self, lp: LpProblem) -> int:
+        """The Pyodide counterpart of `_solve`."""
+        if self.upload_format == "mps":
+            data, params = self._write_mps(lp)
+            response = await self.http_client.solve_file(
+                data, params, timeout=self.timeout
+            )
+        elif self.problem_store:
+            body, content_type = self._stored_body(lp)
+            response = await self.http_client.solve_stored(
+                body, timeout=self.timeout, content_type=content_type
+            )
+        elif self.upload_format == "json":
+            response = await self.http_client.solve(
+                self._problem_dict(lp), timeout=self.timeout
+            )
+        else:
+            response = await self.http_client.solve(
+                self._problem_body(lp),
+                timeout=self.timeout,
+                content_type=CSR_JSON_MEDIA_TYPE,
+            )
+
+        if self.stream:
+            solution = None
+            self.incumbent = None
+            async for event, data in aiter_messages(response.iter_lines()):
+                solution = self._handle_message(lp, event, data) or solution
+        else:
+            solution = await response.json()
+
+        solution = self._parse_solution(lp, solution, response.server_timing())
+        self.solution = AtributeDict(solution)
+        return lp.status
 
     def actualSolve(self, lp: LpProblem) -> int:
         """Standard PuLP entry point for CPython."""
@@ -82,28 +339,7 @@ class ReMIPSolver(BaseSolver):
             )
 
         try:
-            response = self.http_client.solve(lp.toDict(), timeout=self.timeout)
-
-            if self.stream:
-                solution = None
-                for line in response.iter_lines():
-                    if not line:
-                        continue
-                    try:
-                        # SSE format is "data: {JSON_STRING}"
-                        data_str = line.decode("utf-8").split("data: ")[1]
-                        data = json.loads(data_str)
-                        if "solution" in data:
-                            solution = data["solution"]
-                    except (json.JSONDecodeError, IndexError):
-                        # Ignore lines that are not valid SSE JSON
-                        continue
-            else:
-                solution = response.json()
-
-            self.solution = AtributeDict(solution)
-            self._parse_solution(lp, solution)
-            return lp.status
+            return self._solve(lp)
         except Exception:
             lp.status = constants.LpStatusNotSolved
             return lp.status
@@ -116,25 +352,98 @@ class ReMIPSolver(BaseSolver):
             )
 
         try:
-            response = await self.http_client.solve(lp.toDict(), timeout=self.timeout)
-
-            if self.stream:
-                solution = None
-                async for line in response.iter_lines():
-                    if line:
-                        try:
-                            # SSE format is "data: {JSON_STRING}"
-                            data_str = line.decode("utf-8").split("data: ")[1]
-                            solution = json.loads(data_str)["solution"]
-                        except (json.JSONDecodeError, IndexError):
-                            # Ignore lines that are not valid SSE JSON
-                            continue
-            else:
-                solution = await response.json()
-
-            self.solution = AtributeDict(solution)
-            self._parse_solution(lp, solution)
-            return lp.status
+            return await self._solve_async(lp)
         except Exception:
             lp.status = constants.LpStatusNotSolved
             return lp.status
+
+    def _worker(self, http_client) -> "ReMIPSolver":
+        """A copy of this solver with its own per-solve state, for one problem of a batch."""
+        worker = copy.copy(self)
+        worker.http_client = http_client
+        # The cache holds a single problem, so it would only be thrashed by a batch
+        worker.serializer = ProblemSerializer(cache=False)
+        worker.solution = None
+        worker.incumbent = None
+        return worker
+
+    def _run(self, worker: "ReMIPSolver", lp: LpProblem) -> SolveResult:
+        try:
+            status = worker._solve(lp)
+        except Exception as e:  # noqa: BLE001 - reported in the problem's SolveResult
+            lp.status = constants.LpStatusNotSolved
+            return SolveResult(lp, lp.status, error=e)
+        return SolveResult(lp, status, worker.solution)
+
+    def solve_many(
+        self, problems: Iterable[LpProblem], max_concurrency: int = 8
+    ) -> list[SolveResult]:
+        """
+        Solves `problems` concurrently, at most `max_concurrency` at a time (CPython only).
+
+        Each problem is updated with its solution as with `lp.solve(solver)`. Results
+        are returned in the order of `problems`; a problem that could not be solved
+        has status `LpStatusNotSolved` and the exception in `error`, and does not stop
+        the others. Callbacks are called from the worker threads.
+        """
+        if self.env != "cpython":
+            raise NotImplementedError(
+                "solve_many is only for the CPython environment. Use solve_many_async() in Pyodide."
+            )
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        problems = list(problems)
+        http_client = self._make_http_client()
+        try:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                return list(
+                    executor.map(
+                        lambda lp: self._run(self._worker(http_client), lp), problems
+                    )
+                )
+        finally:
+            http_client.close()
+
+    async def solve_many_async(
+        self, problems: Iterable[LpProblem], max_concurrency: int = 8
+    ) -> list[SolveResult]:
+        """
+        The asyncio counterpart of `solve_many`, for CPython and Pyodide.
+
+        In CPython, the requests run on a pool of `max_concurrency` threads, so the
+        event loop stays free while they are in flight.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        problems = list(problems)
+        http_client = self._make_http_client()
+        try:
+            if self.env == "cpython":
+                loop = asyncio.get_running_loop()
+                with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                    return await asyncio.gather(
+                        *(
+                            loop.run_in_executor(
+                                executor, self._run, self._worker(http_client), lp
+                            )
+                            for lp in problems
+                        )
+                    )
+
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def run(lp: LpProblem) -> SolveResult:
+                worker = self._worker(http_client)
+                async with semaphore:
+                    try:
+                        status = await worker._solve_async(lp)
+                    except Exception as e:  # noqa: BLE001 - see _run
+                        lp.status = constants.LpStatusNotSolved
+                        return SolveResult(lp, lp.status, error=e)
+                return SolveResult(lp, status, worker.solution)
+
+            return await asyncio.gather(*(run(lp) for lp in problems))
+        finally:
+            http_client.close()
@@ -0,0 +1,167 @@
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass, fields
+
+
+@dataclass
+class LogEvent:
+    """A line of the solver's log."""
+
+    timestamp: str
+    level: str
+    stage: str
+    message: str
+    sequence: int
+
+
+@dataclass
+class MetricEvent:
+    """The solver's progress, reported periodically and for every improving solution."""
+
+    timestamp: str
+    objective_value: float
+    gap: float
+    iteration: int
+    sequence: int
+    dual_bound: float | None = None
+    nodes: int | None = None
+    elapsed_seconds: float | None = None
+    trigger: str | None = None
+
+
+@dataclass
+class ResultEvent:
+    """The final solution, as the server's JSON document."""
+
+    solution: dict
+    timestamp: str | None = None
+    runtime_milliseconds: int | None = None
+    sequence: int | None = None
+
+
+EVENT_TYPES = {"log": LogEvent, "metric": MetricEvent, "result": ResultEvent}
+
+
+def decode_event(cls, data: dict):
+    """Builds a typed event from its JSON document, ignoring fields this client does not know."""
+    names = {f.name for f in fields(cls)}
+    return cls(**{key: value for key, value in data.items() if key in names})
+
+
+class LineSplitter:
+    """
+    Splits a stream of byte chunks into lines without their "\\n" or "\\r\\n".
+
+    Only the unterminated end of the stream is kept between chunks, as a list of
+    parts, so a line arriving in many chunks is joined once rather than copied on
+    every chunk.
+    """
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        if b"\n" not in chunk:
+            if chunk:
+                self._parts.append(chunk)
+            return []
+        lines = chunk.split(b"\n")
+        if self._parts:
+            self._parts.append(lines[0])
+            lines[0] = b"".join(self._parts)
+            self._parts = []
+        tail = lines.pop()
+        if tail:
+            self._parts.append(tail)
+        return [line[:-1] if line.endswith(b"\r") else line for line in lines]
+
+    def close(self) -> list[bytes]:
+        """Returns the last line if the stream did not end with a newline."""
+        if not self._parts:
+            return []
+        line, self._parts = b"".join(self._parts), []
+        return [line[:-1] if line.endswith(b"\r") else line]
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    splitter = LineSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    splitter = LineSplitter()
+    async for chunk in chunks:
+        for line in splitter.feed(chunk):
+            yield line
+    for line in splitter.close():
+        yield line
+
+
+class SSEDecoder:
+    """
+    Frames SSE lines into `(event type, data)` messages.
+
+    The data is left as bytes, so a caller can skip the JSON decoding of events it
+    does not use. A message still pending when the stream ends is dispatched by
+    `close`.
+    """
+
+    def __init__(self):
+        self._event = ""
+        self._data: list[bytes] = []
+
+    def feed_line(self, line: bytes) -> tuple[str, bytes] | None:
+        if not line:
+            return self.close()
+        if line.startswith(b":"):  # Comment
+            return None
+        name, _, value = line.partition(b":")
+        if value.startswith(b" "):
+            value = value[1:]
+        if name == b"data":
+            self._data.append(value)
+        elif name == b"event":
+            self._event = value.decode("utf-8")
+        return None
+
+    def close(self) -> tuple[str, bytes] | None:
+        event, data = self._event or "message", self._data
+        self._event, self._data = "", []
+        if not data:
+            return None
+        return event, data[0] if len(data) == 1 else b"\n".join(data)
+
+
+def iter_messages(lines: Iterable[bytes]) -> Iterator[tuple[str, bytes]]:
+    decoder = SSEDecoder()
+    for line in lines:
+        message = decoder.feed_line(line)
+        if message is not None:
+            yield message
+    message = decoder.close()
+    if message is not None:
+        yield message
+
+
+async def aiter_messages(
+    lines: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[str, bytes]]:
+    decoder = SSEDecoder()
+    async for line in lines:
+        message = decoder.feed_line(line)
+        if message is not None:
+            yield message
+    message = decoder.close()
+    if message is not None:
+        yield message
+
+
+def parse_data(data: bytes) -> dict | None:
+    """Decodes the JSON data of a message, or returns None if it is not a JSON object."""
+    try:
+        document = json.loads(data)
+    except ValueError:
+        return None
+    return document if isinstance(document, dict) else None
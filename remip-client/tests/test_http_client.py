@@ -1,3 +1,9 @@
+import gzip
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
 from remip_client.http_client import PyodideHttpClient, RequestsHttpClient
 from remip_client.solver import ReMIPSolver
 
@@ -18,3 +24,131 @@ def test_solver_instantiates_pyodide_client_for_browser():
     """Verify that ReMIPSolver also instantiates PyodideHttpClient for the browser environment."""
     solver = ReMIPSolver(env="pyodide-browser")
     assert isinstance(solver.http_client, PyodideHttpClient)
+
+
+def test_requests_client_solve_file_posts_raw_body(requests_mock):
+    """Verify that problem files are posted as the raw body to /solve/file."""
+    requests_mock.post("http://remip/solve/file", json={"status": "optimal"})
+    client = RequestsHttpClient(base_url="http://remip", stream=False)
+
+    response = client.solve_file(
+        b"NAME test", {"format": "mps", "name": "test"}, timeout=5
+    )
+
+    assert response.json() == {"status": "optimal"}
+    request = requests_mock.last_request
+    assert request.body == b"NAME test"
+    assert request.qs == {"format": ["mps"], "name": ["test"], "timeout": ["5"]}
+
+
+def test_requests_client_requests_incumbents(requests_mock):
+    """Verify that incumbent events are requested on streaming solves."""
+    requests_mock.post("http://remip/solve", text="")
+    client = RequestsHttpClient(base_url="http://remip", stream=True, incumbents=True)
+
+    client.solve({}, timeout=None)
+
+    assert requests_mock.last_request.qs == {"stream": ["sse"], "incumbents": ["true"]}
+
+
+def test_requests_client_streams_lines(requests_mock):
+    """Verify that streamed responses are split into lines by the shared SSE splitter."""
+    body = b'event: result\r\ndata: {"solution": {}}\r\n\r\nevent: end'
+    requests_mock.post("http://remip/solve", content=body)
+    client = RequestsHttpClient(base_url="http://remip", stream=True)
+
+    response = client.solve({}, timeout=None)
+
+    assert list(response.iter_lines()) == [
+        b"event: result",
+        b'data: {"solution": {}}',
+        b"",
+        b"event: end",
+    ]
+
+
+def test_requests_client_compresses_large_bodies(requests_mock):
+    """Verify that bodies above the threshold are gzipped and small ones are not."""
+    requests_mock.post("http://remip/solve", json={"status": "optimal"})
+    client = RequestsHttpClient(
+        base_url="http://remip", stream=False, compress_threshold=1000
+    )
+
+    client.solve({"x": "small"}, timeout=None)
+    request = requests_mock.last_request
+    assert "Content-Encoding" not in request.headers
+    assert request.json() == {"x": "small"}
+
+    problem = {"variables": [{"name": f"x_{j}", "lowBound": 0} for j in range(100)]}
+    client.solve(problem, timeout=None)
+    request = requests_mock.last_request
+    assert request.headers["Content-Encoding"] == "gzip"
+    assert request.headers["Content-Type"] == "application/json"
+    assert json.loads(gzip.decompress(request.body)) == problem
+
+
+def test_requests_client_compression_can_be_disabled(requests_mock):
+    """Verify that no body is compressed without a threshold."""
+    requests_mock.post("http://remip/solve/file", json={"status": "optimal"})
+    client = RequestsHttpClient(
+        base_url="http://remip", stream=False, compress_threshold=None
+    )
+
+    client.solve_file(b"NAME test\n" * 10_000, {"format": "mps"}, timeout=None)
+
+    assert "Content-Encoding" not in requests_mock.last_request.headers
+
+
+def test_requests_client_keeps_a_session_per_thread():
+    """Verify that threads do not share a requests.Session and that close() closes them all."""
+    client = RequestsHttpClient(base_url="http://remip", stream=False)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sessions = list(executor.map(lambda _: client.session, range(2)))
+    main_session = client.session
+
+    assert main_session is client.session
+    assert all(session is not main_session for session in sessions)
+
+    with patch("requests.Session.close") as close:
+        client.close()
+    assert close.call_count == len({id(session) for session in sessions}) + 1
+    assert client.session is not main_session
+
+
+def test_requests_client_uploads_stored_problems_once(requests_mock):
+    """Verify that a stored problem is uploaded only on a miss, and re-uploaded if it was evicted."""
+    body = b'{"variable_names": ["x"]}'
+    url = f"http://remip/problems/{hashlib.sha256(body).hexdigest()}"
+    head = requests_mock.head(url, [{"status_code": 404}, {"status_code": 200}])
+    put = requests_mock.put(url, status_code=201)
+    solve = requests_mock.post(
+        f"{url}/solve",
+        [
+            {"json": {"status": "optimal"}},
+            {"status_code": 404},
+            {"json": {"status": "optimal"}},
+        ],
+    )
+    client = RequestsHttpClient(base_url="http://remip", stream=False)
+
+    assert client.solve_stored(body, timeout=5).json() == {"status": "optimal"}
+    assert (head.call_count, put.call_count, solve.call_count) == (1, 1, 1)
+    assert put.last_request.body == body
+    assert solve.last_request.qs == {"timeout": ["5"]}
+
+    # Evicted between the check and the solve
+    assert client.solve_stored(body, timeout=5).json() == {"status": "optimal"}
+    assert (head.call_count, put.call_count, solve.call_count) == (2, 2, 3)
+
+
+def test_requests_client_solves_directly_without_problem_store(requests_mock):
+    """Verify that problems are posted to /solve when the server has no problem store."""
+    body = b'{"variable_names": ["x"]}'
+    url = f"http://remip/problems/{hashlib.sha256(body).hexdigest()}"
+    requests_mock.head(url, status_code=404)
+    requests_mock.put(url, status_code=501)
+    requests_mock.post("http://remip/solve", json={"status": "optimal"})
+    client = RequestsHttpClient(base_url="http://remip", stream=False)
+
+    assert client.solve_stored(body, timeout=None).json() == {"status": "optimal"}
+    assert requests_mock.last_request.body == body
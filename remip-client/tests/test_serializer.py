@@ -0,0 +1,92 @@
+import json
+
+from pulp import LpMaximize, LpProblem, LpVariable, lpSum
+
+from remip_client import serializer
+from remip_client.serializer import ProblemSerializer
+
+
+def make_problem(size: int = 10) -> tuple[LpProblem, list[LpVariable]]:
+    lp = LpProblem("serialized", LpMaximize)
+    x = [LpVariable(f"x_{j}", 0, j + 1) for j in range(size)]
+    x.append(LpVariable("y", cat="Integer"))
+    lp += lpSum((j + 1) * v for j, v in enumerate(x)) + 3
+    for i in range(size):
+        lp += x[i] + 2 * x[(i + 1) % size] - x[-1] <= i, f"c_{i}"
+    lp += x[0] - x[-1] >= -1
+    lp.sos1[0] = {x[0]: 1, x[1]: 2}
+    return lp, x
+
+
+def expected_body(lp: LpProblem) -> dict:
+    """The columnar problem as the server builds it from `lp.toDict()`."""
+    document = lp.toDict()
+    names = [v["name"] for v in document["variables"]]
+    index = {name: j for j, name in enumerate(names)}
+    objective = [0.0] * len(names)
+    for c in document["objective"]["coefficients"]:
+        objective[index[c["name"]]] = c["value"]
+    indptr, indices, data = [0], [], []
+    for constraint in document["constraints"]:
+        for c in constraint["coefficients"]:
+            indices.append(index[c["name"]])
+            data.append(c["value"])
+        indptr.append(len(indices))
+    return {
+        "variable_names": names,
+        "categories": [v["cat"] for v in document["variables"]],
+        "lower_bounds": [v["lowBound"] for v in document["variables"]],
+        "upper_bounds": [v["upBound"] for v in document["variables"]],
+        "objective": objective,
+        "constraint_names": [c["name"] for c in document["constraints"]],
+        "senses": [c["sense"] for c in document["constraints"]],
+        "rhs": [-c["constant"] for c in document["constraints"]],
+        "matrix": {"indptr": indptr, "indices": indices, "data": data},
+    }
+
+
+def test_serialize_matches_to_dict():
+    lp, x = make_problem()
+    body = json.loads(ProblemSerializer().serialize(lp, objective_cutoff=2.0))
+
+    assert {key: body[key] for key in expected_body(lp)} == expected_body(lp)
+    assert body["parameters"] == {
+        "name": "serialized",
+        "sense": -1,
+        "status": 0,
+        "sol_status": 0,
+    }
+    assert body["sos1"] == [{"x_0": 1, "x_1": 2}]
+    assert body["objective_cutoff"] == 2.0
+    assert "initial_values" not in body
+
+    x[0].setInitialValue(1.0)
+    body = json.loads(ProblemSerializer().serialize(lp, warm_start=True))
+    assert body["initial_values"][body["variable_names"].index("x_0")] == 1.0
+
+
+def test_cache_reencodes_only_changed_blocks(monkeypatch):
+    monkeypatch.setattr(serializer, "BLOCK_SIZE", 4)
+    lp, x = make_problem(20)
+    cached = ProblemSerializer()
+    cached.serialize(lp)
+
+    encoded = []
+    dumps = serializer._dumps
+    monkeypatch.setattr(
+        serializer, "_dumps", lambda values: encoded.append(values) or dumps(values)
+    )
+    lp.constraints["c_3"].expr[x[4]] = 5.0
+    lp.constraints["c_3"].constant = -7.0
+    body = cached.serialize(lp)
+
+    # Only the data block holding the coefficient, the rhs block and the metadata
+    assert len(encoded) == 3
+    assert body == ProblemSerializer(cache=False).serialize(lp)
+
+    # New variables are picked up
+    z = LpVariable("z", 0, 1)
+    lp += z + x[0] <= 1, "new"
+    body = json.loads(cached.serialize(lp))
+    assert body == json.loads(ProblemSerializer(cache=False).serialize(lp))
+    assert "z" in body["variable_names"]
@@ -1,11 +1,18 @@
+import asyncio
+import hashlib
 import json
+import re
+import struct
 from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
 from pulp import LpMinimize, LpProblem, LpVariable, constants
 
+from remip_client.encoding import COMPRESS_THRESHOLD
+from remip_client.serializer import CSR_JSON_MEDIA_TYPE
 from remip_client.solver import ReMIPSolver
+from remip_client.sse import MetricEvent, ResultEvent, parse_data
 
 
 @pytest.fixture
@@ -200,3 +207,384 @@ def test_solve_with_enhancements(mock_client_class, lp_problem):
     assert lp_problem.constraints["_C1"].pi == -1.0
     assert hasattr(lp_problem.variables()[0], "dj")
     assert lp_problem.variables()[0].dj == 0.0
+
+
+@patch("remip_client.http_client.RequestsHttpClient")
+def test_solve_uploads_mps_file(mock_client_class, lp_problem):
+    solution = {
+        "name": "Test_Problem",
+        "status": "optimal",
+        "objective_value": 1.0,
+        "variables": {"x": 1.0},
+    }
+    mock_response = MagicMock()
+    mock_response.json.return_value = solution
+    mock_client_instance = mock_client_class.return_value
+    mock_client_instance.solve_file.return_value = mock_response
+
+    solver = ReMIPSolver(stream=False, timeout=30, env="cpython", upload_format="mps")
+    status = solver.actualSolve(lp_problem)
+
+    assert status == constants.LpStatusOptimal
+    assert lp_problem.variables()[0].varValue == 1.0
+    mock_client_instance.solve.assert_not_called()
+    (data, params), kwargs = mock_client_instance.solve_file.call_args
+    assert b"ROWS" in data and b"COLUMNS" in data
+    assert params == {"format": "mps", "name": "Test_Problem", "sense": "minimize"}
+    assert kwargs["timeout"] == 30
+
+
+def test_invalid_upload_format():
+    with pytest.raises(ValueError):
+        ReMIPSolver(env="cpython", upload_format="xlsx")
+
+
+@patch("remip_client.http_client.RequestsHttpClient")
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_solve_sends_warm_start_only_when_requested(
+    mock_client_class, lp_problem, warm_start
+):
+    lp_problem.variables()[0].setInitialValue(2.0)
+    mock_client_instance = mock_client_class.return_value
+
+    solver = ReMIPSolver(
+        env="cpython",
+        upload_format="json",
+        warmStart=warm_start,
+        objective_cutoff=5.0,
+    )
+    solver.actualSolve(lp_problem)
+
+    (problem,), _ = mock_client_instance.solve.call_args
+    assert problem["variables"][0]["varValue"] == (2.0 if warm_start else None)
+    assert problem["objective_cutoff"] == 5.0
+
+
+@patch("remip_client.http_client.RequestsHttpClient")
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_solve_sends_csr_body_by_default(mock_client_class, lp_problem, warm_start):
+    lp_problem.variables()[0].setInitialValue(2.0)
+    mock_client_instance = mock_client_class.return_value
+
+    solver = ReMIPSolver(env="cpython", warmStart=warm_start, objective_cutoff=5.0)
+    solver.actualSolve(lp_problem)
+
+    (body,), kwargs = mock_client_instance.solve.call_args
+    assert kwargs["content_type"] == CSR_JSON_MEDIA_TYPE
+    problem = json.loads(body)
+    assert problem["variable_names"] == ["x"]
+    assert problem["matrix"] == {"indptr": [0, 1], "indices": [0], "data": [1.0]}
+    assert problem.get("initial_values") == ([2.0] if warm_start else None)
+    assert problem["objective_cutoff"] == 5.0
+
+
+@patch("remip_client.http_client.RequestsHttpClient")
+def test_solve_reports_incumbents(mock_client_class):
+    prob = LpProblem("Incumbents", LpMinimize)
+    x, y, z = (LpVariable(name, lowBound=0) for name in "xyz")
+    prob += x + y + z
+    prob += x + y + z >= 1
+
+    events = [
+        {
+            "type": "incumbent",
+            "objective_value": 3.0,
+            "variables": {"x": 1.0, "y": 2.0},
+        },
+        {
+            "type": "incumbent",
+            "objective_value": 2.0,
+            "variables": {"y": 0.0, "z": 1.0},
+        },
+        {
+            "type": "result",
+            "solution": {
+                "name": "Incumbents",
+                "status": "optimal",
+                "objective_value": 2.0,
+                "variables": {"x": 1.0, "y": 0.0, "z": 1.0},
+            },
+        },
+    ]
+    mock_response = MagicMock()
+    mock_response.iter_lines.return_value = [
+        line
+        for event in events
+        for line in (
+            f"event: {event['type']}".encode(),
+            f"data: {json.dumps(event)}".encode(),
+            b"",
+        )
+    ]
+    mock_client_instance = mock_client_class.return_value
+    mock_client_instance.solve.return_value = mock_response
+
+    seen = []
+    solver = ReMIPSolver(
+        env="cpython", on_incumbent=lambda obj, values: seen.append((obj, dict(values)))
+    )
+    status = solver.actualSolve(prob)
+
+    assert mock_client_class.call_args.kwargs == {
+        "base_url": solver.url,
+        "stream": True,
+        "incumbents": True,
+        "compress_threshold": COMPRESS_THRESHOLD,
+    }
+    assert status == constants.LpStatusOptimal
+    assert seen == [
+        (3.0, {"x": 1.0, "y": 2.0, "z": 0.0}),
+        (2.0, {"x": 1.0, "y": 0.0, "z": 1.0}),
+    ]
+    assert solver.incumbent == {"x": 1.0, "y": 0.0, "z": 1.0}
+
+
+@patch("remip_client.solver.parse_data", wraps=parse_data)
+@patch("remip_client.http_client.RequestsHttpClient")
+def test_solve_dispatches_typed_events(mock_client_class, mock_parse_data, lp_problem):
+    log_event = {
+        "type": "log",
+        "timestamp": "t0",
+        "level": "info",
+        "stage": "solve",
+        "message": "log line",
+        "sequence": 1,
+    }
+    metric_event = {
+        "type": "metric",
+        "timestamp": "t1",
+        "objective_value": 1.0,
+        "gap": 0.0,
+        "iteration": 4,
+        "sequence": 2,
+        "trigger": "best_solution",
+    }
+    solution = {
+        "name": "Test_Problem",
+        "status": "optimal",
+        "objective_value": 1.0,
+        "variables": {"x": 1.0},
+    }
+    result_event = {
+        "type": "result",
+        "timestamp": "t2",
+        "solution": solution,
+        "runtime_milliseconds": 5,
+        "sequence": 3,
+    }
+    sse_data = "".join(
+        f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        for event in [log_event] * 3 + [metric_event, result_event]
+    )
+    mock_response = MagicMock()
+    mock_response.iter_lines.return_value = sse_data.encode().split(b"\n")
+    mock_client_class.return_value.solve.return_value = mock_response
+
+    metrics, results = [], []
+    solver = ReMIPSolver(
+        env="cpython", on_metric=metrics.append, on_result=results.append
+    )
+    status = solver.actualSolve(lp_problem)
+
+    assert mock_client_class.call_args.kwargs["stream"] is True
+    assert status == constants.LpStatusOptimal
+    assert metrics == [
+        MetricEvent(
+            timestamp="t1",
+            objective_value=1.0,
+            gap=0.0,
+            iteration=4,
+            sequence=2,
+            trigger="best_solution",
+        )
+    ]
+    assert results == [
+        ResultEvent(
+            solution=solution, timestamp="t2", runtime_milliseconds=5, sequence=3
+        )
+    ]
+    # Log events are skipped without decoding when nobody listens
+    assert mock_parse_data.call_count == 2
+
+    logs = []
+    solver = ReMIPSolver(env="cpython", on_log=logs.append)
+    solver.actualSolve(lp_problem)
+    assert [event.message for event in logs] == ["log line"] * 3
+
+
+def test_solve_requests_and_decodes_msgpack_solution(requests_mock, lp_problem):
+    msgpack = pytest.importorskip("msgpack")
+    solution = {
+        "name": "Test_Problem",
+        "status": "optimal",
+        "objective_value": 1.0,
+        "mip_gap": None,
+        "warm_start_accepted": None,
+        "variable_names": ["x"],
+        "variables": {"dtype": "int8", "data": b"\x01"},
+        "reduced_costs": {"dtype": "float64", "data": struct.pack("<d", 0.5)},
+        "constraint_names": ["_C1", "other"],
+        "slacks": {"dtype": "float64", "data": struct.pack("<2d", 0.0, float("nan"))},
+        "duals": None,
+    }
+    requests_mock.post(
+        "http://remip/solve",
+        content=msgpack.packb(solution),
+        headers={"Content-Type": "application/msgpack"},
+    )
+
+    solver = ReMIPSolver(url="http://remip", env="cpython")
+    status = solver.actualSolve(lp_problem)
+
+    assert requests_mock.last_request.headers["Accept"].startswith(
+        "application/msgpack"
+    )
+    assert status == constants.LpStatusOptimal
+    assert lp_problem.variables()[0].varValue == 1
+    assert lp_problem.variables()[0].dj == 0.5
+    assert lp_problem.constraints["_C1"].slack == 0.0
+    assert solver.solution.variables == {"x": 1}
+    assert solver.solution.slacks == {"_C1": 0.0}
+    assert solver.solution.duals is None
+
+
+def test_decode_arrow_solution():
+    pa = pytest.importorskip("pyarrow")
+    from remip_client.encoding import ARROW_MEDIA_TYPE, decode_body, expand_solution
+
+    columns = {
+        "variable_names": pa.array([["x", "y"]]),
+        "variables": pa.array([[0.5, 2.0]]),
+        "reduced_costs": pa.array([None], type=pa.list_(pa.float64())),
+        "constraint_names": pa.array([["c1"]]),
+        "slacks": pa.array([[1.0]]),
+        "duals": pa.array([None], type=pa.list_(pa.float64())),
+    }
+    batch = pa.RecordBatch.from_pydict(columns).replace_schema_metadata(
+        {"remip.solution": '{"name": "p", "status": "optimal", "objective_value": 4.5}'}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+
+    solution = expand_solution(
+        decode_body(sink.getvalue().to_pybytes(), ARROW_MEDIA_TYPE)
+    )
+
+    assert solution == {
+        "name": "p",
+        "status": "optimal",
+        "objective_value": 4.5,
+        "variables": {"x": 0.5, "y": 2.0},
+        "reduced_costs": None,
+        "slacks": {"c1": 1.0},
+        "duals": None,
+    }
+
+
+def _batch_problems(n: int) -> list[LpProblem]:
+    problems = []
+    for i in range(n):
+        prob = LpProblem(f"batch_{i}", LpMinimize)
+        x = LpVariable("x", lowBound=0)
+        prob += x
+        prob += x >= i
+        problems.append(prob)
+    return problems
+
+
+def _batch_response(request, context):
+    problem = json.loads(request.body)
+    name = problem["parameters"]["name"]
+    if name == "batch_3":
+        context.status_code = 500
+        return {"detail": "solver crashed"}
+    rhs = problem["rhs"][0]
+    return {
+        "name": name,
+        "status": "optimal",
+        "objective_value": rhs,
+        "variables": {"x": rhs},
+    }
+
+
+def test_solve_many_reports_each_problem(requests_mock):
+    requests_mock.post("http://remip/solve", json=_batch_response)
+    problems = _batch_problems(6)
+
+    solver = ReMIPSolver(url="http://remip", env="cpython", compress_threshold=None)
+    results = solver.solve_many(problems, max_concurrency=3)
+
+    assert [result.problem for result in results] == problems
+    for i, (prob, result) in enumerate(zip(problems, results)):
+        if i == 3:
+            assert result.status == prob.status == constants.LpStatusNotSolved
+            assert "500" in str(result.error)
+            assert result.solution is None
+        else:
+            assert result.error is None
+            assert result.status == prob.status == constants.LpStatusOptimal
+            assert result.solution["objective_value"] == i
+            assert prob.variables()[0].varValue == i
+    assert requests_mock.call_count == 6
+    # The solver's own state is left alone
+    assert solver.solution is None
+
+
+def test_solve_many_async_reports_each_problem(requests_mock):
+    requests_mock.post("http://remip/solve", json=_batch_response)
+    problems = _batch_problems(5)
+
+    solver = ReMIPSolver(url="http://remip", env="cpython", compress_threshold=None)
+    results = asyncio.run(solver.solve_many_async(problems, max_concurrency=2))
+
+    assert [result.status for result in results] == [
+        constants.LpStatusOptimal,
+        constants.LpStatusOptimal,
+        constants.LpStatusOptimal,
+        constants.LpStatusNotSolved,
+        constants.LpStatusOptimal,
+    ]
+    assert [prob.variables()[0].varValue for prob in problems] == [0, 1, 2, None, 4]
+
+
+def test_solve_through_problem_store(requests_mock, lp_problem):
+    requests_mock.head(re.compile("http://remip/problems/"), status_code=200)
+    solve = requests_mock.post(
+        re.compile("http://remip/problems/.*/solve"),
+        json={"name": "Test_Problem", "status": "optimal", "objective_value": 1.0},
+    )
+
+    solver = ReMIPSolver(url="http://remip", env="cpython", problem_store=True)
+    assert solver.actualSolve(lp_problem) == constants.LpStatusOptimal
+
+    body = solver._problem_body(lp_problem)
+    digest = hashlib.sha256(body).hexdigest()
+    assert solve.last_request.path == f"/problems/{digest}/solve"
+
+
+def test_solution_reports_server_timings(requests_mock, lp_problem):
+    requests_mock.post(
+        "http://remip/solve",
+        json={
+            "name": "Test_Problem",
+            "status": "optimal",
+            "objective_value": 1.0,
+            "variables": {"x": 1.0},
+            "timings_milliseconds": {"validate": 0.5, "build": 1.0, "solve": 2.0},
+        },
+        headers={
+            "Server-Timing": "validate;dur=0.5, build;dur=1.0, solve;dur=2.0, "
+            'serialize;desc="response";dur=0.25'
+        },
+    )
+
+    solver = ReMIPSolver(url="http://remip", env="cpython")
+    solver.actualSolve(lp_problem)
+
+    assert solver.solution.timings_milliseconds == {
+        "validate": 0.5,
+        "build": 1.0,
+        "solve": 2.0,
+        "serialize": 0.25,
+    }
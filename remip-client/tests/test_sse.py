@@ -0,0 +1,79 @@
+import asyncio
+
+from remip_client.sse import (
+    LineSplitter,
+    MetricEvent,
+    SSEDecoder,
+    aiter_lines,
+    decode_event,
+    iter_lines,
+    iter_messages,
+)
+
+
+def test_line_splitter_joins_lines_across_chunks():
+    splitter = LineSplitter()
+    assert splitter.feed(b"event: lo") == []
+    assert splitter.feed(b"g\r") == []
+    assert splitter.feed(b"\ndata: \xe2") == [b"event: log"]
+    assert splitter.feed(b"\x9c\x93\n\nda") == ["data: ✓".encode(), b""]
+    assert splitter.close() == [b"da"]
+    assert splitter.close() == []
+
+
+def test_iter_lines_sync_and_async_agree():
+    chunks = [b"a\nb", b"", b"c\r\n", b"\n", b"d"]
+
+    async def collect():
+        async def gen():
+            for chunk in chunks:
+                yield chunk
+
+        return [line async for line in aiter_lines(gen())]
+
+    assert list(iter_lines(chunks)) == [b"a", b"bc", b"", b"d"]
+    assert asyncio.run(collect()) == [b"a", b"bc", b"", b"d"]
+
+
+def test_decoder_frames_messages():
+    lines = [
+        b": keep-alive",
+        b"event: metric",
+        b'data: {"a":',
+        b"data:1}",
+        b"",
+        b"",
+        b'data: {"type": "log"}',
+        b"",
+        b"event: end",
+        b'data: {"success": true}',
+    ]
+    assert list(iter_messages(lines)) == [
+        ("metric", b'{"a":\n1}'),
+        ("message", b'{"type": "log"}'),
+        ("end", b'{"success": true}'),  # Dispatched when the stream ends
+    ]
+
+    decoder = SSEDecoder()
+    assert decoder.feed_line(b"event: log") is None
+    assert decoder.feed_line(b"") is None  # No data: nothing to dispatch
+    assert decoder.feed_line(b"data: x") is None
+    assert decoder.feed_line(b"") == ("message", b"x")
+
+
+def test_decode_event_ignores_unknown_fields():
+    event = decode_event(
+        MetricEvent,
+        {
+            "type": "metric",
+            "timestamp": "t",
+            "objective_value": 1.0,
+            "gap": 0.5,
+            "iteration": 3,
+            "sequence": 1,
+            "new_field": True,
+        },
+    )
+    assert event == MetricEvent(
+        timestamp="t", objective_value=1.0, gap=0.5, iteration=3, sequence=1
+    )
@@ -0,0 +1,67 @@
+"""
+Benchmark for ScipSolverWrapper._build_model.
+
+Builds random sparse problems of increasing size and reports the build time
+against the number of non-zeros. Run from the `remip` directory:
+
+    uv run python benchmarks/bench_build_model.py
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from remip.models import Constraint, MIPProblem, Objective, ObjectiveCoefficient, Parameters, Variable
+from remip.solvers.scip_wrapper import ScipSolverWrapper
+
+
+def generate_problem(num_vars: int, num_constraints: int, nnz_per_row: int, seed: int = 0) -> MIPProblem:
+    """Generates a random sparse problem with roughly `num_constraints * nnz_per_row` non-zeros."""
+    rng = random.Random(seed)
+    variables = [Variable(name=f"x_{j}", category="Continuous", lower_bound=0, upper_bound=1) for j in range(num_vars)]
+    constraints = []
+    for i in range(num_constraints):
+        columns = rng.sample(range(num_vars), nnz_per_row)
+        constraints.append(
+            Constraint(
+                name=f"c_{i}",
+                sense=-1,
+                coefficients=[ObjectiveCoefficient(name=f"x_{j}", value=rng.uniform(1, 10)) for j in columns],
+                constant=-float(nnz_per_row),
+            )
+        )
+    objective = Objective(
+        name="obj",
+        coefficients=[ObjectiveCoefficient(name=f"x_{j}", value=rng.uniform(-1, 1)) for j in range(num_vars)],
+    )
+    return MIPProblem(
+        parameters=Parameters(name=f"bench_{num_vars}", sense=1, status=0, sol_status=0),
+        objective=objective,
+        variables=variables,
+        constraints=constraints,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000, 100_000])
+    parser.add_argument("--nnz-per-row", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    wrapper = ScipSolverWrapper()
+    print(f"{'vars':>10} {'conss':>10} {'nnz':>12} {'build [s]':>12} {'us/nnz':>10}")
+    for size in args.sizes:
+        problem = generate_problem(size, size, args.nnz_per_row)
+        nnz = sum(len(c.coefficients) for c in problem.constraints) + len(problem.objective.coefficients)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            asyncio.run(wrapper._build_model(problem))
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>10} {size:>10} {nnz:>12} {best:>12.3f} {best / nnz * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark for compressed request bodies, responses and SSE streams.
+
+For random problems of increasing size, compresses the problem JSON (the request
+body), its solution JSON (the response body) and a stream of metric events with
+each content coding the server supports. Reports the compressed size, the
+compression and decompression times, and the resulting transfer latency over a
+link of the given bandwidth. Run from the `remip` directory:
+
+    uv run python benchmarks/bench_compression.py --bandwidth 50
+"""
+
+import argparse
+import random
+import time
+import zlib
+
+from bench_build_model import generate_problem
+
+from remip.models import MetricEvent, MIPSolution
+
+
+def gzip_codec(level: int):
+    def compress(data: bytes) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    return f"gzip-{level}", compress, lambda data: zlib.decompress(data, 31)
+
+
+def zstd_codec(level: int):
+    import zstandard
+
+    return (
+        f"zstd-{level}",
+        zstandard.ZstdCompressor(level=level).compress,
+        zstandard.ZstdDecompressor().decompress,
+    )
+
+
+def codecs() -> list:
+    result = [("identity", bytes, bytes), gzip_codec(1), gzip_codec(6)]
+    try:
+        result += [zstd_codec(1), zstd_codec(3)]
+    except ImportError:
+        print("zstandard is not installed; skipping zstd")
+    return result
+
+
+def best_time(run, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, body: bytes, bandwidth: float, repeat: int):
+    """Prints one row per codec; latency is compression + transfer + decompression."""
+    for name, compress, decompress in codecs():
+        compressed = compress(body)
+        compress_s = best_time(lambda: compress(body), repeat)
+        decompress_s = best_time(lambda: decompress(compressed), repeat)
+        latency = compress_s + len(compressed) * 8 / (bandwidth * 1e6) + decompress_s
+        print(
+            f"{label:>22} {name:>9} {len(compressed) / 1e6:>10.2f} {len(body) / len(compressed):>7.1f}x"
+            f" {compress_s * 1e3:>9.1f} {decompress_s * 1e3:>9.1f} {latency * 1e3:>11.1f}"
+        )
+
+
+def sse_stream(num_events: int, level: int) -> tuple[int, int]:
+    """Returns the size of a metric event stream, uncompressed and gzipped with a flush per event."""
+    rng = random.Random(0)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    raw = compressed = 0
+    for i in range(num_events):
+        event = MetricEvent(
+            timestamp="2025-01-01T00:00:00+00:00",
+            objective_value=rng.uniform(0, 100),
+            gap=rng.uniform(0, 1),
+            iteration=i * 100,
+            sequence=i,
+        ).to_sse()
+        raw += len(event)
+        compressed += len(compressor.compress(event.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH))
+    return raw, compressed + len(compressor.flush())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--nnz-per-row", type=int, default=5)
+    parser.add_argument("--bandwidth", type=float, default=50.0, help="Link bandwidth in Mbit/s")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'payload':>22} {'coding':>9} {'size [MB]':>10} {'ratio':>8} {'comp [ms]':>9} {'dec [ms]':>9} {'latency [ms]':>11}")
+    for size in args.sizes:
+        problem = generate_problem(size, size, args.nnz_per_row)
+        report(f"problem {size}", problem.model_dump_json(by_alias=True).encode(), args.bandwidth, args.repeat)
+        rng = random.Random(0)
+        solution = MIPSolution(
+            name=problem.parameters.name,
+            status="optimal",
+            objective_value=0.0,
+            variables={v.name: rng.choice([0.0, 1.0, rng.random()]) for v in problem.variables},
+        )
+        report(f"solution {size}", solution.model_dump_json().encode(), args.bandwidth, args.repeat)
+
+    print()
+    print(f"{'events':>10} {'raw [B/event]':>14} {'gzip-1 flushed [B/event]':>25}")
+    for num_events in (10, 100, 1000):
+        raw, compressed = sse_stream(num_events, level=1)
+        print(f"{num_events:>10} {raw / num_events:>14.1f} {compressed / num_events:>25.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark for ScipSolverWrapper._extract_solution.
+
+Solves random sparse LPs of increasing size whose variables are fixed at random
+values, so that SCIP finishes in presolving, and reports the time spent turning
+the solved model into a MIPSolution (values, slacks, duals and reduced costs)
+with the previous per-variable, per-row implementation and with the current
+one. Run from the `remip` directory:
+
+    uv run python benchmarks/bench_extract.py --sizes 10000 100000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from bench_build_model import generate_problem
+
+from remip.models import MIPSolution
+from remip.solvers.scip_wrapper import ScipSolverWrapper
+
+
+def reference_extract(model, problem, vars) -> MIPSolution:
+    """The extraction before it was vectorized: a getSolVal call per variable and a Python loop per row."""
+    solution = model.getBestSol()
+    solution_vars = {}
+    for var_name, var in vars.items():
+        try:
+            solution_vars[var_name] = model.getSolVal(solution, var)
+        except Exception:
+            pass
+
+    slacks = {}
+    indptr, indices, data = problem.matrix.indptr, problem.matrix.indices, problem.matrix.data
+    values = [solution_vars.get(name, 0.0) for name in problem.variable_names]
+    for i, (sense, rhs, name) in enumerate(zip(problem.senses, problem.rhs, problem.constraint_names)):
+        activity = 0.0
+        for k in range(indptr[i], indptr[i + 1]):
+            activity += values[indices[k]] * data[k]
+        slacks[name] = activity - rhs if sense == 1 else rhs - activity
+
+    duals = {}
+    reduced_costs = {}
+    for c in model.getConss():
+        if c.isLinear():
+            duals[c.name] = model.getDualSolVal(c)
+    for v_name, v_obj in vars.items():
+        reduced_costs[v_name] = model.getVarRedcost(v_obj)
+
+    return MIPSolution(
+        name=problem.parameters.name,
+        status="optimal",
+        objective_value=model.getSolObjVal(solution),
+        variables=solution_vars,
+        slacks=slacks,
+        duals=duals,
+        reduced_costs=reduced_costs,
+    )
+
+
+def fixed_problem(size: int, nnz_per_row: int):
+    """A problem whose variables are fixed at a feasible point: coefficients are at most 10, so rows stay below nnz_per_row."""
+    rng = random.Random(1)
+    problem = generate_problem(size, size, nnz_per_row)
+    for variable in problem.variables:
+        variable.lower_bound = variable.upper_bound = rng.uniform(0, 0.1)
+    return problem.to_sparse()
+
+
+def best_time(run, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--nnz-per-row", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    wrapper = ScipSolverWrapper()
+    print(f"{'vars':>10} {'nnz':>10} {'reference [s]':>14} {'current [s]':>12} {'speedup':>8}")
+    for size in args.sizes:
+        problem = fixed_problem(size, args.nnz_per_row)
+        model, vars = asyncio.run(wrapper._build_model(problem))
+        model.hideOutput()
+        model.optimize()
+
+        expected = reference_extract(model, problem, vars)
+        actual = wrapper._extract_solution(model, problem, vars)
+        assert actual.variables == expected.variables and actual.slacks.keys() == expected.slacks.keys()
+
+        reference = best_time(lambda: reference_extract(model, problem, vars), args.repeat)
+        current = best_time(lambda: wrapper._extract_solution(model, problem, vars), args.repeat)
+        nnz = len(problem.matrix.data)
+        print(f"{size:>10} {nnz:>10} {reference:>14.3f} {current:>12.3f} {reference / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark for decoding PuLP-style JSON problems.
+
+Decodes the JSON body of random problems of increasing size into the columnar
+problem that `_build_model` consumes, once through the `MIPProblem` pydantic
+object graph and once through the one-pass fast path of `parse_problem_json`.
+Reports the time and the peak memory allocated by each. Run from the `remip`
+directory:
+
+    uv run python benchmarks/bench_ingest.py --sizes 10000 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from bench_build_model import generate_problem
+
+from remip.models import MIPProblem
+from remip.parsers import parse_problem_json
+
+
+def parse_with_pydantic(body: bytes):
+    return MIPProblem.model_validate_json(body).to_sparse()
+
+
+def measure(parse, body: bytes, repeat: int) -> tuple[float, float]:
+    """Returns the best time in seconds and the peak allocation in MB of parsing the body."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        parse(body)
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    problem = parse(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del problem
+    return best, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--nnz-per-row", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'nnz':>10} {'body [MB]':>10} {'path':>9} {'time [s]':>10} {'peak [MB]':>10}")
+    for size in args.sizes:
+        body = generate_problem(size, size, args.nnz_per_row).model_dump_json(by_alias=True).encode()
+        nnz = size * args.nnz_per_row
+        for name, parse in (("pydantic", parse_with_pydantic), ("fast", parse_problem_json)):
+            seconds, peak = measure(parse, body, args.repeat)
+            print(f"{nnz:>10} {len(body) / 1e6:>10.1f} {name:>9} {seconds:>10.3f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Load test of concurrent `/solve` and `/solve?stream=sse` requests.
+
+Drives `remip.main.app` in-process through ASGI (the default), an already running
+server (`--url`), or a server it launches locally (`--launch`, with `--server-args`
+passed to `remip.main`, e.g. `--server-args="--solver-workers 2"`).
+
+Requests are drawn from a mix of generated problems (see `generators.py`), written
+as `generator:nnz[=weight]`. They arrive either from `--concurrency` clients that
+each send their next request as soon as the previous one is answered, or, with
+`--rate`, at random (Poisson) times at that many requests per second, with at most
+`--concurrency` in flight. With `--rate`, latency counts from the arrival time, so
+the time a request waits for a free client is not hidden.
+
+Reports the throughput, the p50/p95/p99 latency of each kind of request, the time
+to the first SSE event, and:
+
+- timeout adherence: how long after `--timeout` requests that hit it are answered;
+- cancel adherence: how long after a client disconnects (`--cancel-fraction` of the
+  SSE requests, after `--cancel-after` seconds) the server is done with its solve.
+  In-process, that is when the app returns; against a server, when its
+  `remip_solves_total{status="cancelled"}` counter increments, polled every
+  `--poll-interval` seconds.
+
+Run from the `remip` directory:
+
+    uv run python benchmarks/bench_load.py --mix knapsack:1000=3 set_cover:10000 --concurrency 8 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import time
+import warnings
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+from generators import GENERATORS
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+@dataclass
+class Outcome:
+    kind: str  # "solve" or "sse"
+    problem: str
+    arrival: float
+    latency: float
+    status: str  # The solution's status, "cancelled", or "error"
+    first_event: Optional[float] = None  # Seconds from arrival to the first SSE event
+    cancel_stop: Optional[float] = None  # Seconds from the disconnect to the server being done with the solve
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """The q-th percentile, interpolating between the closest ranks."""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def distribution(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        **{f"p{q}": percentile(values, q) for q in (50, 95, 99)},
+        "max": max(values, default=None),
+    }
+
+
+def result_status(kind: str, body: bytes) -> str:
+    """The status of the solution in a `/solve` response or in the result event of an SSE stream."""
+    try:
+        if kind == "solve":
+            return json.loads(body)["status"]
+        for block in body.decode("utf-8").split("\n\n"):
+            if block.startswith("event: result\n"):
+                return json.loads(block.split("data: ", 1)[1])["solution"]["status"]
+    except (ValueError, KeyError, IndexError):
+        pass
+    return "error"
+
+
+class AsgiTarget:
+    """Sends requests straight to the ASGI app, in this process and event loop."""
+
+    def __init__(self):
+        from remip.main import app
+
+        self.app = app
+
+    async def __aenter__(self):
+        self.lifespan = self.app.router.lifespan_context(self.app)
+        await self.lifespan.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.lifespan.__aexit__(*exc_info)
+
+    async def request(self, kind: str, params: Dict[str, Any], body: bytes, cancel_after: Optional[float]):
+        """Returns `(status, response body, first event time, disconnect time)`, as perf_counter times."""
+        disconnected = asyncio.Event()
+        chunks: List[bytes] = []
+        first_event = None
+        status = None
+        pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            if pending:
+                return pending.pop()
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal first_event, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not disconnected.is_set():
+                chunks.append(message.get("body", b""))
+                if first_event is None and b"event: " in chunks[-1]:
+                    first_event = time.perf_counter()
+
+        query = urlencode(params).encode("ascii")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/solve",
+            "raw_path": b"/solve",
+            "query_string": query,
+            "root_path": "",
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 0),
+            "server": ("127.0.0.1", 80),
+        }
+        disconnect_at = None
+
+        def disconnect():
+            nonlocal disconnect_at
+            disconnect_at = time.perf_counter()
+            disconnected.set()
+
+        if cancel_after is not None:
+            handle = asyncio.get_running_loop().call_later(cancel_after, disconnect)
+        await self.app(scope, receive, send)
+        if cancel_after is not None:
+            handle.cancel()
+        return status, b"".join(chunks), first_event, disconnect_at
+
+
+class HttpTarget:
+    """Sends requests to a server over HTTP, launching it first if asked to."""
+
+    def __init__(self, url: Optional[str], server_args: Optional[str]):
+        self.url = url
+        self.server_args = server_args
+        self.process = None
+
+    async def __aenter__(self):
+        if self.url is None:
+            with socket.socket() as s:
+                s.bind(("127.0.0.1", 0))
+                port = s.getsockname()[1]
+            command = [sys.executable, "-m", "remip.main", "--host", "127.0.0.1", "--port", str(port)]
+            self.process = subprocess.Popen(
+                command + shlex.split(self.server_args or ""), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            self.url = f"http://127.0.0.1:{port}"
+        self.client = httpx.AsyncClient(base_url=self.url, timeout=None, limits=httpx.Limits(max_connections=None))
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                (await self.client.get("/health")).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or (self.process is not None and self.process.poll() is not None):
+                    raise RuntimeError(f"No server answered at {self.url}")
+                await asyncio.sleep(0.1)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
+
+    async def request(self, kind: str, params: Dict[str, Any], body: bytes, cancel_after: Optional[float]):
+        """Returns `(status, response body, first event time, disconnect time)`, as perf_counter times."""
+        chunks: List[bytes] = []
+        first_event = None
+        disconnect_at = None
+        status = None
+        async with self.client.stream("POST", "/solve", params=params, content=body, headers=JSON_HEADERS) as response:
+            status = response.status_code
+            try:
+                async with asyncio.timeout(cancel_after):
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        if first_event is None and b"event: " in chunk:
+                            first_event = time.perf_counter()
+            except TimeoutError:
+                # Leaving the block unread closes the connection
+                disconnect_at = time.perf_counter()
+        return status, b"".join(chunks), first_event, disconnect_at
+
+    async def cancelled_solves(self) -> float:
+        response = await self.client.get("/metrics")
+        for line in response.text.splitlines():
+            if line.startswith('remip_solves_total{status="cancelled"}'):
+                return float(line.rsplit(" ", 1)[1])
+        return 0.0
+
+
+async def send_request(target, problems, request: Tuple[str, str, bool], arrival: float, args) -> Outcome:
+    name, kind, cancel = request
+    params: Dict[str, Any] = {}
+    if args.timeout is not None:
+        params["timeout"] = args.timeout
+    if kind == "sse":
+        params.update(stream="sse", log="false")
+    try:
+        status, body, first_event, disconnect_at = await target.request(
+            kind, params, problems[name], args.cancel_after if cancel else None
+        )
+        end = time.perf_counter()
+        outcome = Outcome(kind, name, arrival, end - arrival, "error")
+        if disconnect_at is not None:
+            outcome.status = "cancelled"
+            # In-process, the app has returned once it is done; over HTTP that is read from the metrics
+            outcome.cancel_stop = end - disconnect_at if isinstance(target, AsgiTarget) else disconnect_at
+        elif status == 200:
+            outcome.status = result_status(kind, body)
+        if first_event is not None:
+            outcome.first_event = first_event - arrival
+    except Exception as e:
+        print(f"Request failed: {e!r}", file=sys.stderr)
+        outcome = Outcome(kind, name, arrival, time.perf_counter() - arrival, "error")
+    return outcome
+
+
+async def watch_cancellations(target, interval: float, stops: List[float]):
+    """Records the times at which the server's count of cancelled solves increments."""
+    last = await target.cancelled_solves()
+    while True:
+        await asyncio.sleep(interval)
+        count = await target.cancelled_solves()
+        stops.extend([time.perf_counter()] * int(count - last))
+        last = count
+
+
+async def run_load(target, problems: Dict[str, bytes], args) -> Tuple[List[Outcome], float]:
+    rng = random.Random(args.seed)
+    names = list(problems)
+    weights = [weight for (_, _, weight) in args.mix]
+
+    def next_request() -> Tuple[str, str, bool]:
+        kind = "sse" if rng.random() < args.sse_fraction else "solve"
+        return rng.choices(names, weights)[0], kind, kind == "sse" and rng.random() < args.cancel_fraction
+
+    outcomes: List[Outcome] = []
+    stops: List[float] = []
+    watcher = None
+    if isinstance(target, HttpTarget) and args.cancel_fraction > 0:
+        watcher = asyncio.create_task(watch_cancellations(target, args.poll_interval, stops))
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    if args.rate is None:
+        # Closed loop: each client sends its next request once the previous one is answered
+        async def client():
+            while time.perf_counter() < deadline:
+                outcomes.append(await send_request(target, problems, next_request(), time.perf_counter(), args))
+
+        await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    else:
+        # Open loop: requests arrive on their own schedule and wait for one of the clients
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def arrive(request, arrival):
+            async with slots:
+                outcomes.append(await send_request(target, problems, request, arrival, args))
+
+        tasks = []
+        arrival = start
+        while (arrival := arrival + rng.expovariate(args.rate)) < deadline:
+            await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+            tasks.append(asyncio.create_task(arrive(next_request(), arrival)))
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    if watcher is not None:
+        # Wait for the last cancelled solves to stop, then match disconnects to stops in order
+        cancelled = sorted((o for o in outcomes if o.cancel_stop is not None), key=lambda o: o.cancel_stop)
+        for _ in range(int(10 / args.poll_interval)):
+            if len(stops) >= len(cancelled):
+                break
+            await asyncio.sleep(args.poll_interval)
+        watcher.cancel()
+        for outcome, stop in zip(cancelled, stops):
+            outcome.cancel_stop = max(0.0, stop - outcome.cancel_stop)
+        for outcome in cancelled[len(stops) :]:
+            outcome.cancel_stop = None
+    return outcomes, elapsed
+
+
+def summarize(outcomes: List[Outcome], elapsed: float, args) -> Dict[str, Any]:
+    answered = [o for o in outcomes if o.status not in ("cancelled", "error")]
+    statuses: Dict[str, int] = {}
+    for outcome in outcomes:
+        statuses[outcome.status] = statuses.get(outcome.status, 0) + 1
+    summary = {
+        "requests": len(outcomes),
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": len(answered) / elapsed,
+        "statuses": statuses,
+        "latency_seconds": {kind: distribution([o.latency for o in answered if o.kind == kind]) for kind in ("solve", "sse")},
+        "time_to_first_event_seconds": distribution([o.first_event for o in outcomes if o.first_event is not None]),
+        "cancel_stop_seconds": distribution([o.cancel_stop for o in outcomes if o.cancel_stop is not None]),
+    }
+    if args.timeout is not None:
+        overshoots = [o.latency - args.timeout for o in answered if o.status == "timeout"]
+        summary["timeout_overshoot_seconds"] = distribution(overshoots)
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]):
+    def row(label: str, stats: Dict[str, Any]):
+        cells = " ".join(
+            f"{'-' if stats[key] is None else f'{stats[key] * 1000:.1f}':>10}" for key in ("p50", "p95", "p99", "max")
+        )
+        print(f"{label:>26} {stats['count']:>7} {cells}")
+
+    (requests, elapsed, throughput) = (summary["requests"], summary["elapsed_seconds"], summary["throughput_per_second"])
+    print(f"{requests} requests in {elapsed:.1f} s: {throughput:.2f}/s answered")
+    print("Statuses: " + ", ".join(f"{status} {count}" for status, count in sorted(summary["statuses"].items())))
+    print(f"{'[ms]':>26} {'count':>7} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    row("/solve latency", summary["latency_seconds"]["solve"])
+    row("SSE latency", summary["latency_seconds"]["sse"])
+    row("SSE time to first event", summary["time_to_first_event_seconds"])
+    row("cancel to solve released", summary["cancel_stop_seconds"])
+    if "timeout_overshoot_seconds" in summary:
+        row("timeout overshoot", summary["timeout_overshoot_seconds"])
+
+
+def parse_mix(entry: str) -> Tuple[str, int, float]:
+    """Parses `generator:nnz[=weight]`."""
+    problem, _, weight = entry.partition("=")
+    generator, _, nnz = problem.partition(":")
+    if generator not in GENERATORS or not nnz.isdigit():
+        raise argparse.ArgumentTypeError(f"expected generator:nnz[=weight] with one of {', '.join(GENERATORS)}")
+    return generator, int(nnz), float(weight or 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--mix", type=parse_mix, nargs="+", default=[parse_mix("transportation:1000"), parse_mix("set_cover:1000")]
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Clients, i.e. the maximum of requests in flight")
+    parser.add_argument("--rate", type=float, default=None, help="Requests per second arriving at random (open loop)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds during which requests are sent")
+    parser.add_argument("--sse-fraction", type=float, default=0.5, help="Share of requests streamed as SSE")
+    parser.add_argument("--timeout", type=float, default=None, help="Solver timeout of every request, in seconds")
+    parser.add_argument("--cancel-fraction", type=float, default=0.0, help="Share of SSE requests that disconnect")
+    parser.add_argument("--cancel-after", type=float, default=0.5, help="Seconds after which those disconnect")
+    parser.add_argument("--poll-interval", type=float, default=0.02, help="Seconds between reads of a server's metrics")
+    parser.add_argument("--url", default=None, help="Load an already running server instead of the app in-process")
+    parser.add_argument("--launch", action="store_true", help="Launch a server locally and load it over HTTP")
+    parser.add_argument("--server-args", default=None, help="Arguments of the launched server, e.g. '--solver-workers 2'")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the summary and every request as JSON here")
+    args = parser.parse_args()
+
+    # PuLP 3.x deprecates `lp.constraints` as a dict, which `toDict` itself still uses
+    warnings.simplefilter("ignore", DeprecationWarning)
+    problems = {
+        f"{generator}:{nnz}": json.dumps(GENERATORS[generator](nnz, seed=args.seed).toDict()).encode("utf-8")
+        for (generator, nnz, _) in args.mix
+    }
+    target = HttpTarget(args.url, args.server_args) if args.url or args.launch else AsgiTarget()
+
+    async def run():
+        async with target:
+            return await run_load(target, problems, args)
+
+    outcomes, elapsed = asyncio.run(run())
+    summary = summarize(outcomes, elapsed, args)
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"arguments": vars(args), "summary": summary, "requests": [asdict(o) for o in outcomes]}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
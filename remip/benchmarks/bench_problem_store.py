@@ -0,0 +1,81 @@
+"""
+Benchmark for solves from the problem store.
+
+Builds random sparse problems of increasing size and reports the time from a
+request body to a SCIP model ready to solve:
+
+- `upload`: parsing the columnar CSR JSON body and building the model, as `/solve` does;
+- `store`: the one-off cost of `PUT /problems/{hash}`, which compiles the model and
+  writes it to disk as CIP;
+- `disk`: reading a stored problem and its compiled model from disk;
+- `memory`: the same with the problem still parsed in memory, as for repeat solves.
+
+Run from the `remip` directory:
+
+    uv run python benchmarks/bench_problem_store.py --sizes 10000 100000 --nnz-per-row 10
+"""
+
+import argparse
+import asyncio
+import gc
+import tempfile
+import time
+
+from bench_build_model import generate_problem
+
+from remip.parsers import parse_problem_csr_json
+from remip.solvers.scip_wrapper import ScipSolverWrapper
+from remip.store import ProblemStore, body_hash
+
+
+def best_time(run, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # Models of earlier runs are only freed by the cycle collector, which must not run in the timed section
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--nnz-per-row", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    wrapper = ScipSolverWrapper()
+    # One loop for all runs: asyncio.run formats its task, and with it the problem returned, on exit
+    run = asyncio.new_event_loop().run_until_complete
+    print(f"{'vars':>10} {'nnz':>10} {'upload [s]':>11} {'store [s]':>10} {'disk [s]':>9} {'memory [s]':>11}")
+    for size in args.sizes:
+        body = generate_problem(size, size, args.nnz_per_row).to_sparse().model_dump_json().encode()
+        hash = body_hash(body)
+
+        def upload():
+            run(wrapper._build_model(parse_problem_csr_json(body)))
+
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            run(ProblemStore(directory).put(hash, parse_problem_csr_json(body)))
+            store = time.perf_counter() - start
+
+            def from_disk():
+                stored = run(ProblemStore(directory).get(hash))
+                wrapper._read_stored_model(stored)
+
+            warm = ProblemStore(directory)
+
+            def from_memory():
+                wrapper._read_stored_model(run(warm.get(hash)))
+
+            from_memory()
+            times = [best_time(load, args.repeat) for load in (upload, from_disk, from_memory)]
+
+        print(f"{size:>10} {size * args.nnz_per_row:>10} {times[0]:>11.2f} {store:>10.2f} {times[1]:>9.2f} {times[2]:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
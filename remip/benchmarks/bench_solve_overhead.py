@@ -0,0 +1,76 @@
+"""
+Benchmark for the per-solve overhead of ScipSolverWrapper.
+
+Solves the same small problem many times with plain pyscipopt, with
+`ScipSolverWrapper.solve` and with `ScipSolverWrapper.solve_and_stream_events`,
+and reports the latency of each. For small models the wrapper's latency should
+stay close to plain SCIP's. Run from the `remip` directory:
+
+    uv run python benchmarks/bench_solve_overhead.py
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from bench_build_model import generate_problem
+from pyscipopt import Model
+
+from remip.solvers.scip_wrapper import ScipSolverWrapper
+
+
+def solve_plain(problem) -> None:
+    """Builds and solves the problem with pyscipopt only, as the baseline."""
+    model = Model()
+    model.hideOutput()
+    variables = {v.name: model.addVar(name=v.name, lb=v.lower_bound, ub=v.upper_bound) for v in problem.variables}
+    for c in problem.constraints:
+        model.addCons(sum(variables[t.name] * t.value for t in c.coefficients) <= -c.constant, name=c.name)
+    model.setObjective(sum(variables[t.name] * t.value for t in problem.objective.coefficients))
+    model.optimize()
+
+
+async def solve_wrapper(problem) -> None:
+    await ScipSolverWrapper().solve(problem)
+
+
+async def solve_stream(problem) -> None:
+    async for _ in ScipSolverWrapper().solve_and_stream_events(problem):
+        pass
+
+
+def measure(run, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20, help="Number of variables and constraints")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    problem = generate_problem(args.size, args.size, nnz_per_row=min(5, args.size))
+    loop = asyncio.new_event_loop()
+    cases = {
+        "pyscipopt": lambda: solve_plain(problem),
+        "solve": lambda: loop.run_until_complete(solve_wrapper(problem)),
+        "solve_and_stream_events": lambda: loop.run_until_complete(solve_stream(problem)),
+    }
+
+    print(f"{'path':>24} {'p50 [ms]':>10} {'p95 [ms]':>10} {'mean [ms]':>10}")
+    for name, run in cases.items():
+        measure(run, 5)  # warm up
+        timings = sorted(measure(run, args.repeat))
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{name:>24} {statistics.median(timings):>10.2f} {p95:>10.2f} {statistics.mean(timings):>10.2f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Benchmark suite covering every stage of the solve pipeline.
+
+Generates knapsack, set cover, facility location and transportation problems
+(see `generators.py`) of each given number of non-zeros and times, for each one:
+
+- `to_dict`: `lp.toDict()`, the client's JSON document (remip-client's side);
+- `validate`: decoding and validating that document as `/solve` does;
+- `build`: `ScipSolverWrapper._build_model`;
+- `solve`: SCIP, limited to `--time-limit` seconds and run once;
+- `extract`: `ScipSolverWrapper._extract_solution`;
+- `sse`: encoding the result as an SSE event;
+- `parse_solution`: `ReMIPSolver._parse_solution` updating the PuLP problem with
+  the solution (skipped if remip-client is not importable).
+
+Every case runs in a fresh process, so its peak RSS (including SCIP's memory) is
+its own; the peak after each stage shows where memory grows. The results are
+written as JSON, and `--baseline` compares them with an earlier run. Run from the
+`remip` directory, or with `make bench` from the repository root:
+
+    PYTHONPATH=../remip-client/src uv run python benchmarks/bench_suite.py --sizes 1000 10000 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import pyscipopt
+from generators import GENERATORS
+
+from remip._version import __version__
+from remip.models import ResultEvent
+from remip.parsers import JSON_MEDIA_TYPE, PARSERS
+from remip.solvers.scip_wrapper import ScipSolverWrapper
+
+try:
+    from remip_client.solver import ReMIPSolver
+except ImportError:
+    ReMIPSolver = None
+
+STAGES = ("to_dict", "validate", "build", "solve", "extract", "sse", "parse_solution")
+
+
+def peak_rss_mb() -> float:
+    """The process' peak resident set size so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1e6 if sys.platform == "darwin" else peak * 1024 / 1e6
+
+
+def best_time(run: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_case(generator: str, nnz: int, repeat: int, time_limit: float, seed: int) -> Dict[str, Any]:
+    """Runs every stage on one generated problem. Meant to run in a process of its own."""
+    # PuLP 3.x deprecates `lp.constraints` as a dict, which `toDict` itself still uses
+    warnings.simplefilter("ignore", DeprecationWarning)
+    lp = GENERATORS[generator](nnz, seed=seed)
+    stages: Dict[str, Dict[str, float]] = {}
+
+    def measure(stage: str, run: Callable[[], Any], repeat: int = repeat):
+        stages[stage] = {"seconds": best_time(run, repeat)}
+        stages[stage]["peak_rss_mb"] = round(peak_rss_mb(), 1)
+
+    # One event loop for every coroutine: asyncio.run would repr the large result of each
+    loop = asyncio.new_event_loop()
+    wrapper = ScipSolverWrapper()
+    parse = PARSERS[JSON_MEDIA_TYPE]
+
+    measure("to_dict", lp.toDict)
+    body = json.dumps(lp.toDict()).encode("utf-8")
+    measure("validate", lambda: parse(body))
+    problem = parse(body)
+    measure("build", lambda: loop.run_until_complete(wrapper._build_model(problem)))
+    model, vars = loop.run_until_complete(wrapper._build_model(problem))
+
+    model.hideOutput()
+    model.setParam("limits/time", time_limit)
+    measure("solve", model.optimize, repeat=1)
+    measure("extract", lambda: wrapper._extract_solution(model, problem, vars))
+    solution = wrapper._extract_solution(model, problem, vars)
+    event = ResultEvent(timestamp=datetime.now(timezone.utc).isoformat(), solution=solution, runtime_milliseconds=0, sequence=1)
+    measure("sse", event.to_sse)
+
+    if ReMIPSolver is not None:
+        solver = ReMIPSolver(env="cpython")
+        document = json.loads(solution.model_dump_json())
+        measure("parse_solution", lambda: solver._parse_solution(lp, document))
+    loop.close()
+
+    return {
+        "generator": generator,
+        "target_nnz": nnz,
+        "variables": len(problem.variable_names),
+        "constraints": len(problem.senses),
+        "nnz": len(problem.matrix.data),
+        "body_mb": round(len(body) / 1e6, 2),
+        "status": solution.status,
+        "stages": stages,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def print_case(case: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    times = []
+    for stage in STAGES:
+        seconds = case["stages"].get(stage, {}).get("seconds")
+        if seconds is None:
+            times.append(f"{'-':>18}")
+            continue
+        cell = f"{seconds:.4f}"
+        old = (baseline or {}).get("stages", {}).get(stage, {}).get("seconds")
+        if old:
+            cell += f" ({seconds / old:.2f}x)"
+        times.append(f"{cell:>18}")
+    print(f"{case['generator']:>18} {case['nnz']:>9} {' '.join(times)} {case['peak_rss_mb']:>9.0f} {case['status']:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generators", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=5.0, help="Seconds SCIP may spend on each problem")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_suite.json", help="Where to write the results as JSON")
+    parser.add_argument("--baseline", default=None, help="Results of an earlier run to compare with (new/old time)")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {(case["generator"], case["target_nnz"]): case for case in json.load(f)["cases"]}
+    if ReMIPSolver is None:
+        print("remip-client is not importable, so parse_solution is skipped (add ../remip-client/src to PYTHONPATH)")
+
+    header = " ".join(f"{stage + ' [s]':>18}" for stage in STAGES)
+    print(f"{'generator':>18} {'nnz':>9} {header} {'RSS [MB]':>9} {'status':>11}")
+    cases = []
+    context = multiprocessing.get_context("spawn")
+    for generator in args.generators:
+        for size in args.sizes:
+            # A fresh process per case, so that the peak RSS is the case's own
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                case = executor.submit(run_case, generator, size, args.repeat, args.time_limit, args.seed).result()
+            cases.append(case)
+            print_case(case, baseline.get((generator, size)))
+
+    results = {
+        "version": __version__,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scip": str(pyscipopt.Model().version()),
+        "pyscipopt": pyscipopt.__version__,
+        "arguments": {"repeat": args.repeat, "time_limit": args.time_limit, "seed": args.seed},
+        "cases": cases,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Generators of synthetic PuLP problems for the benchmark suite.
+
+Each generator takes the number of non-zeros of the constraint matrix to aim for
+and a seed, and returns an `LpProblem` whose size is within a few percent of it.
+Expressions are built from `(variable, coefficient)` pairs rather than with
+`lpSum`, so that generating a problem with a million non-zeros takes seconds.
+"""
+
+import random
+from typing import Callable, Dict, List, Tuple
+
+from pulp import (
+    LpAffineExpression,
+    LpConstraint,
+    LpConstraintEQ,
+    LpConstraintGE,
+    LpConstraintLE,
+    LpMaximize,
+    LpMinimize,
+    LpProblem,
+    LpVariable,
+)
+
+
+def _add(lp: LpProblem, terms: List[Tuple[LpVariable, float]], sense: int, rhs: float, name: str):
+    lp.addConstraint(LpConstraint(LpAffineExpression(terms), sense, name, rhs))
+
+
+def knapsack(nnz: int, seed: int = 0) -> LpProblem:
+    """A multi-dimensional 0-1 knapsack: items with a value and a weight in each of up to 10 dimensions."""
+    rng = random.Random(seed)
+    dimensions = max(1, min(10, nnz // 100))
+    items = max(1, nnz // dimensions)
+    lp = LpProblem(f"knapsack_{nnz}", LpMaximize)
+    x = [LpVariable(f"take_{j}", cat="Binary") for j in range(items)]
+    lp.setObjective(LpAffineExpression([(var, rng.randint(10, 100)) for var in x]))
+    for d in range(dimensions):
+        weights = [rng.randint(5, 50) for _ in range(items)]
+        _add(lp, list(zip(x, weights)), LpConstraintLE, sum(weights) // 3, f"capacity_{d}")
+    return lp
+
+
+def set_cover(nnz: int, seed: int = 0, sets_per_element: int = 10) -> LpProblem:
+    """A weighted set cover: every element must be covered by one of the sets that contain it."""
+    rng = random.Random(seed)
+    elements = max(1, nnz // sets_per_element)
+    num_sets = max(sets_per_element, elements)
+    lp = LpProblem(f"set_cover_{nnz}", LpMinimize)
+    x = [LpVariable(f"use_{j}", cat="Binary") for j in range(num_sets)]
+    lp.setObjective(LpAffineExpression([(var, rng.randint(1, 20)) for var in x]))
+    for i in range(elements):
+        terms = [(x[j], 1) for j in sorted(rng.sample(range(num_sets), sets_per_element))]
+        _add(lp, terms, LpConstraintGE, 1, f"cover_{i}")
+    return lp
+
+
+def facility_location(nnz: int, seed: int = 0) -> LpProblem:
+    """
+    An uncapacitated facility location problem: each customer is served from open
+    facilities, with the strong formulation `serve[i][j] <= open[i]`.
+    """
+    rng = random.Random(seed)
+    # Each customer and facility pair takes 3 non-zeros
+    pairs = max(1, nnz // 3)
+    facilities = max(2, int(pairs**0.5 / 5))
+    customers = max(1, pairs // facilities)
+    lp = LpProblem(f"facility_location_{nnz}", LpMinimize)
+    open_ = [LpVariable(f"open_{i}", cat="Binary") for i in range(facilities)]
+    serve = [[LpVariable(f"serve_{i}_{j}", 0, 1) for j in range(customers)] for i in range(facilities)]
+    points = [(rng.random(), rng.random()) for _ in range(facilities + customers)]
+    terms = [(var, rng.randint(500, 1500)) for var in open_]
+    for i in range(facilities):
+        (fx, fy) = points[i]
+        for j in range(customers):
+            (cx, cy) = points[facilities + j]
+            terms.append((serve[i][j], round(100 * ((fx - cx) ** 2 + (fy - cy) ** 2) ** 0.5, 3)))
+    lp.setObjective(LpAffineExpression(terms))
+    for j in range(customers):
+        _add(lp, [(serve[i][j], 1) for i in range(facilities)], LpConstraintEQ, 1, f"demand_{j}")
+    for i in range(facilities):
+        for j in range(customers):
+            _add(lp, [(serve[i][j], 1), (open_[i], -1)], LpConstraintLE, 0, f"link_{i}_{j}")
+    return lp
+
+
+def transportation(nnz: int, seed: int = 0) -> LpProblem:
+    """A balanced transportation LP: ship from sources to sinks at minimal cost."""
+    rng = random.Random(seed)
+    # Each route appears in one supply and one demand row
+    sources = max(1, int((nnz / 2) ** 0.5))
+    sinks = max(1, nnz // (2 * sources))
+    lp = LpProblem(f"transportation_{nnz}", LpMinimize)
+    ship = [[LpVariable(f"ship_{i}_{j}", 0) for j in range(sinks)] for i in range(sources)]
+    demand = [rng.randint(10, 100) for _ in range(sinks)]
+    total = sum(demand)
+    supply = [total // sources + (1 if i < total % sources else 0) for i in range(sources)]
+    lp.setObjective(LpAffineExpression([(var, rng.randint(1, 50)) for row in ship for var in row]))
+    for i in range(sources):
+        _add(lp, [(var, 1) for var in ship[i]], LpConstraintEQ, supply[i], f"supply_{i}")
+    for j in range(sinks):
+        _add(lp, [(ship[i][j], 1) for i in range(sources)], LpConstraintEQ, demand[j], f"demand_{j}")
+    return lp
+
+
+GENERATORS: Dict[str, Callable[..., LpProblem]] = {
+    "knapsack": knapsack,
+    "set_cover": set_cover,
+    "facility_location": facility_location,
+    "transportation": transportation,
+}
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Callable, Optional, Sequence, Set
+
+from .models import BatchResultEvent, MIPProblemInput, MIPSolution
+from .services import MIPSolverService
+
+logger = logging.getLogger(__name__)
+
+
+def _result(
+    index: int, started: float, solution: Optional[MIPSolution] = None, error: Optional[str] = None
+) -> BatchResultEvent:
+    return BatchResultEvent(
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        index=index,
+        solution=solution,
+        error=error,
+        runtime_milliseconds=int((time.monotonic() - started) * 1000),
+    )
+
+
+async def solve_batch(
+    problems: Sequence[MIPProblemInput],
+    service_factory: Callable[[], MIPSolverService],
+    parallelism: int,
+    timeout: Optional[float] = None,
+    time_budget: Optional[float] = None,
+) -> AsyncGenerator[BatchResultEvent, None]:
+    """
+    Solves independent problems concurrently and yields their results in completion order.
+
+    At most `parallelism` problems are solved at the same time, each by its own service.
+    `timeout` limits every solve. `time_budget` limits the whole batch: solves still running
+    when it runs out are interrupted (keeping their best solution) and problems that have
+    not started by then are reported with an error. Closing the generator stops the batch.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + time_budget if time_budget is not None else None
+    semaphore = asyncio.Semaphore(parallelism)
+    results: asyncio.Queue[BatchResultEvent] = asyncio.Queue()
+    running: Set[MIPSolverService] = set()
+
+    async def run(index: int, problem: MIPProblemInput):
+        async with semaphore:
+            started = time.monotonic()
+            solve_timeout = timeout
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    results.put_nowait(_result(index, started, error="The time budget of the batch is exhausted."))
+                    return
+                solve_timeout = remaining if timeout is None else min(timeout, remaining)
+
+            service = service_factory()
+            running.add(service)
+            try:
+                solution = await service.solve(problem, timeout=solve_timeout)
+            except Exception as e:
+                logger.exception("Problem %s of the batch failed", index)
+                results.put_nowait(_result(index, started, error=str(e)))
+            else:
+                results.put_nowait(_result(index, started, solution=solution))
+            finally:
+                running.discard(service)
+
+    def interrupt_running():
+        for service in list(running):
+            service.interrupt_solver()
+
+    tasks = [asyncio.create_task(run(index, problem)) for index, problem in enumerate(problems)]
+    # The solver's time limit does not cover model building, so enforce the budget as well
+    watchdog = loop.call_at(deadline, interrupt_running) if deadline is not None else None
+    try:
+        for _ in range(len(tasks)):
+            yield await results.get()
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+        interrupt_running()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .models import MIPProblemInput, MIPSolution, ProblemFile, StoredProblem
+
+# Only outcomes that a re-solve would reproduce exactly are worth caching.
+CACHEABLE_STATUSES = frozenset({"optimal", "infeasible"})
+
+
+def problem_key(problem: MIPProblemInput, timeout: Optional[float] = None) -> str:
+    """
+    Returns a canonical SHA-256 hash of a problem, its solver options and the timeout.
+
+    `MIPProblem`s are hashed through their sparse form, so a PuLP-style problem and the
+    equivalent `SparseMIPProblem` share a key. Files are hashed by content, and stored
+    problems by their hash and solver options.
+    """
+    digest = hashlib.sha256()
+    if isinstance(problem, StoredProblem):
+        # Stored problems are already addressed by the hash of their content
+        header = {"stored": problem.hash, "solver_options": problem.problem.solver_options, "timeout": timeout}
+        digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+    elif isinstance(problem, ProblemFile):
+        header = {
+            "format": problem.format,
+            "name": problem.name,
+            "sense": problem.sense,
+            "objective_cutoff": problem.objective_cutoff,
+            "timeout": timeout,
+        }
+        digest.update(json.dumps(header, sort_keys=True).encode("utf-8"))
+        with open(problem.path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        data = problem.to_sparse().model_dump()
+        # PuLP reports the status of its last solve here, which does not affect the next one
+        data["parameters"] = {"name": problem.parameters.name, "sense": problem.parameters.sense}
+        # A warm start only changes how fast a definitive answer is found, not the answer
+        data.pop("initial_values", None)
+        data["timeout"] = timeout
+        digest.update(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """
+    A content-addressed cache of definitive solutions.
+
+    Entries live in a bounded in-memory LRU tier. When `directory` is given, entries
+    evicted from memory spill to JSON files there (up to `max_disk_entries`) and are
+    promoted back on the next hit. Every entry expires `ttl` seconds after it was stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl: float = 3600.0,
+        directory: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, Tuple[float, MIPSolution]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.stores = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    async def key(self, problem: MIPProblemInput, timeout: Optional[float] = None) -> str:
+        """Computes the cache key of a problem off the event loop."""
+        return await asyncio.to_thread(problem_key, problem, timeout)
+
+    async def get(self, key: str) -> Optional[MIPSolution]:
+        """Returns the cached solution for `key`, or None on a miss."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, solution = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return solution
+            del self._memory[key]
+
+        if self.directory:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                await self._remember(key, *entry)
+                return entry[1]
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, solution: MIPSolution) -> bool:
+        """Stores a solution if its outcome is definitive. Returns True if it was stored."""
+        if solution.status not in CACHEABLE_STATUSES:
+            return False
+        self.stores += 1
+        await self._remember(key, time.time() + self.ttl, solution)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit/miss counters and the current size of each tier."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "stores": self.stores,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._count_disk() if self.directory else 0,
+        }
+
+    async def _remember(self, key: str, expires_at: float, solution: MIPSolution):
+        self._memory[key] = (expires_at, solution)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            old_key, (old_expires_at, old_solution) = self._memory.popitem(last=False)
+            if self.directory and old_expires_at > time.time():
+                await asyncio.to_thread(self._write_disk, old_key, old_expires_at, old_solution)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, MIPSolution]]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            os.unlink(path)  # The entry moves back to the memory tier
+        except (OSError, ValueError):
+            return None
+        if data["expires_at"] <= time.time():
+            return None
+        return data["expires_at"], MIPSolution.model_validate(data["solution"])
+
+    def _write_disk(self, key: str, expires_at: float, solution: MIPSolution):
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f'{{"expires_at":{expires_at!r},"solution":{solution.model_dump_json()}}}')
+        os.replace(tmp_path, self._path(key))
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[: len(entries) - self.max_disk_entries]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def _count_disk(self) -> int:
+        return sum(1 for e in os.scandir(self.directory) if e.name.endswith(".json"))
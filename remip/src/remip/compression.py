@@ -0,0 +1,239 @@
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+# Encodings that name the same codec
+ENCODING_ALIASES = {"x-gzip": GZIP}
+
+# At equal quality, the first encoding wins: zstd is both faster and smaller
+PREFERRED_ENCODINGS = (ZSTD, GZIP)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def available_encodings() -> List[str]:
+    """Returns the content codings this server can read and write."""
+    return [encoding for encoding in PREFERRED_ENCODINGS if encoding != ZSTD or _zstandard() is not None]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks the content coding of a response from an Accept-Encoding header.
+
+    The acceptable coding with the highest quality wins, zstd before gzip on ties. `*`
+    matches any coding the header does not list. Returns None for an identity response.
+    """
+    qualities = {}
+    for entry in (accept_encoding or "").split(","):
+        coding, *params = [part.strip().lower() for part in entry.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[ENCODING_ALIASES.get(coding, coding)] = q
+
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = qualities.get(encoding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor of one response body."""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == ZSTD:
+            zstandard = _zstandard()
+            self._codec = zstandard.ZstdCompressor(level=level).compressobj()
+            self._sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._codec = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._sync_flush = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        """Compresses a chunk. Unless `finish` is set, everything so far is flushed for the client to decode."""
+        compressed = self._codec.compress(data)
+        return compressed + (self._codec.flush() if finish else self._codec.flush(self._sync_flush))
+
+
+# zstandard's decompressobj has no output limit, so its input is fed in steps this small. One
+# byte of zstd can expand to about 32 KiB, which bounds the overshoot of a step to 32 MiB.
+_ZSTD_INPUT_STEP = 1024
+
+
+class _Decompressor:
+    """Incremental decompressor of one request body, which fails with 413 once it expands past `max_size` bytes."""
+
+    def __init__(self, encoding: str, max_size: Optional[int] = None):
+        self.encoding = encoding
+        self.max_size = max_size
+        self.size = 0
+        if encoding == ZSTD:
+            self._codec = _zstandard().ZstdDecompressor().decompressobj()
+        else:
+            self._codec = zlib.decompressobj(31)
+
+    def decompress(self, data: bytes, finish: bool) -> bytes:
+        try:
+            if self.max_size is None:
+                decompressed = self._codec.decompress(data)
+            elif self.encoding == ZSTD:
+                decompressed = b"".join(self._decompress_zstd(data))
+            else:
+                # One byte past the limit is enough to tell that it is exceeded
+                decompressed = self._codec.decompress(data, self.max_size - self.size + 1)
+                self._count(decompressed)
+        except HTTPException:
+            raise
+        except Exception as e:  # zlib.error, zstandard.ZstdError
+            raise HTTPException(status_code=400, detail=f"Invalid {self.encoding} request body: {e}")
+        if finish and not self._codec.eof:
+            raise HTTPException(status_code=400, detail=f"Truncated {self.encoding} request body")
+        return decompressed
+
+    def _decompress_zstd(self, data: bytes) -> Iterator[bytes]:
+        view = memoryview(data)
+        for start in range(0, len(data), _ZSTD_INPUT_STEP):
+            chunk = self._codec.decompress(view[start : start + _ZSTD_INPUT_STEP])
+            self._count(chunk)
+            yield chunk
+
+    def _count(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise HTTPException(status_code=413, detail=f"Decompressed request body exceeds {self.max_size} bytes")
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware for gzip and zstd compressed request and response bodies.
+
+    Request bodies with a `Content-Encoding` are decompressed while they are received,
+    so the endpoints (and uploads streamed to disk) only ever see plain bytes.
+
+    Responses are compressed with the coding negotiated from `Accept-Encoding`. Bodies
+    sent in one piece are left alone below `minimum_size` bytes. Streamed bodies (SSE,
+    NDJSON) are flushed after every chunk, so each event reaches the client as soon as
+    it is produced.
+
+    A compressed request body that expands past `max_decompressed_size` bytes is
+    rejected with 413, so a small upload cannot make the server hold gigabytes.
+    """
+
+    # Problem and solution JSON gains little from higher levels, which cost several times the
+    # CPU time (see benchmarks/bench_compression.py)
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 1,
+        zstd_level: int = 1,
+        max_decompressed_size: Optional[int] = 256 << 20,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        self.max_decompressed_size = max_decompressed_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_encoding = (headers.get("content-encoding") or "identity").strip().lower()
+        content_encoding = ENCODING_ALIASES.get(content_encoding, content_encoding)
+        if content_encoding != "identity":
+            if content_encoding not in available_encodings():
+                response = JSONResponse(
+                    {"detail": f"Unsupported Content-Encoding: {content_encoding}"},
+                    status_code=415,
+                    headers={"Accept-Encoding": ", ".join(available_encodings())},
+                )
+                await response(scope, receive, send)
+                return
+            scope, receive = self._decoding(scope, receive, content_encoding, self.max_decompressed_size)
+
+        encoding = negotiate_encoding(headers.get("accept-encoding"))
+        if encoding is not None:
+            levels = {GZIP: self.gzip_level, ZSTD: self.zstd_level}
+            send = _CompressingSend(send, encoding, levels[encoding], self.minimum_size)
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _decoding(scope: Scope, receive: Receive, encoding: str, max_size: Optional[int]) -> Tuple[Scope, Receive]:
+        """Returns the scope and receive channel of the request as if it had been sent uncompressed."""
+        skipped = (b"content-encoding", b"content-length")
+        scope = {**scope, "headers": [(key, value) for key, value in scope["headers"] if key not in skipped]}
+        decompressor = _Decompressor(encoding, max_size)
+
+        async def decoding_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                more_body = message.get("more_body", False)
+                message = {**message, "body": decompressor.decompress(message.get("body", b""), finish=not more_body)}
+            return message
+
+        return scope, decoding_receive
+
+
+class _CompressingSend:
+    """Send channel that compresses the response body, unless it is small or already encoded."""
+
+    def __init__(self, send: Send, encoding: str, level: int, minimum_size: int):
+        self._send = send
+        self._encoding = encoding
+        self._level = level
+        self._minimum_size = minimum_size
+        self._compressor: Optional[_Compressor] = None
+        self._start: Optional[Message] = None
+
+    async def __call__(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether the body is worth compressing
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start is not None:
+            start, self._start = self._start, None
+            headers = MutableHeaders(raw=list(start["headers"]))
+            headers.add_vary_header("Accept-Encoding")
+            if "content-encoding" not in headers and (more_body or len(body) >= self._minimum_size):
+                headers["Content-Encoding"] = self._encoding
+                self._compressor = _Compressor(self._encoding, self._level)
+                body = self._compressor.compress(body, finish=not more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+            await self._send({**start, "headers": headers.raw})
+        elif self._compressor is not None:
+            body = self._compressor.compress(body, finish=not more_body)
+        await self._send({**message, "body": body})
@@ -0,0 +1,210 @@
+import math
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from .metrics import milliseconds, request_timings, timed
+from .models import MIPSolution
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Media types that name the same encoding
+MEDIA_TYPE_ALIASES = {"application/x-msgpack": MSGPACK_MEDIA_TYPE}
+
+# Smallest integer type first; `array` typecodes with a fixed size on all supported platforms
+INT_DTYPES: List[Tuple[str, str, int]] = [
+    ("int8", "b", 1 << 7),
+    ("int16", "h", 1 << 15),
+    ("int32", "i", 1 << 31),
+    ("int64", "q", 1 << 63),
+]
+
+
+def _available(media_type: str) -> bool:
+    try:
+        if media_type == MSGPACK_MEDIA_TYPE:
+            import msgpack  # noqa: F401
+        elif media_type == ARROW_MEDIA_TYPE:
+            import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def negotiate_solution_media_type(accept: Optional[str]) -> str:
+    """
+    Picks the encoding of a solution from an Accept header.
+
+    The acceptable type with the highest quality wins; earlier types win ties. Encodings
+    whose library is not installed on the server are skipped, and JSON is the fallback.
+    """
+    best, best_q = JSON_MEDIA_TYPE, 0.0
+    for entry in (accept or "").split(","):
+        media_type, *params = [part.strip().lower() for part in entry.split(";")]
+        media_type = MEDIA_TYPE_ALIASES.get(media_type, media_type)
+        if media_type not in (JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE):
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q and _available(media_type):
+            best, best_q = media_type, q
+    return best
+
+
+def _values(names: List[str], values: Optional[Dict[str, float]]) -> Optional[array]:
+    """Lays out `values` along `names` as float64, with NaN where a name has no value."""
+    if values is None:
+        return None
+    if len(values) == len(names) and all(a == b for a, b in zip(values, names)):
+        return array("d", values.values())
+    nan = math.nan
+    return array("d", (values.get(name, nan) for name in names))
+
+
+def _compact_values(values: array) -> Tuple[str, array]:
+    """Returns the values as the smallest integer array that holds them exactly, or as float64."""
+    if values and all(v.is_integer() for v in values):
+        low, high = min(values), max(values)
+        for dtype, typecode, limit in INT_DTYPES:
+            if -limit <= low and high < limit:
+                return dtype, array(typecode, map(int, values))
+    return "float64", values
+
+
+def solution_columns(solution: MIPSolution) -> Dict[str, Any]:
+    """
+    Returns the columnar layout of a solution shared by the binary encodings.
+
+    Variable and constraint names are listed once; `variables` and `reduced_costs` follow
+    `variable_names`, `slacks` and `duals` follow `constraint_names`. Each is an `array`
+    (NaN where there is no value) together with its dtype, or None.
+    """
+    variable_names = list(solution.variables)
+    constraint_names = list(solution.slacks or {})
+    if solution.duals:
+        known = set(constraint_names)
+        constraint_names.extend(name for name in solution.duals if name not in known)
+
+    dtype, variables = _compact_values(_values(variable_names, solution.variables))
+    columns = {
+        "variable_names": variable_names,
+        "variables": (dtype, variables),
+        "reduced_costs": _values(variable_names, solution.reduced_costs),
+        "constraint_names": constraint_names,
+        "slacks": _values(constraint_names, solution.slacks),
+        "duals": _values(constraint_names, solution.duals),
+    }
+    for key in ("reduced_costs", "slacks", "duals"):
+        if columns[key] is not None:
+            columns[key] = ("float64", columns[key])
+    return columns
+
+
+def _scalars(solution: MIPSolution) -> Dict[str, Any]:
+    return solution.model_dump(exclude={"variables", "slacks", "duals", "reduced_costs"})
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_msgpack(solution: MIPSolution) -> bytes:
+    """
+    Encodes a solution as msgpack.
+
+    The scalar fields are kept as they are. Each array of `solution_columns` becomes
+    `{"dtype": ..., "data": <little-endian bytes>}`.
+    """
+    import msgpack
+
+    document = _scalars(solution)
+    for key, value in solution_columns(solution).items():
+        if isinstance(value, tuple):
+            dtype, values = value
+            value = {"dtype": dtype, "data": _little_endian(values)}
+        document[key] = value
+    return msgpack.packb(document, use_bin_type=True)
+
+
+def encode_arrow(solution: MIPSolution) -> bytes:
+    """
+    Encodes a solution as an Arrow IPC stream.
+
+    The stream holds one record batch with a single row, whose list columns are the
+    arrays of `solution_columns`. The scalar fields are JSON in the `remip.solution`
+    schema metadata.
+    """
+    import pyarrow as pa
+
+    types = {"float64": pa.float64(), "int8": pa.int8(), "int16": pa.int16(), "int32": pa.int32(), "int64": pa.int64()}
+    names, arrays = [], []
+    for key, value in solution_columns(solution).items():
+        if value is None:
+            arrays.append(pa.array([None], type=pa.list_(pa.float64())))
+        else:
+            if isinstance(value, tuple):
+                dtype, values = value
+                # Wraps the array's memory instead of converting element by element
+                child = pa.Array.from_buffers(types[dtype], len(values), [None, pa.py_buffer(values)])
+            else:
+                child = pa.array(value, type=pa.string())
+            arrays.append(pa.ListArray.from_arrays(pa.array([0, len(child)], type=pa.int32()), child))
+        names.append(key)
+
+    metadata = {"remip.solution": solution.model_dump_json(exclude={"variables", "slacks", "duals", "reduced_costs"})}
+    batch = pa.RecordBatch.from_arrays(arrays, names=names).replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_json(solution: MIPSolution) -> bytes:
+    """Encodes a solution as JSON, exactly as FastAPI would return it."""
+    return solution.model_dump_json().encode("utf-8")
+
+
+ENCODERS = {JSON_MEDIA_TYPE: encode_json, MSGPACK_MEDIA_TYPE: encode_msgpack, ARROW_MEDIA_TYPE: encode_arrow}
+
+
+def with_request_timings(request: Request, solution: MIPSolution) -> MIPSolution:
+    """Returns a copy of the solution whose phase timings start with those of the request, e.g. its validation."""
+    timings = {**milliseconds(request_timings(request)), **(solution.timings_milliseconds or {})}
+    if not timings:
+        return solution
+    return solution.model_copy(update={"timings_milliseconds": timings})
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """Formats phase durations in milliseconds as a `Server-Timing` header."""
+    return ", ".join(f"{phase};dur={duration}" for phase, duration in timings.items())
+
+
+def solution_response(request: Request, solution: MIPSolution) -> Response:
+    """
+    Returns the solution in the encoding negotiated with the request's Accept header.
+
+    The `Server-Timing` header lists the durations of the request's phases, including
+    the encoding of the response, which the solution's own timings cannot include.
+    """
+    media_type = negotiate_solution_media_type(request.headers.get("accept"))
+    solution = with_request_timings(request, solution)
+    # JSON is encoded here as well rather than by FastAPI, so that its time is measured too
+    serialize: Dict[str, float] = {}
+    with timed("serialize", serialize):
+        body = ENCODERS[media_type](solution)
+    timings = {**(solution.timings_milliseconds or {}), **milliseconds(serialize)}
+    return Response(body, media_type=media_type, headers={"Server-Timing": server_timing(timings)})
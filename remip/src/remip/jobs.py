@@ -0,0 +1,177 @@
+import asyncio
+import itertools
+import logging
+import os
+import urllib.request
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from .models import Job, JobPriority, MIPProblemInput
+from .services import MIPSolverService
+
+logger = logging.getLogger(__name__)
+
+# Lower ranks are served first; jobs of the same class run in submission order.
+PRIORITY_RANKS: Dict[str, int] = {"interactive": 0, "normal": 1, "batch": 2}
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Answers redirects with an error instead of following them to another URL."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+# Webhooks are only POSTed to the URL the job was submitted with.
+_webhook_opener = urllib.request.build_opener(_NoRedirectHandler)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _JobEntry:
+    """Server-side state of a job: the public `Job` plus what is needed to run it."""
+
+    __slots__ = ("job", "problem", "service", "timeout", "webhook_url")
+
+    def __init__(
+        self,
+        job: Job,
+        problem: MIPProblemInput,
+        service: MIPSolverService,
+        timeout: Optional[float],
+        webhook_url: Optional[str],
+    ):
+        self.job = job
+        self.problem: Optional[MIPProblemInput] = problem
+        self.service = service
+        self.timeout = timeout
+        self.webhook_url = webhook_url
+
+
+class JobManager:
+    """
+    Runs submitted problems on a bounded pool of asyncio workers.
+
+    At most `num_workers` solves run at the same time (one per core by default).
+    Waiting jobs are served by priority class, so interactive jobs are not stuck
+    behind batch work. Finished jobs are kept for lookup up to `max_finished_jobs`.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, max_finished_jobs: int = 1000):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_finished_jobs = max_finished_jobs
+        self._entries: Dict[str, _JobEntry] = {}
+        self._finished: OrderedDict[str, None] = OrderedDict()
+        self._counter = itertools.count()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: list[asyncio.Task] = []
+        self._notifications: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Starts the worker tasks on the running event loop."""
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+
+    async def stop(self):
+        """Interrupts running solves and stops the worker tasks."""
+        for entry in self._entries.values():
+            if entry.job.status == "running":
+                entry.service.interrupt_solver()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    @property
+    def queued(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return sum(1 for entry in self._entries.values() if entry.job.status == "queued")
+
+    def submit(
+        self,
+        problem: MIPProblemInput,
+        service: MIPSolverService,
+        priority: JobPriority = "normal",
+        timeout: Optional[float] = None,
+        webhook_url: Optional[str] = None,
+    ) -> Job:
+        """Queues a problem and returns the new job right away."""
+        self.start()
+        job = Job(id=uuid.uuid4().hex, status="queued", priority=priority, created_at=_now())
+        self._entries[job.id] = _JobEntry(job, problem, service, timeout, webhook_url)
+        self._queue.put_nowait((PRIORITY_RANKS[priority], next(self._counter), job.id))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns the job with the given id, or None if it is unknown."""
+        entry = self._entries.get(job_id)
+        return entry.job if entry else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancels a job. Queued jobs never start; running jobs are interrupted and keep
+        the best solution found so far. Finished jobs are returned unchanged.
+        """
+        entry = self._entries.get(job_id)
+        if entry is None:
+            return None
+        if entry.job.status == "queued":
+            self._finish(entry, "cancelled")
+        elif entry.job.status == "running":
+            entry.job.status = "cancelled"
+            entry.service.interrupt_solver()
+        return entry.job
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            entry = self._entries.get(job_id)
+            if entry is not None and entry.job.status == "queued":
+                await self._run(entry)
+
+    async def _run(self, entry: _JobEntry):
+        entry.job.status = "running"
+        entry.job.started_at = _now()
+        try:
+            entry.job.solution = await entry.service.solve(entry.problem, timeout=entry.timeout)
+        except Exception as e:
+            logger.exception("Job %s failed", entry.job.id)
+            entry.job.error = str(e)
+            self._finish(entry, "failed" if entry.job.status == "running" else entry.job.status)
+            return
+        self._finish(entry, "completed" if entry.job.status == "running" else entry.job.status)
+
+    def _finish(self, entry: _JobEntry, status: str):
+        entry.job.status = status
+        entry.job.finished_at = _now()
+        entry.problem = None  # Release the problem data as soon as possible
+
+        self._finished[entry.job.id] = None
+        while len(self._finished) > self.max_finished_jobs:
+            old_id, _ = self._finished.popitem(last=False)
+            self._entries.pop(old_id, None)
+
+        if entry.webhook_url:
+            task = asyncio.create_task(self._notify(entry.webhook_url, entry.job))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+
+    async def _notify(self, url: str, job: Job):
+        """POSTs the finished job to its completion webhook."""
+        request = urllib.request.Request(
+            url,
+            data=job.model_dump_json().encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            await asyncio.to_thread(lambda: _webhook_opener.open(request, timeout=10).close())
+        except Exception as e:
+            logger.warning("Webhook for job %s failed: %s", job.id, e)
@@ -1,21 +1,90 @@
 import argparse
+import asyncio
 import logging
+import os
 import socket
-from typing import AsyncGenerator
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncGenerator, Dict, Literal
 
 import uvicorn
-from fastapi import Depends, FastAPI, Query, Request
+from fastapi import Body, Depends, FastAPI, HTTPException, Path, Query, Request, Response
 from fastapi.responses import StreamingResponse
+from pydantic import HttpUrl
 from starlette.middleware.cors import CORSMiddleware
 
 from ._version import __version__
-from .models import MIPProblem, MIPSolution
+from .batch import solve_batch
+from .cache import SolutionCache
+from .compression import CompressionMiddleware
+from .encoders import server_timing, solution_response, with_request_timings
+from .jobs import JobManager
+from .metrics import (
+    CONTENT_TYPE,
+    QUEUED_SOLVES,
+    REGISTRY,
+    SSE_SUBSCRIBERS,
+    milliseconds,
+    monitor_event_loop_lag,
+    request_timings,
+    timed,
+)
+from .models import (
+    EndEvent,
+    Job,
+    JobPriority,
+    MIPProblemInput,
+    MIPSolution,
+    ModelDelta,
+    ProblemFile,
+    ResultEvent,
+    Session,
+    SparseMIPProblem,
+    StreamOptions,
+)
+from .parsers import parse_problem, parse_problem_batch, read_problem, receive_problem_file
 from .services import MIPSolverService
+from .sessions import SessionManager
+from .solvers.scip_wrapper import ProblemFileError
+from .store import ProblemStore, body_hash
+
+job_manager = JobManager()
+session_manager = SessionManager()
+# Set by `main()` when the server runs in solver-worker mode (`--solver-workers`)
+solver_pool = None
+# Set by `main()` when the solution cache is enabled (`--cache-size`)
+solution_cache: SolutionCache | None = None
+# Set by `main()` when the problem store is enabled (`--problem-store`)
+problem_store: ProblemStore | None = None
+
+
+def queued_solves() -> int:
+    """Jobs waiting for a job worker, plus solves waiting for a solver worker process."""
+    return job_manager.queued + (solver_pool.waiting if solver_pool is not None else 0)
+
+
+QUEUED_SOLVES.set_function(queued_solves)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if solver_pool is not None:
+        solver_pool.start()
+    job_manager.start()
+    session_manager.start()
+    lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    yield
+    lag_monitor.cancel()
+    await session_manager.stop()
+    await job_manager.stop()
+    if solver_pool is not None:
+        solver_pool.stop()
+
 
 app = FastAPI(
     title="ReMIP",
     description="A RESTful API for Mixed-Integer Programming (MIP) solvers.",
     version=__version__,
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -25,12 +94,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["Server-Timing"],  # Readable by browser clients, e.g. remip-client in Pyodide
 )
+# gzip/zstd request and response bodies; SSE and NDJSON streams are flushed per event
+app.add_middleware(CompressionMiddleware)
 
 
 def get_solver_service():
     """FastAPI dependency to get a solver service instance."""
-    return MIPSolverService()
+    solver = solver_pool.solver() if solver_pool is not None else None
+    return MIPSolverService(solver=solver, cache=solution_cache)
+
+
+def get_job_manager():
+    """FastAPI dependency to get the job manager."""
+    return job_manager
+
+
+def get_session_manager():
+    """FastAPI dependency to get the session manager."""
+    return session_manager
+
+
+def get_problem_store():
+    """FastAPI dependency to get the problem store, or None if it is disabled."""
+    return problem_store
 
 
 @app.get("/health")
@@ -38,46 +126,346 @@ async def health():
     return True
 
 
+@app.get("/metrics")
+async def metrics():
+    """Returns the server's metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/solver-info")
 async def solver_info():
     """Returns information about the solver."""
     return {"solver": "SCIP", "version": "x.y.z"}
 
 
+def get_stream_options(
+    log: bool = Query(True, description="Stream SCIP's raw log as log events"),
+    metrics_interval: float = Query(1.0, ge=0, description="Seconds between progress metric events (0 for all)"),
+    incumbents: bool = Query(False, description="Stream every improving solution as an incumbent event"),
+) -> StreamOptions:
+    """Dependency that reads the event selection of a streaming solve."""
+    return StreamOptions(log=log, metrics_interval=metrics_interval, incumbents=incumbents)
+
+
+async def solve_response(
+    request: Request,
+    problem: MIPProblemInput,
+    service: MIPSolverService,
+    timeout: float | None,
+    stream: str | None,
+    options: StreamOptions | None = None,
+) -> MIPSolution | StreamingResponse:
+    """Solves the problem and returns either an SSE stream of solver events or the final solution."""
+    if stream == "sse":
+        events = service.solve_stream(problem, timeout=timeout, options=options)
+        primed: list = []
+        if isinstance(problem, ProblemFile):
+            # SCIP reads the file before the first event, so an unreadable one is still answered with an error status
+            primed.append(await anext(events))
+
+        async def all_events() -> AsyncGenerator[Any, None]:
+            for event in primed:
+                yield event
+            async for event in events:
+                yield event
+
+        async def sse_generator() -> AsyncGenerator[str, None]:
+            """Generator that yields SSE events, handling client disconnects."""
+            try:
+                with SSE_SUBSCRIBERS.track():
+                    async for event in all_events():
+                        if await request.is_disconnected():
+                            print("Client disconnected, interrupting solver.")
+                            service.interrupt_solver()
+                            break
+                        if isinstance(event, ResultEvent):
+                            event = event.model_copy(update={"solution": with_request_timings(request, event.solution)})
+                            with timed("serialize"):
+                                data = event.to_sse()
+                            yield data
+                        else:
+                            yield event.to_sse()
+            except Exception as e:
+                print(f"An error occurred during streaming: {e}")
+                yield EndEvent(success=False).to_sse()
+
+        # Only the phases before the stream starts fit in its headers; the rest come with the result event
+        timings = milliseconds(request_timings(request))
+        headers = {"Server-Timing": server_timing(timings)} if timings else None
+        return StreamingResponse(sse_generator(), media_type="text/event-stream", headers=headers)
+
+    # Default behavior: solve and return the final solution, encoded as the client prefers
+    return solution_response(request, await service.solve(problem, timeout=timeout))
+
+
 @app.post("/solve")
 async def solve(
     request: Request,
-    problem: MIPProblem,
+    problem: MIPProblemInput = Depends(parse_problem),
     service: MIPSolverService = Depends(get_solver_service),
     timeout: float | None = Query(None, ge=0, description="Maximum solver time in seconds"),
     stream: str | None = Query(None, description="Enable SSE streaming of solver events"),
+    options: StreamOptions = Depends(get_stream_options),
 ) -> MIPSolution:
     """
     Solves a MIP problem and returns the solution.
 
+    The body is either a PuLP-style `MIPProblem` (`application/json`) or a columnar
+    `SparseMIPProblem`, sent as `application/vnd.remip.csr+json` or as a NumPy
+    `.npz` archive (`application/x-npz`).
+
+    The solution is returned as JSON, or as msgpack or an Arrow stream if the Accept
+    header asks for `application/msgpack` or `application/vnd.apache.arrow.stream`.
+
     If `stream=sse` is specified, it streams solver events using Server-Sent Events (SSE).
+    Metric events carry SCIP's exact bounds on every improving solution and every
+    `metrics_interval` seconds; `log=false` drops the raw log lines.
     The client can disconnect at any time, and the solver will be interrupted.
     """
+    return await solve_response(request, problem, service, timeout, stream, options)
+
+
+@app.post("/solve/file")
+async def solve_file(
+    request: Request,
+    service: MIPSolverService = Depends(get_solver_service),
+    format: Literal["mps", "lp", "cip"] = Query("mps", description="Format of the uploaded problem file"),
+    name: str | None = Query(None, description="Problem name reported in the solution"),
+    sense: Literal["minimize", "maximize"] | None = Query(None, description="Override the objective sense of the file"),
+    objective_cutoff: float | None = Query(None, description="Only search for solutions better than this value"),
+    timeout: float | None = Query(None, ge=0, description="Maximum solver time in seconds"),
+    stream: str | None = Query(None, description="Enable SSE streaming of solver events"),
+    options: StreamOptions = Depends(get_stream_options),
+) -> MIPSolution:
+    """
+    Solves a problem uploaded as an MPS, LP or CIP file and returns the solution.
+
+    The raw request body is the file itself. It is streamed to a temporary file and
+    parsed by SCIP's native readers. Streaming and timeouts behave as for `/solve`.
+    """
+    problem = await receive_problem_file(request, format=format, name=name, sense=sense, objective_cutoff=objective_cutoff)
+    try:
+        return await solve_response(request, problem, service, timeout, stream, options)
+    except ProblemFileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        # Once the solve or the first event is back, SCIP has read the file
+        os.unlink(problem.path)
+
+
+@app.post("/solve/batch")
+async def solve_batch_endpoint(
+    problems: list[SparseMIPProblem] = Depends(parse_problem_batch),
+    parallelism: int | None = Query(None, ge=1, description="Maximum number of concurrent solves"),
+    timeout: float | None = Query(None, ge=0, description="Maximum solver time in seconds per problem"),
+    time_budget: float | None = Query(None, gt=0, description="Maximum time in seconds for the whole batch"),
+    stream: Literal["ndjson", "sse"] = Query("ndjson", description="Response format"),
+) -> StreamingResponse:
+    """
+    Solves a JSON array of independent problems concurrently.
+
+    Each result is streamed as soon as its solve finishes, in completion order, with the
+    index of its problem in the request. Results are NDJSON lines, or `batch_result`
+    SSE events followed by an `end` event with `stream=sse`.
+    """
+    if parallelism is None:
+        parallelism = solver_pool.num_workers if solver_pool is not None else os.cpu_count() or 1
+    results = solve_batch(problems, get_solver_service, parallelism, timeout=timeout, time_budget=time_budget)
 
     if stream == "sse":
 
         async def sse_generator() -> AsyncGenerator[str, None]:
-            """Generator that yields SSE events, handling client disconnects."""
-            try:
-                async for event in service.solve_stream(problem, timeout=timeout):
-                    if await request.is_disconnected():
-                        print("Client disconnected, interrupting solver.")
-                        service.interrupt_solver()
-                        break
-                    yield event.to_sse()
-            except Exception as e:
-                print(f"An error occurred during streaming: {e}")
+            success = True
+            with SSE_SUBSCRIBERS.track():
+                async with aclosing(results):
+                    async for result in results:
+                        success = success and result.error is None
+                        yield result.to_sse()
+                yield EndEvent(success=success).to_sse()
 
         return StreamingResponse(sse_generator(), media_type="text/event-stream")
 
-    # Default behavior: solve and return the final solution
-    solution = await service.solve(problem, timeout=timeout)
-    return solution
+    async def ndjson_generator() -> AsyncGenerator[str, None]:
+        # Closing the response (e.g. on a client disconnect) stops the remaining solves
+        async with aclosing(results):
+            async for result in results:
+                yield result.to_ndjson()
+
+    return StreamingResponse(ndjson_generator(), media_type="application/x-ndjson")
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Returns the solution cache's hit/miss counters."""
+    if solution_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **solution_cache.stats()}
+
+
+ProblemHash = Path(pattern="^[0-9a-f]{64}$", description="SHA-256 of the problem's request body, in hex")
+
+
+@app.head("/problems/{hash}")
+async def has_problem(hash: str = ProblemHash, store: ProblemStore | None = Depends(get_problem_store)):
+    """Answers 200 if the problem is stored, so that its upload can be skipped, and 404 otherwise."""
+    if store is None or hash not in store:
+        return Response(status_code=404)
+    return Response(status_code=200)
+
+
+@app.put("/problems/{hash}")
+async def put_problem(request: Request, hash: str = ProblemHash, store: ProblemStore | None = Depends(get_problem_store)):
+    """
+    Stores a problem under the SHA-256 of its body and compiles its SCIP model.
+
+    The body is the same as for `/solve`. Answers 201 once the problem is stored, or
+    200 if it already was.
+    """
+    if store is None:
+        raise HTTPException(status_code=501, detail="The problem store is disabled")
+    body, parser = await read_problem(request)
+    if body_hash(body) != hash:
+        raise HTTPException(status_code=400, detail="The body does not match its hash")
+    if hash in store:
+        return Response(status_code=200)
+    created = await store.put(hash, parser(body).to_sparse())
+    return Response(status_code=201 if created else 200)
+
+
+@app.post("/problems/{hash}/solve")
+async def solve_stored_problem(
+    request: Request,
+    hash: str = ProblemHash,
+    solver_options: Dict[str, Any] | None = Body(None, embed=True),
+    store: ProblemStore | None = Depends(get_problem_store),
+    service: MIPSolverService = Depends(get_solver_service),
+    timeout: float | None = Query(None, ge=0, description="Maximum solver time in seconds"),
+    stream: str | None = Query(None, description="Enable SSE streaming of solver events"),
+    options: StreamOptions = Depends(get_stream_options),
+) -> MIPSolution:
+    """
+    Solves a stored problem with its compiled model, skipping the upload and the model build.
+
+    An optional JSON body `{"solver_options": {...}}` overrides the problem's SCIP
+    parameters for this solve. Answers 404 if the problem is not stored (anymore).
+    Streaming and timeouts behave as for `/solve`.
+    """
+    stored = await store.get(hash) if store is not None else None
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    if solver_options:
+        problem = stored.problem
+        merged = {**(problem.solver_options or {}), **solver_options}
+        stored = stored.model_copy(update={"problem": problem.model_copy(update={"solver_options": merged})})
+
+    return await solve_response(request, stored, service, timeout, stream, options)
+
+
+@app.get("/problems/stats")
+async def problem_store_stats(store: ProblemStore | None = Depends(get_problem_store)):
+    """Returns the problem store's counters and size."""
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.stats()}
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    problem: MIPProblemInput = Depends(parse_problem),
+    service: MIPSolverService = Depends(get_solver_service),
+    jobs: JobManager = Depends(get_job_manager),
+    priority: JobPriority = Query("normal", description="Scheduling class of the job"),
+    timeout: float | None = Query(None, ge=0, description="Maximum solver time in seconds"),
+    webhook_url: HttpUrl | None = Query(None, description="http(s) URL that receives the finished job as a JSON POST"),
+) -> Job:
+    """
+    Queues a problem for asynchronous solving and returns the job immediately.
+
+    The body is the same as for `/solve`. Poll `GET /jobs/{job_id}` for the result.
+    """
+    return jobs.submit(
+        problem, service, priority=priority, timeout=timeout, webhook_url=str(webhook_url) if webhook_url else None
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)) -> Job:
+    """Returns the status of a job, including its solution once it has finished."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str, jobs: JobManager = Depends(get_job_manager)) -> Job:
+    """Cancels a queued job or interrupts a running one."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/sessions", status_code=201)
+async def create_session(
+    problem: MIPProblemInput = Depends(parse_problem),
+    sessions: SessionManager = Depends(get_session_manager),
+    reoptimize: bool = Query(False, description="Use SCIP's reoptimization for objective-only changes"),
+) -> Session:
+    """
+    Builds a model once and keeps it on the server for repeated solves.
+
+    The body is the same as for `/solve`. Re-solve it with `POST /sessions/{session_id}/solve`.
+    """
+    if isinstance(problem, ProblemFile):
+        raise HTTPException(status_code=415, detail="Sessions cannot be created from problem files")
+    session = await sessions.create(problem, reoptimize=reoptimize)
+    if session is None:
+        raise HTTPException(status_code=503, detail="Too many active sessions")
+    return session
+
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str, sessions: SessionManager = Depends(get_session_manager)) -> Session:
+    """Returns a session."""
+    entry = sessions.get(session_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return entry.session
+
+
+@app.post("/sessions/{session_id}/solve")
+async def solve_session(
+    request: Request,
+    session_id: str,
+    delta: ModelDelta | None = Body(None),
+    sessions: SessionManager = Depends(get_session_manager),
+    timeout: float | None = Query(None, ge=0, description="Maximum solver time in seconds"),
+    stream: str | None = Query(None, description="Enable SSE streaming of solver events"),
+    options: StreamOptions = Depends(get_stream_options),
+) -> MIPSolution:
+    """
+    Applies an optional delta to the model of a session and re-solves it.
+
+    Changes are kept for later solves. Streaming and timeouts behave as for `/solve`.
+    """
+    entry = sessions.get(session_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        entry.check(delta)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return await solve_response(request, delta, MIPSolverService(solver=entry), timeout, stream, options)
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def close_session(session_id: str, sessions: SessionManager = Depends(get_session_manager)):
+    """Closes a session and frees its model."""
+    if not sessions.close(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return Response(status_code=204)
 
 
 def main():
@@ -88,8 +476,47 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=0)
     parser.add_argument("--host", default="localhost")
+    parser.add_argument("--job-workers", type=int, default=0, help="Concurrent /jobs solves (default: number of cores)")
+    parser.add_argument(
+        "--solver-workers",
+        type=int,
+        default=None,
+        help="Run solves in a pool of N worker processes (0: one per core) instead of in-process threads",
+    )
+    parser.add_argument("--pin-cpus", action="store_true", help="Pin each solver worker process to its own core")
+    parser.add_argument(
+        "--cache-size", type=int, default=0, help="Cache up to N optimal/infeasible solutions in memory (0: disabled)"
+    )
+    parser.add_argument("--cache-ttl", type=float, default=3600.0, help="Seconds a cached solution stays valid")
+    parser.add_argument("--cache-dir", default=None, help="Spill solutions evicted from memory to this directory")
+    parser.add_argument("--problem-store", default=None, help="Keep uploaded problems and their compiled models here")
+    parser.add_argument(
+        "--problem-store-size", type=float, default=10.0, help="Gigabytes of problems kept before the oldest are removed"
+    )
+    parser.add_argument("--session-ttl", type=float, default=600.0, help="Close sessions idle for this many seconds")
+    parser.add_argument("--max-sessions", type=int, default=16, help="Maximum number of resident session models")
     args = parser.parse_args()
 
+    if args.cache_size > 0:
+        global solution_cache
+        solution_cache = SolutionCache(max_entries=args.cache_size, ttl=args.cache_ttl, directory=args.cache_dir)
+
+    if args.problem_store:
+        global problem_store
+        problem_store = ProblemStore(args.problem_store, max_bytes=int(args.problem_store_size * (1 << 30)))
+
+    session_manager.idle_ttl = args.session_ttl
+    session_manager.max_sessions = args.max_sessions
+
+    if args.job_workers:
+        job_manager.num_workers = args.job_workers
+
+    if args.solver_workers is not None:
+        global solver_pool
+        from .solvers.process_pool import SolverProcessPool
+
+        solver_pool = SolverProcessPool(num_workers=args.solver_workers, pin_cpus=args.pin_cpus)
+
     try:
         port = args.port or 8000  # Default port
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -0,0 +1,283 @@
+import asyncio
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from a small model's build to a long solve
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """A metric family: one child per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self.labels()  # Exposed as 0 before its first use
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values: str):
+        """Returns the child of the given label values, creating it on first use."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._child())
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        """The child of a metric without labels."""
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return lines
+
+    def _samples(self, values: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, values)} {_format(child.get())}"]
+
+
+class _Value:
+    __slots__ = ("value", "function", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def set_function(self, function: Callable[[], float]):
+        """Reads the value from `function` whenever the metric is scraped."""
+        self.function = function
+
+    def get(self) -> float:
+        return float(self.function()) if self.function is not None else self.value
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, or is read from a function at scrape time."""
+
+    kind = "gauge"
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default().set_function(function)
+
+    def get(self) -> float:
+        return self._default().get()
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Counts the block as in progress while it runs."""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _Buckets:
+    __slots__ = ("upper_bounds", "counts", "sum", "lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.upper_bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Counts observations, e.g. durations in seconds, into cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def _samples(self, values: Tuple[str, ...], child: _Buckets) -> List[str]:
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        lines = []
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            le = 'le="' + _format(upper_bound) + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The metrics exposed together on one endpoint."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"A metric named {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SOLVE_STAGE_SECONDS = Histogram(
+    "remip_solve_stage_seconds",
+    "Time spent in each stage of the solve pipeline: validate, build, presolve, solve, extract and serialize.",
+    ["stage"],
+)
+SOLVES = Counter("remip_solves_total", "Finished solves by solution status, or 'error' if the solve failed.", ["status"])
+ACTIVE_SOLVES = Gauge("remip_active_solves", "Solves currently running.")
+QUEUED_SOLVES = Gauge("remip_queued_solves", "Jobs and solves waiting for a worker.")
+SSE_SUBSCRIBERS = Gauge("remip_sse_subscribers", "Open Server-Sent Events streams.")
+EVENT_LOOP_LAG = Gauge("remip_event_loop_lag_seconds", "How late the event loop last woke up a sleeping task.")
+
+STAGES = ("validate", "build", "presolve", "solve", "extract", "serialize")
+
+for _stage in STAGES:
+    SOLVE_STAGE_SECONDS.labels(_stage)
+
+
+def observe_stages(timings: Dict[str, float]):
+    """Records stage durations measured elsewhere, e.g. in a solver worker process."""
+    for stage, seconds in timings.items():
+        SOLVE_STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def record_stage(stage: str, seconds: float, timings: Optional[Dict[str, float]] = None):
+    """Observes the duration of a stage of the solve pipeline, and also stores it in `timings`."""
+    SOLVE_STAGE_SECONDS.labels(stage).observe(seconds)
+    if timings is not None:
+        timings[stage] = seconds
+
+
+@contextmanager
+def timed(stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+    """Records the duration of the block as a stage of the solve pipeline."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, timings)
+
+
+def request_timings(request) -> Dict[str, float]:
+    """The durations of the stages measured for a request so far, in seconds."""
+    timings = getattr(request.state, "timings", None)
+    if timings is None:
+        timings = request.state.timings = {}
+    return timings
+
+
+def milliseconds(timings: Dict[str, float]) -> Dict[str, float]:
+    """Converts stage durations from seconds to milliseconds, to the microsecond."""
+    return {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()}
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Measures how much later than requested the event loop resumes a sleep, until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(loop.time() - start - interval, 0.0))
@@ -1,6 +1,17 @@
-from typing import Any, Dict, List, Literal, Optional, Union
+from array import array
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, model_validator
+
+
+def _as_list(values):
+    return values.tolist() if isinstance(values, array) else values
+
+
+# Columns that the server fills with typed `array`s (8 bytes per value instead of a Python
+# object each) when it builds a problem itself. They are always serialized as lists.
+FloatArray = Annotated[List[float], PlainSerializer(_as_list)]
+IntArray = Annotated[List[int], PlainSerializer(_as_list)]
 
 
 class Parameters(BaseModel):
@@ -47,6 +58,157 @@ class MIPProblem(BaseModel):
     sos1: List[Dict] = []
     sos2: List[Dict] = []
     solver_options: Optional[Dict[str, Any]] = None
+    # Only solutions strictly better than this objective value are searched for
+    objective_cutoff: Optional[float] = None
+
+    def to_sparse(self) -> "SparseMIPProblem":
+        """
+        Converts the problem into the columnar CSR representation.
+
+        Duplicate coefficients keep their last value and unknown variable names are dropped,
+        which is how the solver has always interpreted the PuLP format.
+        """
+        index = {v.name: j for j, v in enumerate(self.variables)}
+
+        indptr = array("q", [0])
+        indices = array("i")
+        data = array("d")
+        for const_data in self.constraints:
+            row: Dict[int, float] = {}
+            for c in const_data.coefficients:
+                j = index.get(c.name)
+                if j is not None:
+                    row[j] = c.value
+            indices.extend(row.keys())
+            data.extend(row.values())
+            indptr.append(len(indices))
+
+        objective = array("d", bytes(8 * len(self.variables)))
+        for c in self.objective.coefficients:
+            j = index.get(c.name)
+            if j is not None:
+                objective[j] = c.value
+
+        # Values of a previous solve (PuLP's varValue) become the warm start
+        initial_values = [v.value for v in self.variables]
+
+        # The data is consistent by construction, so skip re-validating it.
+        return SparseMIPProblem.model_construct(
+            parameters=self.parameters,
+            variable_names=[v.name for v in self.variables],
+            categories=[v.category for v in self.variables],
+            lower_bounds=[v.lower_bound for v in self.variables],
+            upper_bounds=[v.upper_bound for v in self.variables],
+            objective=objective,
+            constraint_names=[c.name for c in self.constraints],
+            senses=[c.sense for c in self.constraints],
+            rhs=array("d", [-c.constant if c.constant is not None else 0.0 for c in self.constraints]),
+            matrix=SparseMatrix.model_construct(indptr=indptr, indices=indices, data=data),
+            sos1=self.sos1,
+            sos2=self.sos2,
+            solver_options=self.solver_options,
+            initial_values=initial_values if any(v is not None for v in initial_values) else None,
+            objective_cutoff=self.objective_cutoff,
+        )
+
+
+class SparseMatrix(BaseModel):
+    """
+    A constraint matrix in compressed sparse row (CSR) layout.
+
+    The column indices and values of row `i` are `indices[indptr[i]:indptr[i + 1]]`
+    and `data[indptr[i]:indptr[i + 1]]`.
+    """
+
+    indptr: IntArray
+    indices: IntArray
+    data: FloatArray
+
+
+class SparseMIPProblem(BaseModel):
+    """
+    Columnar representation of a MIP problem.
+
+    Variables are referenced by their position in `variable_names`, so each name is sent
+    only once, and the constraints are given as a CSR matrix with `senses` and `rhs` arrays.
+    Senses follow PuLP: -1 for <=, 0 for ==, 1 for >=. `initial_values` is an optional
+    (possibly partial) starting solution, with `None` for variables without a value.
+    """
+
+    parameters: Parameters
+    variable_names: List[str]
+    categories: List[str]
+    lower_bounds: List[Optional[float]]
+    upper_bounds: List[Optional[float]]
+    objective: FloatArray
+    constraint_names: Optional[List[Optional[str]]] = None
+    senses: List[int]
+    rhs: FloatArray
+    matrix: SparseMatrix
+    sos1: List[Dict] = []
+    sos2: List[Dict] = []
+    solver_options: Optional[Dict[str, Any]] = None
+    initial_values: Optional[List[Optional[float]]] = None
+    objective_cutoff: Optional[float] = None
+
+    @model_validator(mode="after")
+    def _check_shapes(self) -> "SparseMIPProblem":
+        num_vars = len(self.variable_names)
+        for field in ("categories", "lower_bounds", "upper_bounds", "objective"):
+            if len(getattr(self, field)) != num_vars:
+                raise ValueError(f"{field} must have the same length as variable_names")
+        if self.initial_values is not None and len(self.initial_values) != num_vars:
+            raise ValueError("initial_values must have the same length as variable_names")
+
+        num_rows = len(self.senses)
+        if len(self.rhs) != num_rows:
+            raise ValueError("rhs must have the same length as senses")
+        if self.constraint_names is not None and len(self.constraint_names) != num_rows:
+            raise ValueError("constraint_names must have the same length as senses")
+        if any(s not in (-1, 0, 1) for s in self.senses):
+            raise ValueError("senses must be -1, 0 or 1")
+
+        indptr, indices = self.matrix.indptr, self.matrix.indices
+        if len(indptr) != num_rows + 1 or indptr[0] != 0:
+            raise ValueError("matrix.indptr must start at 0 and have one more entry than senses")
+        if any(a > b for a, b in zip(indptr, indptr[1:])):
+            raise ValueError("matrix.indptr must be non-decreasing")
+        if indptr[-1] != len(indices) or len(indices) != len(self.matrix.data):
+            raise ValueError("matrix.indices and matrix.data must both have indptr[-1] entries")
+        if indices and (min(indices) < 0 or max(indices) >= num_vars):
+            raise ValueError("matrix.indices must refer to entries of variable_names")
+        return self
+
+    def to_sparse(self) -> "SparseMIPProblem":
+        return self
+
+
+class ProblemFile(BaseModel):
+    """
+    A problem stored in a file that SCIP parses with its native readers (MPS, LP, CIP).
+    """
+
+    path: str
+    format: str = "mps"
+    name: Optional[str] = None
+    sense: Optional[Literal["minimize", "maximize"]] = None
+    objective_cutoff: Optional[float] = None
+
+
+class StoredProblem(BaseModel):
+    """
+    A problem of the problem store: its data and the model SCIP compiled from it, written as CIP.
+
+    The model does not hold the problem's solver options, objective cutoff or initial
+    values; they are applied from `problem` when it is read.
+    """
+
+    hash: str
+    path: str
+    problem: SparseMIPProblem
+
+
+MIPProblemInput = Union[MIPProblem, SparseMIPProblem, ProblemFile, StoredProblem]
 
 
 class MIPSolution(BaseModel):
@@ -62,9 +224,70 @@ class MIPSolution(BaseModel):
     slacks: Optional[Dict[str, float]] = None
     duals: Optional[Dict[str, float]] = None
     reduced_costs: Optional[Dict[str, float]] = None
+    # Whether SCIP accepted the supplied starting solution (None if there was none)
+    warm_start_accepted: Optional[bool] = None
+    # Milliseconds spent in each phase of the request: validate, build, presolve, solve and extract
+    timings_milliseconds: Optional[Dict[str, float]] = None
+
+
+JobStatus = Literal["queued", "running", "completed", "failed", "cancelled"]
+JobPriority = Literal["interactive", "normal", "batch"]
+
+
+class Job(BaseModel):
+    """
+    Represents an asynchronous solve submitted to `/jobs`.
+    """
+
+    id: str
+    status: JobStatus
+    priority: JobPriority
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    solution: Optional[MIPSolution] = None
+    error: Optional[str] = None
+
+
+class ModelDelta(BaseModel):
+    """
+    Changes applied to the model of a session before it is re-solved.
+
+    Variables and constraints are referenced by name. A `None` bound removes the bound.
+    `rhs` follows `SparseMIPProblem`: it is the right-hand side of <= and >= constraints
+    and both sides of == constraints.
+    """
+
+    lower_bounds: Dict[str, Optional[float]] = {}
+    upper_bounds: Dict[str, Optional[float]] = {}
+    objective: Dict[str, float] = {}
+    rhs: Dict[str, float] = {}
+
+
+class Session(BaseModel):
+    """
+    Represents a model kept resident on the server for repeated what-if solves.
+    """
+
+    id: str
+    name: str
+    num_variables: int
+    num_constraints: int
+    reoptimize: bool = False
+    solves: int = 0
+    created_at: str
+    last_used_at: str
 
 
 # SSE Event Models
+class StreamOptions(BaseModel):
+    """Which events a streaming solve sends besides the result."""
+
+    log: bool = True  # Send SCIP's raw log as LogEvents
+    metrics_interval: Optional[float] = Field(1.0, ge=0)  # Seconds between progress metrics; None for none
+    incumbents: bool = False  # Send an IncumbentEvent for every improving solution
+
+
 class LogEvent(BaseModel):
     type: Literal["log"] = "log"
     timestamp: str
@@ -80,9 +303,29 @@ class LogEvent(BaseModel):
 class MetricEvent(BaseModel):
     type: Literal["metric"] = "metric"
     timestamp: str
-    objective_value: float
+    objective_value: float  # Primal bound; +/-inf until a solution is found
     gap: float
-    iteration: int
+    iteration: int  # LP iterations
+    sequence: int
+    dual_bound: Optional[float] = None
+    nodes: Optional[int] = None
+    elapsed_seconds: Optional[float] = None
+    trigger: Optional[Literal["best_solution", "progress"]] = None
+
+    def to_sse(self) -> str:
+        return f"event: {self.type}\ndata: {self.model_dump_json()}\n\n"
+
+
+class IncumbentEvent(BaseModel):
+    """An improving solution, given as the variables whose values changed since the previous one.
+
+    Before the first incumbent, every variable counts as 0.
+    """
+
+    type: Literal["incumbent"] = "incumbent"
+    timestamp: str
+    objective_value: float
+    variables: Dict[str, float]
     sequence: int
 
     def to_sse(self) -> str:
@@ -108,4 +351,21 @@ class EndEvent(BaseModel):
         return f"event: {self.type}\ndata: {self.model_dump_json()}\n\n"
 
 
-SolverEvent = Union[LogEvent, MetricEvent, ResultEvent, EndEvent]
+SolverEvent = Union[LogEvent, MetricEvent, IncumbentEvent, ResultEvent, EndEvent]
+
+
+class BatchResultEvent(BaseModel):
+    """The outcome of one problem of a `/solve/batch` request, identified by its index."""
+
+    type: Literal["batch_result"] = "batch_result"
+    timestamp: str
+    index: int
+    solution: Optional[MIPSolution] = None
+    error: Optional[str] = None
+    runtime_milliseconds: int
+
+    def to_sse(self) -> str:
+        return f"event: {self.type}\ndata: {self.model_dump_json()}\n\n"
+
+    def to_ndjson(self) -> str:
+        return f"{self.model_dump_json()}\n"
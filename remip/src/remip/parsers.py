@@ -0,0 +1,337 @@
+import io
+import json
+import math
+import os
+import tempfile
+import zipfile
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from .metrics import request_timings, timed
+from .models import MIPProblem, MIPProblemInput, Parameters, ProblemFile, SparseMatrix, SparseMIPProblem
+
+JSON_MEDIA_TYPE = "application/json"
+CSR_JSON_MEDIA_TYPE = "application/vnd.remip.csr+json"
+NPZ_MEDIA_TYPE = "application/x-npz"
+
+# Array entries of an `.npz` body. Everything else (parameters, SOS, solver options)
+# is carried as a JSON document in the `meta` entry.
+NPZ_ARRAYS = (
+    "variable_names",
+    "categories",
+    "lower_bounds",
+    "upper_bounds",
+    "objective",
+    "constraint_names",
+    "senses",
+    "rhs",
+    "indptr",
+    "indices",
+    "data",
+    "initial_values",
+)
+
+
+MIP_PROBLEM_LIST = TypeAdapter(List[MIPProblem])
+
+# Field names of `Variable` that pydantic accepts in place of PuLP's keys (`cat`, `lowBound`, ...)
+VARIABLE_FIELD_NAMES = frozenset({"category", "lower_bound", "upper_bound", "value", "reduced_cost"})
+
+
+class _Unsupported(Exception):
+    """A document that the fast path cannot decode exactly as pydantic would."""
+
+
+# Errors on which the fast path hands the document over to pydantic
+FAST_PATH_ERRORS = (ValueError, TypeError, KeyError, OverflowError, _Unsupported)
+
+
+def _media_type(request: Request) -> str:
+    content_type = request.headers.get("content-type") or JSON_MEDIA_TYPE
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def _number(value: Any) -> float:
+    if type(value) is float or type(value) is int:
+        return float(value)
+    raise _Unsupported
+
+
+def _optional_number(value: Any) -> Optional[float]:
+    return None if value is None else _number(value)
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    if value is None or type(value) is str:
+        return value
+    raise _Unsupported
+
+
+def _dict_list(value: Any) -> List[Dict]:
+    if type(value) is not list or any(type(item) is not dict for item in value):
+        raise _Unsupported
+    return value
+
+
+def _collect_row(coefficients: Any, index: Dict[str, int]) -> Dict[int, float]:
+    """Returns a coefficient list by variable position; later duplicates win and unknown names are dropped."""
+    if type(coefficients) is not list:
+        raise _Unsupported
+    row: Dict[int, float] = {}
+    for c in coefficients:
+        name, value = c["name"], c["value"]
+        if type(name) is not str or (type(value) is not float and type(value) is not int):
+            raise _Unsupported
+        j = index.get(name)
+        if j is not None:
+            row[j] = value
+    return row
+
+
+def _problem_from_document(document: Any) -> SparseMIPProblem:
+    """
+    Converts a decoded PuLP-style document straight into the result of `MIPProblem.to_sparse`.
+
+    Values are checked against the `MIPProblem` schema, but only in their canonical JSON
+    types: anything pydantic would coerce or reject raises one of FAST_PATH_ERRORS.
+    """
+    if type(document) is not dict:
+        raise _Unsupported
+    parameters = Parameters.model_validate(document["parameters"])
+
+    variables = document["variables"]
+    if type(variables) is not list:
+        raise _Unsupported
+    variable_names, categories, lower_bounds, upper_bounds, initial_values = [], [], [], [], []
+    for v in variables:
+        if type(v) is not dict or not VARIABLE_FIELD_NAMES.isdisjoint(v):
+            raise _Unsupported
+        name, category = v["name"], v["cat"]
+        if type(name) is not str or type(category) is not str:
+            raise _Unsupported
+        variable_names.append(name)
+        categories.append(category)
+        lower_bounds.append(_optional_number(v.get("lowBound")))
+        upper_bounds.append(_optional_number(v.get("upBound")))
+        initial_values.append(_optional_number(v.get("varValue")))
+        _optional_number(v.get("dj"))
+    index = {name: j for j, name in enumerate(variable_names)}
+
+    objective_document = document["objective"]
+    if type(objective_document) is not dict:
+        raise _Unsupported
+    _optional_str(objective_document.get("name"))
+    objective = array("d", bytes(8 * len(variable_names)))
+    for j, value in _collect_row(objective_document["coefficients"], index).items():
+        objective[j] = value
+
+    constraints = document["constraints"]
+    if type(constraints) is not list:
+        raise _Unsupported
+    constraint_names, senses, rhs = [], [], array("d")
+    indptr, indices, data = array("q", [0]), array("i"), array("d")
+    for i, c in enumerate(constraints):
+        constraints[i] = None  # Each row's objects are freed as soon as it is converted
+        if type(c) is not dict or type(c["sense"]) is not int:
+            raise _Unsupported
+        _optional_number(c.get("pi"))
+        constant = _optional_number(c.get("constant"))
+        row = _collect_row(c["coefficients"], index)
+        indices.extend(row.keys())
+        data.extend(row.values())
+        indptr.append(len(indices))
+        constraint_names.append(_optional_str(c.get("name")))
+        senses.append(c["sense"])
+        rhs.append(-constant if constant is not None else 0.0)
+
+    solver_options = document.get("solver_options")
+    if solver_options is not None and type(solver_options) is not dict:
+        raise _Unsupported
+
+    # The data is consistent by construction, so skip re-validating it.
+    return SparseMIPProblem.model_construct(
+        parameters=parameters,
+        variable_names=variable_names,
+        categories=categories,
+        lower_bounds=lower_bounds,
+        upper_bounds=upper_bounds,
+        objective=objective,
+        constraint_names=constraint_names,
+        senses=senses,
+        rhs=rhs,
+        matrix=SparseMatrix.model_construct(indptr=indptr, indices=indices, data=data),
+        sos1=_dict_list(document.get("sos1", [])),
+        sos2=_dict_list(document.get("sos2", [])),
+        solver_options=solver_options,
+        initial_values=initial_values if any(v is not None for v in initial_values) else None,
+        objective_cutoff=_optional_number(document.get("objective_cutoff")),
+    )
+
+
+def parse_problem_json(body: bytes) -> SparseMIPProblem:
+    """
+    Parses a PuLP-style `MIPProblem` JSON document into its columnar form.
+
+    The document is decoded in one pass into a name table and typed arrays, without a
+    pydantic object per variable, constraint and coefficient. Documents the fast path does
+    not handle (including every invalid one) are validated as `MIPProblem` instead, so
+    the result and the validation errors are the same either way.
+    """
+    try:
+        return _problem_from_document(json.loads(body.decode("utf-8")))
+    except FAST_PATH_ERRORS:
+        return MIPProblem.model_validate_json(body).to_sparse()
+
+
+def parse_problem_batch_json(body: bytes) -> List[SparseMIPProblem]:
+    """Parses a JSON array of PuLP-style `MIPProblem` documents into their columnar form."""
+    try:
+        documents = json.loads(body.decode("utf-8"))
+        if type(documents) is not list:
+            raise _Unsupported
+        return [_problem_from_document(document) for document in documents]
+    except FAST_PATH_ERRORS:
+        return [problem.to_sparse() for problem in MIP_PROBLEM_LIST.validate_json(body)]
+
+
+def parse_problem_csr_json(body: bytes) -> SparseMIPProblem:
+    """Parses a columnar `SparseMIPProblem` JSON document."""
+    return SparseMIPProblem.model_validate_json(body)
+
+
+def parse_problem_npz(body: bytes) -> SparseMIPProblem:
+    """
+    Parses a NumPy `.npz` archive holding the arrays of a `SparseMIPProblem`.
+
+    Infinite bounds are mapped to `None`, empty constraint names to unnamed constraints
+    and NaN initial values to variables without a starting value.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise HTTPException(status_code=415, detail=f"{NPZ_MEDIA_TYPE} bodies require numpy on the server.")
+
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            arrays = {key: archive[key].tolist() for key in NPZ_ARRAYS if key in archive.files}
+            meta = json.loads(archive["meta"].item()) if "meta" in archive.files else {}
+        if not isinstance(meta, dict):
+            raise ValueError("meta must be a JSON object")
+
+        for key in ("lower_bounds", "upper_bounds"):
+            if key in arrays:
+                arrays[key] = [None if math.isinf(b) else b for b in arrays[key]]
+        if "initial_values" in arrays:
+            arrays["initial_values"] = [None if math.isnan(v) else v for v in arrays["initial_values"]]
+        if "constraint_names" in arrays:
+            arrays["constraint_names"] = [name or None for name in arrays["constraint_names"]]
+    # A truncated archive raises BadZipFile, and arrays of the wrong shape or type TypeError
+    except (OSError, ValueError, TypeError, KeyError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid {NPZ_MEDIA_TYPE} body: {e}")
+
+    matrix = {key: arrays.pop(key) for key in ("indptr", "indices", "data") if key in arrays}
+    return SparseMIPProblem.model_validate({**meta, **arrays, "matrix": matrix})
+
+
+PARSERS = {
+    JSON_MEDIA_TYPE: parse_problem_json,
+    CSR_JSON_MEDIA_TYPE: parse_problem_csr_json,
+    NPZ_MEDIA_TYPE: parse_problem_npz,
+}
+
+
+BATCH_PARSERS = {
+    JSON_MEDIA_TYPE: parse_problem_batch_json,
+    CSR_JSON_MEDIA_TYPE: TypeAdapter(List[SparseMIPProblem]).validate_json,
+}
+
+
+def _request_validation_error(e: ValidationError, body: bytes) -> RequestValidationError:
+    errors = [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+    return RequestValidationError(errors, body=body)
+
+
+async def _read_body(request: Request) -> bytes:
+    """Reads the request body without caching it on the request, so it is freed once parsed."""
+    return b"".join([chunk async for chunk in request.stream()])
+
+
+async def read_problem(request: Request) -> Tuple[bytes, Callable[[bytes], SparseMIPProblem]]:
+    """
+    Reads the request body with the parser of its Content-Type, without parsing it yet.
+
+    The parser reports validation failures as 422 errors, just like a regular body parameter.
+    """
+    parser = PARSERS.get(_media_type(request))
+    if parser is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported Content-Type. Use one of: {', '.join(PARSERS)}",
+        )
+
+    body = await _read_body(request)
+
+    def parse(body: bytes) -> SparseMIPProblem:
+        try:
+            with timed("validate", request_timings(request)):
+                return parser(body)
+        except ValidationError as e:
+            raise _request_validation_error(e, body)
+
+    return body, parse
+
+
+async def parse_problem(request: Request) -> MIPProblemInput:
+    """
+    FastAPI dependency that decodes the request body according to its Content-Type.
+
+    Validation failures are reported as 422 errors, just like a regular body parameter.
+    """
+    body, parse = await read_problem(request)
+    return parse(body)
+
+
+async def parse_problem_batch(request: Request) -> List[SparseMIPProblem]:
+    """
+    FastAPI dependency that decodes a JSON array of problems, all in the format given by the Content-Type.
+    """
+    parser = BATCH_PARSERS.get(_media_type(request))
+    if parser is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported Content-Type. Use one of: {', '.join(BATCH_PARSERS)}",
+        )
+
+    body = await _read_body(request)
+    try:
+        return parser(body)
+    except ValidationError as e:
+        raise _request_validation_error(e, body)
+
+
+async def receive_problem_file(
+    request: Request,
+    format: str,
+    name: Optional[str] = None,
+    sense: Optional[str] = None,
+    objective_cutoff: Optional[float] = None,
+) -> ProblemFile:
+    """
+    Streams the request body into a temporary file for SCIP's readers.
+
+    The body is written chunk by chunk, so it is never held in memory as a whole.
+    The caller is responsible for removing the file once the problem has been read.
+    """
+    fd, path = tempfile.mkstemp(prefix="remip-", suffix=f".{format}")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return ProblemFile(path=path, format=format, name=name, sense=sense, objective_cutoff=objective_cutoff)
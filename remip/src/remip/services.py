@@ -1,7 +1,21 @@
+import asyncio
+from datetime import datetime, timezone
 from typing import AsyncGenerator, Optional
 
-from .models import MIPProblem, MIPSolution, SolverEvent
-from .solvers.scip_wrapper import ScipSolverWrapper
+from .cache import SolutionCache
+from .metrics import ACTIVE_SOLVES, SOLVES
+from .models import EndEvent, MIPProblemInput, MIPSolution, ResultEvent, SolverEvent, StreamOptions
+from .solvers.scip_wrapper import STATUS_MAP, ScipSolverWrapper
+
+# Every status is exposed from the start, so that rates can be computed before its first solve
+for _status in {*STATUS_MAP.values(), "not solved", "cancelled", "error"}:
+    SOLVES.labels(_status)
+
+
+def _from_cache(solution: MIPSolution) -> MIPSolution:
+    """A cached solution without what only applied to the solve that produced it."""
+    # Neither its phases nor its warm start (which is not part of the cache key) are this request's
+    return solution.model_copy(update={"timings_milliseconds": None, "warm_start_accepted": None})
 
 
 class MIPSolverService:
@@ -9,24 +23,73 @@ class MIPSolverService:
     Service to handle the logic of solving MIP problems.
     """
 
-    def __init__(self):
-        self.solver = ScipSolverWrapper()
+    def __init__(self, solver=None, cache: Optional[SolutionCache] = None):
+        # Any object with ScipSolverWrapper's interface, e.g. a PooledSolver handle
+        self.solver = solver or ScipSolverWrapper()
+        self.cache = cache
 
-    async def solve(self, problem_data: MIPProblem, timeout: Optional[float] = None) -> MIPSolution:
+    async def solve(self, problem_data: MIPProblemInput, timeout: Optional[float] = None) -> MIPSolution:
         """
         Solves the problem and returns the final result.
         """
-        return await self.solver.solve(problem_data, timeout=timeout)
+        key = None
+        if self.cache is not None:
+            key = await self.cache.key(problem_data, timeout)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return _from_cache(cached)
+
+        try:
+            with ACTIVE_SOLVES.track():
+                solution = await self.solver.solve(problem_data, timeout=timeout)
+        except asyncio.CancelledError:
+            SOLVES.labels("cancelled").inc()
+            raise
+        except BaseException:
+            SOLVES.labels("error").inc()
+            raise
+        SOLVES.labels(solution.status).inc()
+        if key is not None:
+            await self.cache.put(key, solution)
+        return solution
 
     def interrupt_solver(self):
         """Interrupts the solver."""
         self.solver.interrupt_solver()
 
     async def solve_stream(
-        self, problem_data: MIPProblem, timeout: Optional[float] = None
+        self, problem_data: MIPProblemInput, timeout: Optional[float] = None, options: Optional[StreamOptions] = None
     ) -> AsyncGenerator[SolverEvent, None]:
         """
-        Solves the problem and yields solver events.
+        Solves the problem and yields solver events, as selected by `options`.
         """
-        async for event in self.solver.solve_and_stream_events(problem_data, timeout=timeout):
-            yield event
+        key = None
+        if self.cache is not None:
+            key = await self.cache.key(problem_data, timeout)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                yield ResultEvent(
+                    timestamp=datetime.now(timezone.utc).isoformat(),
+                    solution=_from_cache(cached),
+                    runtime_milliseconds=0,
+                    sequence=1,
+                )
+                yield EndEvent(success=True)
+                return
+
+        status = "error"
+        try:
+            with ACTIVE_SOLVES.track():
+                async for event in self.solver.solve_and_stream_events(problem_data, timeout=timeout, options=options):
+                    if isinstance(event, ResultEvent):
+                        status = event.solution.status
+                        if key is not None:
+                            await self.cache.put(key, event.solution)
+                    yield event
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client went away before the result
+            if status == "error":
+                status = "cancelled"
+            raise
+        finally:
+            SOLVES.labels(status).inc()
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Dict, Optional
+
+from pyscipopt import SCIP_STAGE, Expr
+from pyscipopt.scip import Term
+
+from .models import MIPProblem, MIPSolution, ModelDelta, Session, SolverEvent, SparseMIPProblem, StreamOptions
+from .solvers.scip_wrapper import ScipSolverWrapper
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _SessionEntry:
+    """
+    Server-side state of a session: the resident SCIP model and the data it was built from.
+
+    It has the same solve interface as ScipSolverWrapper, with a `ModelDelta` in place of the
+    problem, so it can be plugged into `MIPSolverService`. Solves of one session never overlap.
+    """
+
+    def __init__(self, session: Session, problem: SparseMIPProblem, model, vars: Dict[str, object], warm_start_accepted):
+        self.session = session
+        self.problem = problem
+        self.model = model
+        self.vars = vars
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self._warm_start_accepted: Optional[bool] = warm_start_accepted
+        self._solver: Optional[ScipSolverWrapper] = None
+        self._variable_index = {name: j for j, name in enumerate(problem.variable_names)}
+        # Only named constraints can be addressed by a delta
+        constraints = {c.name: c for c in model.getConss()}
+        self._constraints = {name: (i, constraints[name]) for i, name in enumerate(problem.constraint_names or []) if name}
+
+    def touch(self):
+        self.last_used = time.monotonic()
+        self.session.last_used_at = _now()
+
+    def check(self, delta: Optional[ModelDelta]):
+        """Raises ValueError if the delta cannot be applied to this session."""
+        if delta is None:
+            return
+        for field in ("lower_bounds", "upper_bounds", "objective"):
+            unknown = [name for name in getattr(delta, field) if name not in self._variable_index]
+            if unknown:
+                raise ValueError(f"Unknown variables in {field}: {', '.join(unknown)}")
+        unknown = [name for name in delta.rhs if name not in self._constraints]
+        if unknown:
+            raise ValueError(f"Unknown constraints in rhs: {', '.join(unknown)}")
+        if self.session.reoptimize and (delta.lower_bounds or delta.upper_bounds or delta.rhs):
+            raise ValueError("Sessions with reoptimization only accept objective deltas.")
+
+    def _apply(self, delta: Optional[ModelDelta]):
+        """Returns the model to the problem stage and applies the delta to it."""
+        model, problem = self.model, self.problem
+        reoptimizing = self.session.reoptimize and model.getStage() != SCIP_STAGE.PROBLEM
+        if model.getStage() != SCIP_STAGE.PROBLEM:
+            if reoptimizing:
+                model.freeReoptSolve()
+            else:
+                # Solutions found so far are kept and serve as starting points for the re-solve
+                model.freeTransform()
+        if delta is None:
+            return
+
+        infinity = model.infinity()
+        for name, lb in delta.lower_bounds.items():
+            model.chgVarLb(self.vars[name], lb if lb is not None else -infinity)
+            problem.lower_bounds[self._variable_index[name]] = lb
+        for name, ub in delta.upper_bounds.items():
+            model.chgVarUb(self.vars[name], ub if ub is not None else infinity)
+            problem.upper_bounds[self._variable_index[name]] = ub
+
+        for name, value in delta.rhs.items():
+            i, constraint = self._constraints[name]
+            sense = problem.senses[i]
+            if sense != 1:  # LEQ / EQ
+                model.chgRhs(constraint, value)
+            if sense != -1:  # GEQ / EQ
+                model.chgLhs(constraint, value)
+            problem.rhs[i] = value
+
+        if delta.objective:
+            for name, value in delta.objective.items():
+                problem.objective[self._variable_index[name]] = value
+            sense = "minimize" if problem.parameters.sense == 1 else "maximize"
+            if reoptimizing:
+                # The reoptimized objective is always given as a whole
+                terms = {Term(self.vars[name]): c for name, c in zip(problem.variable_names, problem.objective) if c}
+                model.chgReoptObjective(Expr(terms), sense)
+            else:
+                terms = {Term(self.vars[name]): value for name, value in delta.objective.items()}
+                model.setObjective(Expr(terms), sense, clear=False)
+
+    def interrupt_solver(self):
+        """Interrupts the running solve of this session, if any."""
+        if self._solver is not None:
+            self._solver.interrupt_solver()
+
+    async def solve(self, delta: Optional[ModelDelta], timeout: Optional[float] = None) -> MIPSolution:
+        """Applies the delta, re-solves the model and returns the final solution."""
+        async with self._solving(delta) as warm_start_accepted:
+            return await self._solver.resolve(
+                self.model, self.problem, self.vars, timeout=timeout, warm_start_accepted=warm_start_accepted
+            )
+
+    async def solve_and_stream_events(
+        self, delta: Optional[ModelDelta], timeout: Optional[float] = None, options: Optional[StreamOptions] = None
+    ) -> AsyncGenerator[SolverEvent, None]:
+        """Applies the delta, re-solves the model and streams its SolverEvent objects."""
+        async with self._solving(delta) as warm_start_accepted:
+            async with aclosing(
+                self._solver.resolve_and_stream_events(
+                    self.model,
+                    self.problem,
+                    self.vars,
+                    timeout=timeout,
+                    warm_start_accepted=warm_start_accepted,
+                    options=options,
+                )
+            ) as events:
+                async for event in events:
+                    yield event
+
+    @asynccontextmanager
+    async def _solving(self, delta: Optional[ModelDelta]) -> AsyncGenerator[Optional[bool], None]:
+        """Holds the session for one solve with the delta applied. Yields the warm start outcome."""
+        async with self.lock:
+            self.touch()
+            self._apply(delta)
+            # A time limit of an earlier solve must not carry over
+            self.model.setParam("limits/time", self.model.infinity())
+
+            self._solver = ScipSolverWrapper()
+            warm_start_accepted, self._warm_start_accepted = self._warm_start_accepted, None
+            try:
+                yield warm_start_accepted
+            finally:
+                self._solver = None
+                self.session.solves += 1
+                self.touch()
+
+
+class SessionManager:
+    """
+    Keeps built SCIP models resident for repeated solves with small changes.
+
+    Sessions that have not been used for `idle_ttl` seconds are closed. At most
+    `max_sessions` are kept; when a new one is created, the least recently used idle
+    session makes room for it.
+    """
+
+    def __init__(self, idle_ttl: float = 600.0, max_sessions: int = 16):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._entries: OrderedDict[str, _SessionEntry] = OrderedDict()
+        self._reaper: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts closing idle sessions in the background."""
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def stop(self):
+        """Interrupts running solves and closes all sessions."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        for entry in self._entries.values():
+            entry.interrupt_solver()
+        self._entries.clear()
+
+    async def create(self, problem: MIPProblem | SparseMIPProblem, reoptimize: bool = False) -> Optional[Session]:
+        """Builds the model of a new session. Returns None if the session limit is reached."""
+        self._close_expired()
+        while len(self._entries) >= self.max_sessions:
+            idle = next((key for key, entry in self._entries.items() if not entry.lock.locked()), None)
+            if idle is None:
+                return None
+            self._close(idle)
+
+        problem = problem.to_sparse()
+        solver = ScipSolverWrapper()
+        model, vars = await solver._build_model(problem)
+        if reoptimize:
+            model.enableReoptimization()
+        warm_start_accepted = solver._add_warm_start(model, problem, vars)
+
+        now = _now()
+        session = Session(
+            id=uuid.uuid4().hex,
+            name=problem.parameters.name,
+            num_variables=len(problem.variable_names),
+            num_constraints=len(problem.senses),
+            reoptimize=reoptimize,
+            created_at=now,
+            last_used_at=now,
+        )
+        self._entries[session.id] = _SessionEntry(session, problem, model, vars, warm_start_accepted)
+        return session
+
+    def get(self, session_id: str) -> Optional[_SessionEntry]:
+        """Returns the session with the given id, or None if it is unknown or has expired."""
+        self._close_expired()
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self._entries.move_to_end(session_id)
+        return entry
+
+    def close(self, session_id: str) -> bool:
+        """Closes a session. Returns False if it is unknown."""
+        if session_id not in self._entries:
+            return False
+        self._close(session_id)
+        return True
+
+    def _close(self, session_id: str):
+        entry = self._entries.pop(session_id)
+        entry.interrupt_solver()  # The model is freed once its last solve has returned
+
+    def _close_expired(self):
+        deadline = time.monotonic() - self.idle_ttl
+        expired = [key for key, entry in self._entries.items() if entry.last_used < deadline and not entry.lock.locked()]
+        for key in expired:
+            logger.info("Closing idle session %s", key)
+            self._close(key)
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(min(self.idle_ttl, 60.0))
+            self._close_expired()
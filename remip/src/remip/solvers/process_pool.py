@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import struct
+from multiprocessing.connection import Connection
+from typing import AsyncGenerator, Dict, List, Optional, Set
+
+from ..metrics import observe_stages
+from ..models import MIPProblemInput, MIPSolution, ProblemFile, SolverEvent, StoredProblem, StreamOptions
+
+logger = logging.getLogger(__name__)
+
+# Signal used to deliver `interrupt_solver` to a worker process.
+INTERRUPT_SIGNAL = signal.SIGUSR1
+
+
+def _worker_main(conn: Connection, cpu: Optional[int]):
+    """
+    Entry point of a solver worker process.
+
+    Receives `(problem, timeout, options, interrupted)` jobs over the pipe and answers with
+    `("event", SolverEvent)` messages (when streaming, i.e. `options` is set) and the
+    `("timings", {stage: seconds})` of the solve, then either `("solution", MIPSolution)`,
+    `("done", None)` or `("error", message)`. A `ProblemFileError` is sent as is, so the
+    parent can tell a bad upload from a failed solve.
+    """
+    import asyncio
+
+    from .scip_wrapper import ProblemFileError, ScipSolverWrapper
+
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+    # Shutdown is driven by the parent closing the pipe, not by the terminal's Ctrl-C.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    current: List[ScipSolverWrapper] = []
+    signal.signal(INTERRUPT_SIGNAL, lambda signum, frame: current and current[0].interrupt_solver())
+
+    async def run(problem: MIPProblemInput, timeout: Optional[float], options: Optional[StreamOptions]):
+        wrapper = current[0]
+        if options is not None:
+            async for event in wrapper.solve_and_stream_events(problem, timeout=timeout, options=options):
+                conn.send(("event", event))
+            conn.send(("timings", wrapper.timings))
+            conn.send(("done", None))
+        else:
+            solution = await wrapper.solve(problem, timeout=timeout)
+            conn.send(("timings", wrapper.timings))
+            conn.send(("solution", solution))
+
+    while True:
+        try:
+            problem, timeout, options, interrupted = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        # A fresh wrapper per job, so a late interrupt never leaks into the next job
+        current[:] = [ScipSolverWrapper()]
+        if interrupted:
+            current[0].interrupt_solver()
+        try:
+            asyncio.run(run(problem, timeout, options))
+        except Exception as e:
+            conn.send(("error", e if isinstance(e, ProblemFileError) else str(e)))
+        finally:
+            current.clear()
+
+
+class _Worker:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, ctx, cpu: Optional[int]):
+        self.cpu = cpu
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, cpu), daemon=True)
+        self.process.start()
+        child_conn.close()
+        # Bytes received from the worker that do not make up a whole message yet
+        self._received = bytearray()
+
+    async def send(self, message):
+        """Sends a message from a thread: pickling and writing a large problem would stall the event loop."""
+        await asyncio.to_thread(self.conn.send, message)
+
+    async def recv(self):
+        """
+        Receives the next message without blocking the event loop.
+
+        The pipe is only read while it is readable, so a large message (e.g. a solution)
+        arrives piece by piece while other requests are served. Messages are framed as by
+        `Connection.send`: a 4-byte size, or -1 and an 8-byte size, then the pickle.
+        """
+        while (frame := self._next_frame()) is None:
+            await self._readable()
+            data = os.read(self.conn.fileno(), 1 << 20)
+            if not data:
+                raise EOFError
+            self._received += data
+        return pickle.loads(frame)
+
+    def _next_frame(self) -> Optional[bytes]:
+        received = self._received
+        if len(received) < 4:
+            return None
+        (size,) = struct.unpack_from("!i", received)
+        start = 4
+        if size == -1:
+            if len(received) < 12:
+                return None
+            (size,) = struct.unpack_from("!Q", received, 4)
+            start = 12
+        if len(received) < start + size:
+            return None
+        frame = bytes(received[start : start + size])
+        del received[: start + size]
+        return frame
+
+    async def _readable(self):
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self.conn.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+
+    def interrupt(self):
+        if self.process.is_alive():
+            os.kill(self.process.pid, INTERRUPT_SIGNAL)
+
+    def close(self, timeout: float = 5.0):
+        self.conn.close()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class SolverProcessPool:
+    """
+    A pool of warm solver worker processes.
+
+    Each solve runs SCIP in its own process, so SCIP's log output never goes through
+    the server's GIL and a crash or memory blow-up only takes down one worker, which is
+    replaced. Workers are started from a fork server that has already imported SCIP,
+    and can be pinned to one core each.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, pin_cpus: bool = False):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.pin_cpus = pin_cpus
+        methods = multiprocessing.get_all_start_methods()
+        self._ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if "forkserver" in methods:
+            self._ctx.set_forkserver_preload(["remip.solvers.scip_wrapper"])
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._draining: Set[asyncio.Task] = set()
+        # Solves waiting for an idle worker
+        self.waiting = 0
+
+    def _cpu_for(self, index: int) -> Optional[int]:
+        if not self.pin_cpus or not hasattr(os, "sched_getaffinity"):
+            return None
+        cpus = sorted(os.sched_getaffinity(0))
+        return cpus[index % len(cpus)]
+
+    def start(self):
+        """Starts the worker processes."""
+        if self._workers:
+            return
+        self._idle = asyncio.Queue()
+        for i in range(self.num_workers):
+            worker = _Worker(self._ctx, self._cpu_for(i))
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+
+    def stop(self):
+        """Stops all worker processes."""
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+        self._idle = None
+
+    def solver(self) -> "PooledSolver":
+        """Returns a solver handle with the same interface as ScipSolverWrapper."""
+        return PooledSolver(self)
+
+    async def _acquire(self) -> _Worker:
+        if self._idle is None:
+            raise RuntimeError("The solver process pool has not been started.")
+        self.waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self.waiting -= 1
+        if not worker.process.is_alive():
+            worker = self._replace(worker)
+        return worker
+
+    def _release(self, worker: _Worker):
+        if self._idle is not None:
+            self._idle.put_nowait(worker)
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        """Replaces a dead (or misbehaving) worker with a fresh process."""
+        logger.warning("Solver worker %s exited with code %s, restarting it.", worker.process.pid, worker.process.exitcode)
+        worker.close(timeout=0)
+        replacement = _Worker(self._ctx, worker.cpu)
+        if worker in self._workers:
+            self._workers[self._workers.index(worker)] = replacement
+        return replacement
+
+    async def _drain_and_release(self, worker: _Worker):
+        """Waits until an abandoned job has finished before returning its worker to the pool."""
+        try:
+            while (await worker.recv())[0] in ("event", "timings"):
+                pass
+        except (EOFError, OSError):
+            worker = self._replace(worker)
+        self._release(worker)
+
+    async def run(
+        self,
+        problem: MIPProblemInput,
+        timeout: Optional[float],
+        options: Optional[StreamOptions],
+        lease: "PooledSolver",
+    ) -> AsyncGenerator[tuple, None]:
+        """Runs one job on an idle worker and yields the messages it sends back. Streams if `options` is set."""
+        if not isinstance(problem, (ProblemFile, StoredProblem)):
+            problem = problem.to_sparse()  # Much cheaper to pickle than the pydantic graph
+
+        worker = await self._acquire()
+        finished = False
+        try:
+            lease.worker = worker
+            await worker.send((problem, timeout, options, lease.interrupted))
+            while True:
+                try:
+                    kind, payload = await worker.recv()
+                except (EOFError, OSError):
+                    finished = True
+                    worker = self._replace(worker)
+                    raise RuntimeError("Solver worker process died during the solve.")
+                if kind == "event":
+                    yield kind, payload
+                    continue
+                if kind == "timings":
+                    # Stages measured in the worker process are exposed by this one
+                    lease.timings = payload
+                    observe_stages(payload)
+                    continue
+                finished = True
+                if kind == "error":
+                    raise payload if isinstance(payload, Exception) else RuntimeError(payload)
+                yield kind, payload
+                return
+        finally:
+            lease.worker = None
+            if finished:
+                self._release(worker)
+            else:
+                # The consumer went away mid-solve: stop the job and reclaim the worker later.
+                worker.interrupt()
+                task = asyncio.get_running_loop().create_task(self._drain_and_release(worker))
+                self._draining.add(task)
+                task.add_done_callback(self._draining.discard)
+
+
+class PooledSolver:
+    """
+    Drop-in replacement for ScipSolverWrapper that runs each solve in a pool worker.
+    """
+
+    def __init__(self, pool: SolverProcessPool):
+        self.pool = pool
+        self.worker: Optional[_Worker] = None
+        self.interrupted = False
+        self.timings: Dict[str, float] = {}
+
+    def interrupt_solver(self):
+        """Interrupts the solve running in the leased worker process."""
+        self.interrupted = True
+        if self.worker is not None:
+            self.worker.interrupt()
+
+    async def solve(self, problem: MIPProblemInput, timeout: Optional[float] = None) -> MIPSolution:
+        """Solves a MIP problem in a worker process and returns the final solution."""
+        solution: Optional[MIPSolution] = None
+        async for kind, payload in self.pool.run(problem, timeout, options=None, lease=self):
+            if kind == "solution":
+                solution = payload
+        if not solution:
+            raise Exception("Solver did not produce a result.")
+        return solution
+
+    async def solve_and_stream_events(
+        self, problem: MIPProblemInput, timeout: Optional[float] = None, options: Optional[StreamOptions] = None
+    ) -> AsyncGenerator[SolverEvent, None]:
+        """Solves a MIP problem in a worker process and streams its SolverEvent objects."""
+        async for kind, payload in self.pool.run(problem, timeout, options=options or StreamOptions(), lease=self):
+            if kind == "event":
+                yield payload
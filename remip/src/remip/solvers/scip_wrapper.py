@@ -1,22 +1,328 @@
 import asyncio
+import ctypes
+import logging
+import math
+import os
 import re
 import threading
 import time
+from contextlib import aclosing, contextmanager
 from datetime import datetime, timezone
-from typing import Any, AsyncGenerator, Dict, Optional, Tuple
+from typing import Any, AsyncGenerator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-from pyscipopt import Model
+import numpy as np
+import pyscipopt.scip
+from pyscipopt import SCIP_EVENTTYPE, Eventhdlr, Expr, Model
+from pyscipopt.scip import Term
 
+from ..metrics import milliseconds, record_stage, timed
 from ..models import (
     EndEvent,
+    IncumbentEvent,
     LogEvent,
     MetricEvent,
-    MIPProblem,
+    MIPProblemInput,
     MIPSolution,
+    ProblemFile,
     ResultEvent,
     SolverEvent,
+    SparseMIPProblem,
+    StoredProblem,
+    StreamOptions,
 )
 
+# SCIP opens its log file by name, so each model's pipe is handed over as /dev/fd/N
+LOG_PIPE_SUPPORTED = os.path.isdir("/dev/fd")
+
+PROGRESS_EVENTS = SCIP_EVENTTYPE.NODESOLVED | SCIP_EVENTTYPE.LPSOLVED
+
+# SCIP's statuses and the solution status they are reported as; others are "not solved"
+STATUS_MAP = {
+    "optimal": "optimal",
+    "infeasible": "infeasible",
+    "unbounded": "unbounded",
+    "timelimit": "timeout",
+    "userinterrupt": "timeout",  # Map interrupt to timeout
+    "gaplimit": "gaplimit",
+    "solutionlimit": "solutionlimit",
+    "memorylimit": "memorylimit",
+    "nodelimit": "nodelimit",
+}
+
+
+logger = logging.getLogger(__name__)
+
+# SCIP prefixes each error message with the source location that raised it
+_ERROR_HEADER = re.compile(r"\[[^\]]*\] ERROR: ")
+
+_scip_errors = threading.local()
+
+
+class ProblemFileError(ValueError):
+    """SCIP could not read an uploaded problem file."""
+
+
+@ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_char_p)
+def _on_scip_error(data, file, message):
+    """
+    Receives SCIP's error messages, which bypass the model's hidden message handler.
+
+    They are collected by `_collect_scip_errors` on the thread that raised them, or else
+    logged at debug level, so they never reach the process' stderr between other requests' output.
+    """
+    text = message.decode("utf-8", "replace")
+    messages = getattr(_scip_errors, "messages", None)
+    if messages is not None:
+        messages.append(text)
+    else:
+        logger.debug("SCIP: %s", text.rstrip())
+
+
+def _install_error_printer():
+    try:
+        # The error printer is process-wide and lives in the libscip the extension links against
+        ctypes.CDLL(pyscipopt.scip.__file__).SCIPmessageSetErrorPrinting(_on_scip_error, None)
+    except (OSError, AttributeError):
+        logger.debug("SCIPmessageSetErrorPrinting is not available; SCIP errors go to stderr")
+
+
+_install_error_printer()
+
+
+@contextmanager
+def _collect_scip_errors() -> Iterator[List[str]]:
+    """Collects the error messages SCIP raises on this thread while the block runs."""
+    messages: List[str] = []
+    _scip_errors.messages = messages
+    try:
+        yield messages
+    finally:
+        _scip_errors.messages = None
+
+
+def _resolve(future: asyncio.Future, error: Optional[BaseException]):
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+def _bound(model: Model, value: float) -> float:
+    """Maps SCIP's infinity to a float infinity."""
+    if model.isInfinity(value):
+        return math.inf
+    if model.isInfinity(-value):
+        return -math.inf
+    return value
+
+
+def _gap(primal: float, dual: float) -> float:
+    """The relative gap as SCIP defines it."""
+    if primal == dual:
+        return 0.0
+    if primal == 0 or dual == 0 or math.isinf(primal) or math.isinf(dual) or (primal > 0) != (dual > 0):
+        return math.inf
+    return abs(primal - dual) / min(abs(primal), abs(dual))
+
+
+def _solution_values(sol: Any, variables: Sequence[Any]) -> np.ndarray:
+    """Returns the values of the variables in the solution as one float64 array."""
+    # Indexing the solution skips the stage checks getSolVal repeats for every variable
+    return np.fromiter(map(sol.__getitem__, variables), dtype=np.float64, count=len(variables))
+
+
+class _ProgressEventHandler(Eventhdlr):
+    """
+    Reports the solver's progress as MetricEvents from SCIP's own statistics.
+
+    Every improving solution is reported. Node and LP events are reported at most once
+    per `interval` seconds (0 reports all of them, None none). With `incumbent_vars`,
+    every improving solution is also sent as an IncumbentEvent holding the values that
+    changed since the previous one. The handler is included once per model and configured
+    for each solve; `emit` is called on the solver thread.
+    """
+
+    def __init__(self):
+        self.emit: Optional[Callable[[SolverEvent], None]] = None
+        self.interval: Optional[float] = None
+        self._events = 0
+        self._next_progress = 0.0
+        self._incumbent_names: List[str] = []
+        self._incumbent_vars: Optional[List[Any]] = None
+        self._incumbent: np.ndarray = np.zeros(0)
+
+    def configure(
+        self,
+        emit: Optional[Callable[[SolverEvent], None]],
+        interval: Optional[float] = None,
+        incumbent_vars: Optional[Dict[str, Any]] = None,
+    ):
+        self.emit = emit
+        self.interval = interval
+        self._next_progress = 0.0
+        if incumbent_vars is None:
+            self._incumbent_names, self._incumbent_vars, self._incumbent = [], None, np.zeros(0)
+        else:
+            self._incumbent_names = list(incumbent_vars)
+            self._incumbent_vars = list(incumbent_vars.values())
+            self._incumbent = np.zeros(len(self._incumbent_vars))
+
+    def eventinit(self):
+        if self.emit is not None:
+            self._events = SCIP_EVENTTYPE.BESTSOLFOUND | (PROGRESS_EVENTS if self.interval is not None else 0)
+            self.model.catchEvent(self._events, self)
+
+    def eventexit(self):
+        if self._events:
+            self.model.dropEvent(self._events, self)
+            self._events = 0
+
+    def eventexec(self, event):
+        emit = self.emit
+        if emit is None:
+            return {}
+        model = self.model
+        sol = None
+        if event.getType() == SCIP_EVENTTYPE.BESTSOLFOUND:
+            # SCIP updates its primal bound only after the event, so read the new solution
+            sol = model.getBestSol()
+            primal = _bound(model, model.getSolObjVal(sol))
+            trigger = "best_solution"
+        else:
+            now = time.monotonic()
+            if now < self._next_progress:
+                return {}
+            self._next_progress = now + self.interval
+            primal = _bound(model, model.getPrimalbound())
+            trigger = "progress"
+        dual = _bound(model, model.getDualbound())
+        emit(
+            MetricEvent(
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                objective_value=primal,
+                dual_bound=dual,
+                gap=_gap(primal, dual),
+                iteration=model.getNLPIterations(),
+                nodes=model.getNNodes(),
+                elapsed_seconds=model.getSolvingTime(),
+                trigger=trigger,
+                sequence=0,
+            )
+        )
+        if sol is not None and self._incumbent_vars is not None:
+            emit(self._incumbent_event(model, sol, primal))
+        return {}
+
+    def _incumbent_event(self, model: Model, sol, objective_value: float) -> IncumbentEvent:
+        values = _solution_values(sol, self._incumbent_vars)
+        changed = np.flatnonzero(values != self._incumbent)
+        self._incumbent = values
+        names = self._incumbent_names
+        return IncumbentEvent(
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            objective_value=objective_value,
+            variables={names[j]: value for j, value in zip(changed.tolist(), values[changed].tolist())},
+            sequence=0,
+        )
+
+
+def _progress_handler(model: Model) -> _ProgressEventHandler:
+    """Returns the model's progress handler, including it on first use."""
+    if not isinstance(model.data, _ProgressEventHandler):
+        handler = _ProgressEventHandler()
+        model.includeEventhdlr(handler, "remip_progress", "Reports solver progress as MetricEvents")
+        model.data = handler
+    return model.data
+
+
+class _LogPipe:
+    """
+    Captures the log of one SCIP model through its own pipe.
+
+    SCIP writes its log file straight into the pipe from C, so concurrent solves never
+    see each other's output and `sys.stdout` is left alone. The event loop reads the
+    pipe, splits it into lines and puts them on `queue`, followed by None once SCIP
+    has closed its log file. Without /dev/fd, or with `capture` off, no log is captured
+    and only the None marks the end of the solve.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, capture: bool = True):
+        self._loop = loop
+        self._queue = queue
+        self._partial: list[bytes] = []
+        self.closed = False
+        self._attached = False
+        self._read_fd: Optional[int] = None
+        self._write_fd: Optional[int] = None
+        if capture and LOG_PIPE_SUPPORTED:
+            self._read_fd, self._write_fd = os.pipe()
+            os.set_blocking(self._read_fd, False)
+            loop.add_reader(self._read_fd, self._on_readable)
+
+    def attach(self, model: Model):
+        """Points the model's log file at the pipe (called by the solver thread)."""
+        if self._write_fd is not None:
+            model.setLogfile(f"/dev/fd/{self._write_fd}")
+            self._attached = True
+            # SCIP now holds its own descriptor, so the pipe reaches EOF when SCIP closes it.
+            # The descriptor is released first: the event loop may see EOF before close() returns.
+            write_fd, self._write_fd = self._write_fd, None
+            os.close(write_fd)
+
+    def detach(self, model: Model):
+        """Closes the model's log file (called by the solver thread)."""
+        if self._attached:
+            model.setLogfile(None)
+        else:
+            self._loop.call_soon_threadsafe(self._finish)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._read_fd, 65536)
+        except BlockingIOError:
+            return
+        if not data:
+            self._finish()
+            return
+
+        # Only the new chunk is scanned for line breaks, so splitting stays linear in the log size
+        *lines, rest = data.split(b"\n")
+        if lines:
+            if self._partial:
+                lines[0] = b"".join(self._partial) + lines[0]
+                self._partial.clear()
+            for line in lines:
+                self._put(line)
+        if rest:
+            self._partial.append(rest)
+
+    def _put(self, line: bytes):
+        text = line.decode("utf-8", errors="replace").rstrip("\r")
+        if text:
+            self._queue.put_nowait(text)
+
+    def _finish(self):
+        if self.closed:
+            return
+        if self._partial:
+            self._put(b"".join(self._partial))
+            self._partial.clear()
+        self.close()
+        self._queue.put_nowait(None)
+
+    def close(self):
+        """Stops reading and releases the pipe."""
+        self.closed = True
+        if self._read_fd is not None:
+            self._loop.remove_reader(self._read_fd)
+            os.close(self._read_fd)
+            self._read_fd = None
+        if self._write_fd is not None:
+            os.close(self._write_fd)
+            self._write_fd = None
+
 
 class ScipSolverWrapper:
     """
@@ -26,14 +332,15 @@ class ScipSolverWrapper:
 
     def __init__(self):
         self.model: Optional[Model] = None
-        # Regex to capture SCIP's progress table lines
-        self.metric_regex = re.compile(
-            r"\s*(\d+\.\d+)\s*\|\s*\d+\s*\|\s*\d+\s*\|\s*(\d+)\s*\|.*\|\s*([\d\.\-inf]+)\s*\|\s*([\d\.\-inf]+)\s*\|\s*([\d\.\-inf]+)"
-        )
         self.log_sequence = 0
+        # Set when an interrupt arrives, so a solve that has not started yet is skipped
+        self.interrupt_requested = False
+        # Seconds spent in the build, presolve, solve and extract stages of the last solve
+        self.timings: Dict[str, float] = {}
 
     def interrupt_solver(self):
         """Interrupts the SCIP solver if it is running."""
+        self.interrupt_requested = True
         if self.model:
             try:
                 self.model.interruptSolve()
@@ -41,34 +348,124 @@ class ScipSolverWrapper:
                 # SCIP might throw an error if not in the solving stage
                 pass
 
-    async def solve(self, problem: MIPProblem, timeout: Optional[float] = None) -> MIPSolution:
+    async def solve(self, problem: MIPProblemInput, timeout: Optional[float] = None) -> MIPSolution:
         """
-        Solves a MIP problem by consuming the event stream and returning the final solution.
+        Solves a MIP problem and returns the final solution.
         Only the final best solution (at completion or time limit) is returned.
+
+        Unlike `solve_and_stream_events`, SCIP's log is discarded and no events are built:
+        the call simply waits for the solver thread to finish.
         """
-        solution: Optional[MIPSolution] = None
+        if not isinstance(problem, (ProblemFile, StoredProblem)):
+            problem = problem.to_sparse()
 
-        async for event in self.solve_and_stream_events(problem, timeout=timeout):
-            if isinstance(event, ResultEvent):
-                solution = event.solution
+        model, vars = await self._build_model(problem, timeout=timeout)
+        if isinstance(problem, StoredProblem):
+            problem = problem.problem
+        warm_start_accepted = self._add_warm_start(model, problem, vars)
+        return await self.resolve(model, problem, vars, timeout=timeout, warm_start_accepted=warm_start_accepted)
+
+    async def resolve(
+        self,
+        model: Model,
+        problem: SparseMIPProblem | ProblemFile,
+        vars: Dict[str, Any],
+        timeout: Optional[float] = None,
+        warm_start_accepted: Optional[bool] = None,
+    ) -> MIPSolution:
+        """Solves an already built model without capturing its log and returns the final solution."""
+        self.model = model
+        _progress_handler(model).configure(None)
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
 
-        if not solution:
-            raise Exception("Solver did not produce a result.")
+        def run():
+            try:
+                self._run_solver_in_thread(model, None, timeout)
+            except BaseException as e:
+                loop.call_soon_threadsafe(_resolve, done, e)
+            else:
+                loop.call_soon_threadsafe(_resolve, done, None)
 
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            await asyncio.shield(done)
+        except asyncio.CancelledError:
+            # Stop SCIP before the model is freed
+            self.interrupt_solver()
+            await done
+            raise
+
+        with timed("extract", self.timings):
+            solution = self._extract_solution(model, problem, vars)
+        solution.timings_milliseconds = milliseconds(self.timings)
+        solution.warm_start_accepted = warm_start_accepted
         return solution
 
     async def solve_and_stream_events(
-        self, problem: MIPProblem, timeout: Optional[float] = None
+        self,
+        problem: MIPProblemInput,
+        timeout: Optional[float] = None,
+        options: Optional[StreamOptions] = None,
     ) -> AsyncGenerator[SolverEvent, None]:
         """
         Solves a MIP problem and streams structured SolverEvent objects.
+
+        A MetricEvent is sent for every improving solution and, at most every
+        `options.metrics_interval` seconds, for node and LP progress. SCIP's raw log is
+        only streamed as LogEvents if `options.log` is set, and improving solutions only
+        as IncumbentEvents if `options.incumbents` is set.
         """
-        self.log_sequence = 0
+        if not isinstance(problem, (ProblemFile, StoredProblem)):
+            problem = problem.to_sparse()
         start_time = time.time()
 
-        # Yield an initial event to ensure headers are sent quickly
-        self.log_sequence += 1
-        yield LogEvent(
+        if not isinstance(problem, ProblemFile):
+            # Yield an initial event to ensure headers are sent quickly
+            yield self._start_event()
+
+        model, vars = await self._build_model(problem, timeout=timeout)
+        if isinstance(problem, ProblemFile):
+            # Only once SCIP has read the file, so that an unreadable one fails before the stream starts
+            yield self._start_event()
+        if isinstance(problem, StoredProblem):
+            problem = problem.problem
+        warm_start_accepted = self._add_warm_start(model, problem, vars)
+        async with aclosing(
+            self._optimize_and_stream_events(
+                model, problem, vars, timeout, start_time, warm_start_accepted, options or StreamOptions()
+            )
+        ) as events:
+            async for event in events:
+                yield event
+
+    async def resolve_and_stream_events(
+        self,
+        model: Model,
+        problem: SparseMIPProblem,
+        vars: Dict[str, Any],
+        timeout: Optional[float] = None,
+        warm_start_accepted: Optional[bool] = None,
+        options: Optional[StreamOptions] = None,
+    ) -> AsyncGenerator[SolverEvent, None]:
+        """
+        Solves an already built model (e.g. of a session) and streams structured SolverEvent objects.
+
+        `problem` must describe the model's current data; it is used to extract the solution.
+        """
+        start_time = time.time()
+        yield self._start_event()
+        async with aclosing(
+            self._optimize_and_stream_events(
+                model, problem, vars, timeout, start_time, warm_start_accepted, options or StreamOptions()
+            )
+        ) as events:
+            async for event in events:
+                yield event
+
+    def _start_event(self) -> LogEvent:
+        self.log_sequence = 1
+        return LogEvent(
             timestamp=datetime.now(timezone.utc).isoformat(),
             level="info",
             stage="start",
@@ -76,36 +473,67 @@ class ScipSolverWrapper:
             sequence=self.log_sequence,
         )
 
-        log_queue: asyncio.Queue[str] = asyncio.Queue()
-        stop_event = threading.Event()
-        model, vars = await self._build_model(problem, timeout=timeout)
+    async def _optimize_and_stream_events(
+        self,
+        model: Model,
+        problem: SparseMIPProblem | ProblemFile,
+        vars: Dict[str, Any],
+        timeout: Optional[float],
+        start_time: float,
+        warm_start_accepted: Optional[bool],
+        options: StreamOptions,
+    ) -> AsyncGenerator[SolverEvent, None]:
+        # Log lines and events of the solve, in order, then None
+        queue: asyncio.Queue[Union[str, SolverEvent, None]] = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        log_pipe = _LogPipe(loop, queue, capture=options.log)
+        _progress_handler(model).configure(
+            lambda event: loop.call_soon_threadsafe(queue.put_nowait, event),
+            options.metrics_interval,
+            incumbent_vars=vars if options.incumbents else None,
+        )
         self.model = model
 
         # Run SCIP in a separate thread (non-blocking for the asyncio loop)
-        loop = asyncio.get_running_loop()
-        solver_thread = threading.Thread(
-            target=self._run_solver_in_thread,
-            args=(model, log_queue, stop_event, loop, timeout),
-            daemon=True,
-        )
-        solver_thread.start()
+        errors: List[BaseException] = []
 
-        # Process logs from the queue until the solver is finished
-        while not stop_event.is_set() or not log_queue.empty():
+        def run():
             try:
-                log_line = await asyncio.wait_for(log_queue.get(), timeout=0.1)
-                event = self._parse_log_line(log_line, self.log_sequence)
+                self._run_solver_in_thread(model, log_pipe, timeout)
+            except BaseException as e:
+                errors.append(e)
+
+        solver_thread = threading.Thread(target=run, daemon=True)
+        solver_thread.start()
+
+        try:
+            # Process log lines and events until SCIP closes its log (None)
+            while (item := await queue.get()) is not None:
+                if isinstance(item, str):
+                    event = self._parse_log_line(item, self.log_sequence + 1)
+                else:
+                    item.sequence = self.log_sequence + 1
+                    event = item
                 if event:
-                    yield event
                     self.log_sequence += 1
-            except asyncio.TimeoutError:
-                continue
+                    yield event
+        finally:
+            if solver_thread.is_alive() and not log_pipe.closed:
+                # The consumer went away mid-solve: stop SCIP before the model is reused or freed
+                self.interrupt_solver()
+            await asyncio.to_thread(solver_thread.join)
+            log_pipe.close()
+        if errors:
+            # The log has ended; end the stream with the solver's error rather than a result
+            raise errors[0]
 
-        solver_thread.join()
         runtime_ms = int((time.time() - start_time) * 1000)
 
         # Yield the final result event (best solution only)
-        solution = self._extract_solution(model, problem, vars)
+        with timed("extract", self.timings):
+            solution = self._extract_solution(model, problem, vars)
+        solution.timings_milliseconds = milliseconds(self.timings)
+        solution.warm_start_accepted = warm_start_accepted
         self.log_sequence += 1
         yield ResultEvent(
             timestamp=datetime.now(timezone.utc).isoformat(),
@@ -117,145 +545,99 @@ class ScipSolverWrapper:
         # Yield the end event
         yield EndEvent(success=True)
 
-    def _run_solver_in_thread(
-        self,
-        model: Model,
-        log_queue: asyncio.Queue,
-        stop_event: threading.Event,
-        loop: asyncio.AbstractEventLoop,
-        timeout: Optional[float],
-    ):
+    def _run_solver_in_thread(self, model: Model, log_pipe: Optional["_LogPipe"], timeout: Optional[float]):
         """
         Worker thread target:
-          - Redirect SCIP output into Python.
-          - Replace stdout/stderr with a line-buffering writer that forwards lines
-            to the main asyncio loop (queue.put_nowait).
+          - Keep SCIP quiet on the process' stdout and write its log into the model's own pipe, if any.
           - Optionally set a time limit via SCIP param (simple approach).
+          - Solve without holding the GIL, so the event loop keeps running.
         """
-        import threading
-        from contextlib import redirect_stderr, redirect_stdout
-
-        # Ensure SCIP logs go to Python instead of terminal
         try:
-            model.redirectOutput()
-        except Exception:
-            # If unavailable on this build, logs may still go to stdout; our redirect_* will capture them.
-            pass
-
-        # Apply internal time limit (does not include model build time; kept simple by design)
-        if timeout is not None and timeout > 0:
-            try:
-                model.setRealParam("limits/time", float(timeout))
-            except Exception:
-                model.setParam("limits/time", float(timeout))
-
-        class _LineWriter:
-            """Thread-safe, line-buffered writer pushing lines to asyncio queue on the main loop."""
-
-            __slots__ = ("_buf", "_lock", "_loop", "_queue")
-
-            def __init__(self, loop_, queue_):
-                self._buf: list[str] = []
-                self._lock = threading.Lock()
-                self._loop = loop_
-                self._queue = queue_
-
-            def write(self, s: str):
-                with self._lock:
-                    self._buf.append(s)
-                    chunk = "".join(self._buf)
-                    if "\n" not in chunk:
-                        return
-                    *lines, rest = chunk.split("\n")
-                    self._buf = [rest] if rest else []
-                for ln in lines:
-                    ln = ln.rstrip("\r")
-                    if ln:
-                        # Schedule into the asyncio loop without creating a coroutine
-                        self._loop.call_soon_threadsafe(self._queue.put_nowait, ln)
-
-            def flush(self):
-                pass
-
-            def flush_leftover(self):
-                with self._lock:
-                    leftover = "".join(self._buf).strip()
-                    self._buf.clear()
-                if leftover:
-                    self._loop.call_soon_threadsafe(self._queue.put_nowait, leftover)
+            # Inside the try, so that a log file SCIP cannot open still ends the log stream
+            model.hideOutput()
+            if log_pipe is not None:
+                log_pipe.attach(model)
 
-        writer = _LineWriter(loop, log_queue)
+            # Apply internal time limit (does not include model build time; kept simple by design)
+            if timeout is not None and timeout > 0:
+                try:
+                    model.setRealParam("limits/time", float(timeout))
+                except Exception:
+                    model.setParam("limits/time", float(timeout))
 
-        try:
-            with redirect_stdout(writer), redirect_stderr(writer):
-                model.optimize()
+            if not self.interrupt_requested:
+                start = time.perf_counter()
+                model.optimizeNogil()
+                seconds = time.perf_counter() - start
+                try:
+                    # SCIP times presolving itself; the rest of the run is the solve proper
+                    presolve = min(model.getPresolvingTime(), seconds)
+                except Exception:
+                    # Timings are informational and must not fail a finished solve
+                    presolve = 0.0
+                record_stage("presolve", presolve, self.timings)
+                record_stage("solve", seconds - presolve, self.timings)
         finally:
-            # Flush last partial line and signal completion
-            try:
-                writer.flush_leftover()
-            except Exception:
-                pass
-            stop_event.set()
-
-    def _parse_log_line(self, line: str, sequence: int) -> Optional[SolverEvent]:
-        """Parses a raw log line from SCIP into a structured SolverEvent."""
-        match = self.metric_regex.match(line)
-        ts = datetime.now(timezone.utc).isoformat()
+            # Closing the log file ends the log stream
+            if log_pipe is not None:
+                log_pipe.detach(model)
+
+    def _parse_log_line(self, line: str, sequence: int) -> Optional[LogEvent]:
+        """Wraps a raw log line from SCIP into a LogEvent. Metrics come from the progress handler."""
+        message = line.strip()
+        if not message:
+            return None
+        return LogEvent(
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            level="info",
+            stage="solver_log",
+            message=message,
+            sequence=sequence,
+        )
 
-        if match:
-            try:
-                # It's a metric line
-                return MetricEvent(
-                    timestamp=ts,
-                    iteration=int(match.group(2)),
-                    objective_value=float(match.group(4)) if match.group(4) != "inf" else float("inf"),
-                    gap=float(match.group(5)) if match.group(5) not in ["-", "inf"] else float("inf"),
-                    sequence=sequence,
-                )
-            except (ValueError, IndexError):
-                # Fallback for parsing errors
-                return LogEvent(timestamp=ts, level="info", stage="log_parsing_error", message=line.strip(), sequence=sequence)
-        elif line.strip():
-            # It's a standard log line
-            return LogEvent(timestamp=ts, level="info", stage="solver_log", message=line.strip(), sequence=sequence)
-        return None
-
-    async def _build_model(self, problem: MIPProblem, timeout: Optional[float] = None) -> Tuple[Model, Dict[str, Any]]:
-        """Builds a pyscipopt.Model instance from a MIPProblem definition."""
+    async def _build_model(self, problem: MIPProblemInput, timeout: Optional[float] = None) -> Tuple[Model, Dict[str, Any]]:
+        """Builds a pyscipopt.Model instance from a MIPProblem or SparseMIPProblem definition."""
+        with timed("build", self.timings):
+            if isinstance(problem, ProblemFile):
+                return self._read_model(problem, timeout=timeout)
+            if isinstance(problem, StoredProblem):
+                return self._read_stored_model(problem, timeout=timeout)
+            return self.compile_model(problem.to_sparse(), timeout=timeout)
+
+    @staticmethod
+    def compile_model(problem: SparseMIPProblem, timeout: Optional[float] = None) -> Tuple[Model, Dict[str, Any]]:
+        """Builds the model of a SparseMIPProblem, synchronously and without recording a build stage."""
         model = Model(problem.parameters.name)
 
         # Simple time limit (solver-side). This does NOT include build time (kept minimal).
         if timeout is not None and timeout > 0:
             model.setParam("limits/time", float(timeout))
 
-        vars: Dict[str, Any] = {}
-        for var_data in problem.variables:
-            vars[var_data.name] = model.addVar(
-                name=var_data.name,
-                lb=var_data.lower_bound,
-                ub=var_data.upper_bound,
-                vtype="C" if var_data.category == "Continuous" else "I",
+        var_list = [
+            model.addVar(name=name, lb=lb, ub=ub, vtype="C" if category == "Continuous" else "I")
+            for name, category, lb, ub in zip(
+                problem.variable_names, problem.categories, problem.lower_bounds, problem.upper_bounds
             )
-
-        for i, const_data in enumerate(problem.constraints):
-            coeffs = {c.name: c.value for c in const_data.coefficients}
-            sense = const_data.sense
-            rhs = -const_data.constant if const_data.constant is not None else 0.0
-            constraint_name = const_data.name or f"unnamed_constraint_{i}"
-
-            expr = sum(coeffs[name] * var for name, var in vars.items() if name in coeffs)
-
+        ]
+        vars: Dict[str, Any] = dict(zip(problem.variable_names, var_list))
+
+        # Coefficients are added straight from the CSR matrix, so the build cost is
+        # proportional to the number of non-zeros rather than variables x constraints.
+        indptr, indices, data = problem.matrix.indptr, problem.matrix.indices, problem.matrix.data
+        constraint_names = problem.constraint_names or [None] * len(problem.senses)
+        for i, (sense, rhs, name) in enumerate(zip(problem.senses, problem.rhs, constraint_names)):
             if sense == 0:  # EQ
-                constraint = expr == rhs
+                lincons = Expr() == rhs
             elif sense == -1:  # LEQ
-                constraint = expr <= rhs
+                lincons = Expr() <= rhs
             else:  # GEQ
-                constraint = expr >= rhs
-            model.addCons(constraint, name=constraint_name)
+                lincons = Expr() >= rhs
+            constraint = model.addCons(lincons, name=name or f"unnamed_constraint_{i}")
+            for k in range(indptr[i], indptr[i + 1]):
+                model.addConsCoeff(constraint, var_list[indices[k]], data[k])
 
-        obj_coeffs = {c.name: c.value for c in problem.objective.coefficients}
-        objective = sum(obj_coeffs[name] * var for name, var in vars.items() if name in obj_coeffs)
-        model.setObjective(objective, "minimize" if problem.parameters.sense == 1 else "maximize")
+        obj_terms = {Term(var): coeff for var, coeff in zip(var_list, problem.objective) if coeff}
+        model.setObjective(Expr(obj_terms), "minimize" if problem.parameters.sense == 1 else "maximize")
 
         # Add SOS constraints
         if problem.sos1:
@@ -283,23 +665,93 @@ class ScipSolverWrapper:
             for key, value in problem.solver_options.items():
                 model.setParam(key, value)
 
+        if problem.objective_cutoff is not None:
+            model.setObjlimit(problem.objective_cutoff)
+
+        _progress_handler(model)
         return model, vars
 
-    def _extract_solution(self, model: Model, problem: MIPProblem, vars: Dict[str, Any]) -> MIPSolution:
+    def _add_warm_start(self, model: Model, problem: MIPProblemInput, vars: Dict[str, Any]) -> Optional[bool]:
+        """
+        Hands the problem's initial values to SCIP as a starting solution.
+
+        A complete assignment is checked against the model and only added if it is feasible.
+        A partial one is added as a partial solution, which SCIP tries to complete during
+        presolving. Returns whether the start was accepted, or None if there was none.
+        """
+        if isinstance(problem, ProblemFile) or problem.initial_values is None:
+            return None
+
+        values = [(vars[name], value) for name, value in zip(problem.variable_names, problem.initial_values)]
+        if all(value is not None for _, value in values):
+            sol = model.createSol()
+            for var, value in values:
+                model.setSolVal(sol, var, value)
+            if not model.checkSol(sol, printreason=False, original=True):
+                model.freeSol(sol)
+                return False
+        else:
+            sol = model.createPartialSol()
+            for var, value in values:
+                if value is not None:
+                    model.setSolVal(sol, var, value)
+        return model.addSol(sol, free=True)
+
+    def _read_model(self, problem: ProblemFile, timeout: Optional[float] = None) -> Tuple[Model, Dict[str, Any]]:
+        """Reads a problem file with SCIP's native readers into a pyscipopt.Model instance."""
+        model = Model()
+        model.hideOutput()  # Silence the reader; the solve output is captured separately
+        try:
+            with _collect_scip_errors() as messages:
+                model.readProblem(problem.path, extension=problem.format)
+        except OSError as e:
+            # The first message names the cause, e.g. "Syntax error in line 1"
+            reason = _ERROR_HEADER.sub("", "".join(messages)).strip().partition("\n")[0] or e
+            raise ProblemFileError(f"SCIP could not read the {problem.format.upper()} file: {reason}") from e
+
+        if problem.sense == "maximize":
+            model.setMaximize()
+        elif problem.sense == "minimize":
+            model.setMinimize()
+
+        if timeout is not None and timeout > 0:
+            model.setParam("limits/time", float(timeout))
+
+        if problem.objective_cutoff is not None:
+            model.setObjlimit(problem.objective_cutoff)
+
+        vars: Dict[str, Any] = {var.name: var for var in model.getVars()}
+        _progress_handler(model)
+        return model, vars
+
+    def _read_stored_model(self, stored: StoredProblem, timeout: Optional[float] = None) -> Tuple[Model, Dict[str, Any]]:
+        """Reads the compiled model of a stored problem and applies the settings that are not part of it."""
+        problem = stored.problem
+        model = Model()
+        model.hideOutput()  # Silence the reader; the solve output is captured separately
+        model.readProblem(stored.path, extension="cip")
+
+        if timeout is not None and timeout > 0:
+            model.setParam("limits/time", float(timeout))
+
+        # Keyed in the problem's order, as if the model had been built from it
+        by_name = {var.name: var for var in model.getVars()}
+        vars: Dict[str, Any] = {name: by_name[name] for name in problem.variable_names}
+
+        if problem.solver_options:
+            for key, value in problem.solver_options.items():
+                model.setParam(key, value)
+
+        if problem.objective_cutoff is not None:
+            model.setObjlimit(problem.objective_cutoff)
+
+        _progress_handler(model)
+        return model, vars
+
+    def _extract_solution(self, model: Model, problem: SparseMIPProblem | ProblemFile, vars: Dict[str, Any]) -> MIPSolution:
         """Extracts the MIPSolution from the solved pyscipopt.Model."""
-        status_map = {
-            "optimal": "optimal",
-            "infeasible": "infeasible",
-            "unbounded": "unbounded",
-            "timelimit": "timeout",
-            "userinterrupt": "timeout",  # Map interrupt to timeout
-            "gaplimit": "gaplimit",
-            "solutionlimit": "solutionlimit",
-            "memorylimit": "memorylimit",
-            "nodelimit": "nodelimit",
-        }
         raw_status = model.getStatus()
-        status = status_map.get(raw_status, "not solved")
+        status = STATUS_MAP.get(raw_status, "not solved")
 
         objective_value = None
         solution_vars: Dict[str, float] = {}
@@ -317,15 +769,12 @@ class ScipSolverWrapper:
                 solution = model.getBestSol()
                 objective_value = model.getObjVal()
 
-            # Variable values
-            for var_name, var in vars.items():
-                try:
-                    solution_vars[var_name] = model.getSolVal(solution, var)
-                except Exception:
-                    pass
+            # Variable values, read once and shared with the slack computation
+            values = _solution_values(solution, list(vars.values()))
+            solution_vars = dict(zip(vars, values.tolist()))
 
             # MIP gap if applicable
-            is_mip = any(v.category != "Continuous" for v in problem.variables)
+            is_mip = self._is_mip(problem, vars)
             if is_mip:
                 try:
                     mip_gap = model.getGap()
@@ -333,42 +782,23 @@ class ScipSolverWrapper:
                     mip_gap = None
 
             # Slacks (named constraints only)
-            for const_data in problem.constraints:
-                if not const_data.name:
-                    continue
-                activity = 0.0
-                for coeff in const_data.coefficients:
-                    if coeff.name in solution_vars:
-                        activity += solution_vars[coeff.name] * coeff.value
-
-                rhs = 1e20
-                lhs = -1e20
-                if const_data.sense == -1:  # LEQ
-                    rhs = -const_data.constant if const_data.constant is not None else 0.0
-                elif const_data.sense == 1:  # GEQ
-                    lhs = -const_data.constant if const_data.constant is not None else 0.0
-                elif const_data.sense == 0:  # EQ
-                    rhs = -const_data.constant if const_data.constant is not None else 0.0
-                    lhs = rhs
-
-                if rhs < 1e20:
-                    slacks[const_data.name] = rhs - activity
-                elif lhs > -1e20:
-                    slacks[const_data.name] = activity - lhs
+            slacks = self._compute_slacks(model, solution, problem, solution_vars, values)
 
             # Duals & reduced costs for LPs
             if not is_mip:
                 try:
-                    for c in model.getConss():
-                        if c.isLinear():
-                            duals[c.name] = model.getDualSolVal(c)
-                    for v_name, v_obj in vars.items():
-                        reduced_costs[v_name] = model.getVarRedcost(v_obj)
+                    duals = {c.name: model.getDualSolVal(c) for c in model.getConss() if c.isLinear()}
+                    reduced_costs = dict(zip(vars, map(model.getVarRedcost, vars.values())))
                 except Exception:
                     pass
 
+        if isinstance(problem, ProblemFile):
+            name = problem.name or model.getProbName()
+        else:
+            name = problem.parameters.name
+
         return MIPSolution(
-            name=problem.parameters.name,
+            name=name,
             status=status,
             objective_value=objective_value,
             variables=solution_vars,
@@ -377,3 +807,57 @@ class ScipSolverWrapper:
             duals=duals or None,
             reduced_costs=reduced_costs or None,
         )
+
+    def _is_mip(self, problem: SparseMIPProblem | ProblemFile, vars: Dict[str, Any]) -> bool:
+        """Returns True if the problem has any integer variables."""
+        if isinstance(problem, ProblemFile):
+            return any(var.vtype() != "CONTINUOUS" for var in vars.values())
+        return not {"Continuous"}.issuperset(problem.categories)
+
+    def _compute_slacks(
+        self,
+        model: Model,
+        solution: Any,
+        problem: SparseMIPProblem | ProblemFile,
+        solution_vars: Dict[str, float],
+        values: Optional[np.ndarray] = None,
+    ) -> Dict[str, float]:
+        """
+        Computes the slack of every named linear constraint at the given solution.
+
+        For a sparse problem, the row activities are one CSR matrix-vector product over
+        `values`, the solution values in `problem.variable_names` order.
+        """
+        slacks: Dict[str, float] = {}
+
+        if isinstance(problem, ProblemFile):
+            # Constraints read from a file carry their sides in the original model
+            for c in model.getConss(False):
+                if not c.isLinear():
+                    continue
+                activity = model.getActivity(c, solution)
+                rhs = model.getRhs(c)
+                lhs = model.getLhs(c)
+                if rhs < 1e20:
+                    slacks[c.name] = rhs - activity
+                elif lhs > -1e20:
+                    slacks[c.name] = activity - lhs
+            return slacks
+
+        if not problem.constraint_names:
+            return slacks
+
+        names = problem.variable_names
+        if values is None or len(values) != len(names):
+            values = np.fromiter((solution_vars.get(name, 0.0) for name in names), dtype=np.float64, count=len(names))
+        indptr = np.asarray(problem.matrix.indptr, dtype=np.int64)
+        indices = np.asarray(problem.matrix.indices, dtype=np.int64)
+        data = np.asarray(problem.matrix.data, dtype=np.float64)
+        senses = np.asarray(problem.senses)
+        rhs = np.asarray(problem.rhs, dtype=np.float64)
+
+        # bincount sums each row's terms in CSR order, like a loop over the row would
+        rows = np.repeat(np.arange(len(senses)), np.diff(indptr))
+        activity = np.bincount(rows, weights=data * values[indices], minlength=len(senses))
+        slack = np.where(senses == 1, activity - rhs, rhs - activity)  # GEQ, otherwise LEQ / EQ
+        return {name: value for name, value in zip(problem.constraint_names, slack.tolist()) if name}
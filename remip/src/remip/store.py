@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .models import SparseMIPProblem, StoredProblem
+from .solvers.scip_wrapper import ScipSolverWrapper
+
+
+def body_hash(body: bytes) -> str:
+    """Returns the address of an uploaded problem: the SHA-256 of its request body."""
+    return hashlib.sha256(body).hexdigest()
+
+
+class ProblemStore:
+    """
+    A content-addressed store of uploaded problems.
+
+    Each problem is kept on disk as its `SparseMIPProblem` JSON and the model SCIP
+    compiled from it, written as CIP, so that a repeat solve skips both the upload and
+    the model build. Once the files exceed `max_bytes`, the least recently used
+    problems are removed. The last `max_memory_entries` problems used are also kept
+    parsed in memory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 10 << 30, max_memory_entries: int = 4):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_memory_entries = max_memory_entries
+        self._memory: OrderedDict[str, SparseMIPProblem] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, hash: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{hash}.{extension}")
+
+    def __contains__(self, hash: str) -> bool:
+        # The JSON file is written last, so it marks a complete entry
+        return os.path.exists(self._path(hash, "json"))
+
+    async def put(self, hash: str, problem: SparseMIPProblem) -> bool:
+        """Compiles and stores a problem. Returns False if it was already stored."""
+        if hash in self:
+            return False
+        await asyncio.to_thread(self._write, hash, problem)
+        self.stores += 1
+        self._remember(hash, problem)
+        for evicted in await asyncio.to_thread(self._evict):
+            self._memory.pop(evicted, None)
+        return True
+
+    async def get(self, hash: str) -> Optional[StoredProblem]:
+        """Returns the stored problem, or None if it is unknown or was evicted."""
+        try:
+            # Touching the files makes them the most recently used
+            os.utime(self._path(hash, "cip"))
+            os.utime(self._path(hash, "json"))
+        except OSError:
+            self._memory.pop(hash, None)
+            self.misses += 1
+            return None
+
+        problem = self._memory.get(hash)
+        if problem is None:
+            try:
+                problem = await asyncio.to_thread(self._read, hash)
+            except OSError:
+                self.misses += 1
+                return None
+        self._remember(hash, problem)
+        self.hits += 1
+        return StoredProblem(hash=hash, path=self._path(hash, "cip"), problem=problem)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit/miss counters and the number and size of the stored problems."""
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "problems": len(entries),
+            "bytes": sum(size for _, size in entries.values()),
+        }
+
+    def _remember(self, hash: str, problem: SparseMIPProblem):
+        self._memory[hash] = problem
+        self._memory.move_to_end(hash)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read(self, hash: str) -> SparseMIPProblem:
+        with open(self._path(hash, "json"), "rb") as f:
+            return SparseMIPProblem.model_validate_json(f.read())
+
+    def _write(self, hash: str, problem: SparseMIPProblem):
+        # Options, cutoff and starting values are applied when the model is read
+        compiled = problem.model_copy(update={"solver_options": None, "objective_cutoff": None, "initial_values": None})
+        model, _ = ScipSolverWrapper.compile_model(compiled)
+        self._replace(hash, "cip", lambda path: model.writeProblem(path, verbose=False))
+        data = problem.model_dump_json().encode("utf-8")
+
+        def write_json(path: str):
+            with open(path, "wb") as f:
+                f.write(data)
+
+        self._replace(hash, "json", write_json)
+
+    def _replace(self, hash: str, extension: str, write):
+        """Writes a file of an entry next to its final path and moves it there, so it never appears partial."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=f".tmp.{extension}")  # SCIP picks its writer by extension
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, self._path(hash, extension))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _entries(self) -> Dict[str, tuple]:
+        """Returns `{hash: (last use, size in bytes)}` of the stored problems."""
+        entries: Dict[str, tuple] = {}
+        for entry in os.scandir(self.directory):
+            hash, _, extension = entry.name.partition(".")
+            if extension not in ("cip", "json"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            last_used, size = entries.get(hash, (0.0, 0))
+            entries[hash] = (max(last_used, stat.st_mtime), size + stat.st_size)
+        return entries
+
+    def _evict(self) -> List[str]:
+        """Removes the least recently used problems until the store fits in `max_bytes`. Returns their hashes."""
+        evicted = []
+        entries = self._entries()
+        total = sum(size for _, size in entries.values())
+        # The most recently used problem is always kept, even if it alone exceeds the limit
+        for hash, (_, size) in sorted(entries.items(), key=lambda item: item[1][0])[:-1]:
+            if total <= self.max_bytes:
+                break
+            for extension in ("json", "cip"):
+                try:
+                    os.unlink(self._path(hash, extension))
+                except OSError:
+                    pass
+            evicted.append(hash)
+            self.evictions += 1
+            total -= size
+        return evicted
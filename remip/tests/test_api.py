@@ -1,6 +1,11 @@
+import gzip
+import io
 import json
+import os
+import tempfile
 from typing import AsyncGenerator, Optional
 
+import pytest
 from fastapi.testclient import TestClient
 
 from remip.main import app, get_solver_service
@@ -10,24 +15,37 @@ from remip.models import (
     MetricEvent,
     MIPProblem,
     MIPSolution,
+    ProblemFile,
     ResultEvent,
     SolverEvent,
+    StreamOptions,
 )
 from remip.services import MIPSolverService
 
 
+def _problem_name(problem_data) -> str:
+    if isinstance(problem_data, ProblemFile):
+        return problem_data.name
+    return problem_data.parameters.name
+
+
 class MockMIPSolverService(MIPSolverService):
+    received = []
+    stream_options = []
+
     async def solve(self, problem_data: MIPProblem, timeout: Optional[float] = None) -> MIPSolution:
+        self.received.append(problem_data)
         return MIPSolution(
-            name=problem_data.parameters.name,
+            name=_problem_name(problem_data),
             status="Optimal",
             objective_value=1.0,
             variables={"x": 1.0},
         )
 
     async def solve_stream(
-        self, problem_data: MIPProblem, timeout: Optional[float] = None
+        self, problem_data: MIPProblem, timeout: Optional[float] = None, options: Optional[StreamOptions] = None
     ) -> AsyncGenerator[SolverEvent, None]:
+        self.stream_options.append(options)
         yield LogEvent(
             type="log",
             timestamp="2025-01-01T00:00:00Z",
@@ -48,7 +66,7 @@ class MockMIPSolverService(MIPSolverService):
             type="result",
             timestamp="2025-01-01T00:00:02Z",
             solution=MIPSolution(
-                name=problem_data.parameters.name,
+                name=_problem_name(problem_data),
                 status="Optimal",
                 objective_value=1.0,
                 variables={"x": 1.0},
@@ -131,6 +149,204 @@ def test_solve_stream_sse():
     assert events[3]["data"]["success"] is True
 
 
+def test_solve_stream_options():
+    problem = {
+        "parameters": {"name": "test_problem", "sense": 1, "status": 0, "sol_status": 0},
+        "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}]},
+        "constraints": [],
+        "variables": [{"name": "x", "lowBound": 0, "upBound": 1, "cat": "Continuous"}],
+    }
+    MockMIPSolverService.stream_options.clear()
+
+    response = client.post("/solve?stream=sse&log=false&metrics_interval=0.25&incumbents=true", json=problem)
+    assert response.status_code == 200
+    assert MockMIPSolverService.stream_options == [StreamOptions(log=False, metrics_interval=0.25, incumbents=True)]
+
+    response = client.post("/solve?stream=sse&metrics_interval=-1", json=problem)
+    assert response.status_code == 422
+
+
+def test_solve_sparse_json():
+    problem = {
+        "parameters": {"name": "sparse_problem", "sense": 1, "status": 0, "sol_status": 0},
+        "variable_names": ["x"],
+        "categories": ["Continuous"],
+        "lower_bounds": [0],
+        "upper_bounds": [1],
+        "objective": [1.0],
+        "senses": [1],
+        "rhs": [0.5],
+        "matrix": {"indptr": [0, 1], "indices": [0], "data": [1.0]},
+    }
+    response = client.post(
+        "/solve",
+        content=json.dumps(problem),
+        headers={"Content-Type": "application/vnd.remip.csr+json"},
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "sparse_problem"
+
+
+def test_solve_sparse_json_invalid():
+    problem = {
+        "parameters": {"name": "sparse_problem", "sense": 1, "status": 0, "sol_status": 0},
+        "variable_names": ["x"],
+        "categories": ["Continuous"],
+        "lower_bounds": [0],
+        "upper_bounds": [1],
+        "objective": [1.0],
+        "senses": [1],
+        "rhs": [0.5],
+        "matrix": {"indptr": [0, 1], "indices": [3], "data": [1.0]},
+    }
+    response = client.post(
+        "/solve",
+        content=json.dumps(problem),
+        headers={"Content-Type": "application/vnd.remip.csr+json"},
+    )
+    assert response.status_code == 422
+
+
+def _npz_body(**arrays) -> bytes:
+    np = pytest.importorskip("numpy")
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        **{
+            "meta": np.array(json.dumps({"parameters": {"name": "npz_problem", "sense": 1, "status": 0, "sol_status": 0}})),
+            "variable_names": np.array(["x", "y"]),
+            "categories": np.array(["Continuous", "Integer"]),
+            "lower_bounds": np.array([0.0, -np.inf]),
+            "upper_bounds": np.array([np.inf, 5.0]),
+            "objective": np.array([1.0, 1.0]),
+            "constraint_names": np.array(["c1"]),
+            "senses": np.array([1]),
+            "rhs": np.array([1.0]),
+            "indptr": np.array([0, 2]),
+            "indices": np.array([0, 1]),
+            "data": np.array([1.0, 1.0]),
+            **arrays,
+        },
+    )
+    return buffer.getvalue()
+
+
+def test_solve_sparse_npz():
+    response = client.post("/solve", content=_npz_body(), headers={"Content-Type": "application/x-npz"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "npz_problem"
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        lambda np: _npz_body()[:200],  # Truncated archive
+        lambda np: b"PK\x03\x04" + b"\x00" * 100,  # Corrupt archive
+        lambda np: _npz_body(meta=np.array("{not json")),
+        lambda np: _npz_body(meta=np.array("[1, 2]")),
+        lambda np: _npz_body(meta=np.array(5)),
+        lambda np: _npz_body(lower_bounds=np.array([["0", "1"]])),
+    ],
+)
+def test_solve_sparse_npz_rejects_invalid_bodies(body):
+    np = pytest.importorskip("numpy")
+    response = client.post("/solve", content=body(np), headers={"Content-Type": "application/x-npz"})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid application/x-npz body")
+
+
+def test_solve_negotiates_msgpack_response():
+    msgpack = pytest.importorskip("msgpack")
+    problem = {
+        "parameters": {"name": "test_problem", "sense": 1, "status": 0, "sol_status": 0},
+        "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}]},
+        "constraints": [],
+        "variables": [{"name": "x", "lowBound": 0, "upBound": 1, "cat": "Continuous"}],
+    }
+    response = client.post("/solve", json=problem, headers={"Accept": "application/msgpack, application/json;q=0.5"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    solution = msgpack.unpackb(response.content)
+    assert solution["name"] == "test_problem"
+    assert solution["variable_names"] == ["x"]
+    assert solution["variables"] == {"dtype": "int8", "data": b"\x01"}
+
+
+def test_solve_gzip_compressed_problem():
+    problem = {
+        "parameters": {"name": "compressed_problem", "sense": 1, "status": 0, "sol_status": 0},
+        "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}]},
+        "constraints": [],
+        "variables": [{"name": "x", "lowBound": 0, "upBound": 1, "cat": "Continuous"}],
+    }
+    response = client.post(
+        "/solve",
+        content=gzip.compress(json.dumps(problem).encode()),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "compressed_problem"
+
+
+def test_solve_unsupported_content_type():
+    response = client.post("/solve", content=b"x", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
+
+
+def test_solve_file_streams_upload_to_temp_file():
+    MockMIPSolverService.received.clear()
+    response = client.post(
+        "/solve/file?format=lp&name=file_problem&sense=maximize",
+        content=b"Maximize\n obj: x\nSubject To\n c1: x <= 1\nEnd\n",
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "file_problem"
+
+    (problem,) = MockMIPSolverService.received
+    assert isinstance(problem, ProblemFile)
+    assert problem.format == "lp"
+    assert problem.sense == "maximize"
+    assert problem.path.endswith(".lp")
+    # The temporary file is removed once the response has been sent
+    assert not os.path.exists(problem.path)
+
+
+def test_solve_file_stream_sse():
+    response = client.post("/solve/file?stream=sse&name=file_problem", content=b"NAME test\nENDATA\n")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: result" in response.text
+
+
+@pytest.mark.parametrize("stream", [None, "sse"])
+@pytest.mark.parametrize(
+    "format, content, readable",
+    [
+        ("mps", b"garbage\n", b"NAME test\nROWS\n N obj\nCOLUMNS\n    x obj 1\nRHS\nBOUNDS\n UP BND x 1\nENDATA\n"),
+        ("lp", b"Maximize\n obj: x +\nSubject @@@\n", b"Maximize\n obj: x\nSubject To\n c1: x <= 1\nEnd\n"),
+    ],
+)
+def test_solve_file_rejects_unreadable_files_and_removes_them(tmp_path, monkeypatch, stream, format, content, readable):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setitem(app.dependency_overrides, get_solver_service, lambda: MIPSolverService())
+    params = {"format": format, **({"stream": stream} if stream else {})}
+
+    response = client.post("/solve/file", params=params, content=content)
+    assert response.status_code == 400
+    assert "could not read" in response.json()["detail"]
+    assert os.listdir(tmp_path) == []
+
+    # A readable file is removed as well, also when its solve is streamed
+    response = client.post("/solve/file", params=params, content=readable)
+    assert response.status_code == 200
+    assert os.listdir(tmp_path) == []
+
+
+def test_solve_file_invalid_format():
+    response = client.post("/solve/file?format=xlsx", content=b"")
+    assert response.status_code == 422
+
+
 def test_solve_non_stream_with_accept_header():
     problem = {
         "parameters": {"name": "test_problem", "sense": 1, "status": 0, "sol_status": 0},
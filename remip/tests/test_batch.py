@@ -0,0 +1,137 @@
+import asyncio
+import json
+from typing import Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from remip.batch import solve_batch
+from remip.main import app
+from remip.models import MIPSolution
+from remip.services import MIPSolverService
+
+
+def _problem(name: str, upper_bound: float) -> dict:
+    return {
+        "parameters": {"name": name, "sense": -1, "status": 0, "sol_status": 0},
+        "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}]},
+        "constraints": [],
+        "variables": [{"name": "x", "lowBound": 0, "upBound": upper_bound, "cat": "Integer"}],
+    }
+
+
+class DelayedSolverService(MIPSolverService):
+    """Solves after a delay given by the problem, tracking how many solves run at once."""
+
+    running = 0
+    max_running = 0
+
+    def __init__(self):
+        self.interrupted = asyncio.Event()
+
+    async def solve(self, problem_data, timeout: Optional[float] = None) -> MIPSolution:
+        cls = DelayedSolverService
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        try:
+            if problem_data == "fail":
+                raise RuntimeError("solver crashed")
+            try:
+                await asyncio.wait_for(self.interrupted.wait(), timeout=problem_data)
+                status = "timeout"
+            except asyncio.TimeoutError:
+                status = "optimal"
+            return MIPSolution(name=str(problem_data), status=status, objective_value=0.0, variables={})
+        finally:
+            cls.running -= 1
+
+    def interrupt_solver(self):
+        self.interrupted.set()
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    DelayedSolverService.running = 0
+    DelayedSolverService.max_running = 0
+
+
+@pytest.mark.asyncio
+async def test_results_arrive_in_completion_order():
+    results = [r async for r in solve_batch([0.3, 0.1, "fail", 0.2], DelayedSolverService, parallelism=4)]
+
+    assert [r.index for r in results] == [2, 1, 3, 0]
+    assert results[0].error == "solver crashed"
+    assert [r.solution.status for r in results[1:]] == ["optimal"] * 3
+
+
+@pytest.mark.asyncio
+async def test_parallelism_is_bounded():
+    results = [r async for r in solve_batch([0.05] * 6, DelayedSolverService, parallelism=2)]
+
+    assert sorted(r.index for r in results) == list(range(6))
+    assert DelayedSolverService.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_time_budget_interrupts_the_batch():
+    results = [r async for r in solve_batch([10.0, 10.0], DelayedSolverService, parallelism=1, time_budget=0.2)]
+
+    assert results[0].index == 0
+    assert results[0].solution.status == "timeout"
+    assert results[1].index == 1
+    assert results[1].solution is None
+    assert "time budget" in results[1].error
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_stops_running_solves():
+    services = []
+
+    def factory():
+        services.append(DelayedSolverService())
+        return services[-1]
+
+    results = solve_batch([0.01, 10.0], factory, parallelism=2)
+    first = await results.__anext__()
+    await results.aclose()
+
+    assert first.index == 0
+    assert services[1].interrupted.is_set()
+
+
+@pytest.fixture
+def client():
+    original_overrides = app.dependency_overrides.copy()
+    app.dependency_overrides.clear()
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides = original_overrides
+
+
+def test_batch_api_streams_ndjson(client):
+    problems = [_problem(f"p{i}", upper_bound=i) for i in range(5)]
+
+    response = client.post("/solve/batch?parallelism=2", json=problems)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(r["index"] for r in results) == list(range(5))
+    for r in results:
+        assert r["solution"]["name"] == f"p{r['index']}"
+        assert r["solution"]["objective_value"] == pytest.approx(r["index"])
+
+
+def test_batch_api_streams_sse(client):
+    response = client.post("/solve/batch?stream=sse", json=[_problem("a", 1), _problem("b", 2)])
+
+    assert response.status_code == 200
+    assert response.text.count("event: batch_result") == 2
+    assert response.text.rstrip().endswith('data: {"type":"end","success":true}')
+
+
+def test_batch_api_rejects_invalid_problems(client):
+    assert client.post("/solve/batch", json=[_problem("a", 1), {"parameters": {}}]).status_code == 422
+    assert client.post("/solve/batch", json=_problem("a", 1)).status_code == 422
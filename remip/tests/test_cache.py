@@ -0,0 +1,148 @@
+import os
+import time
+from typing import Optional
+
+import pytest
+
+from remip.cache import SolutionCache, problem_key
+from remip.models import EndEvent, MIPProblem, MIPSolution, ResultEvent
+from remip.services import MIPSolverService
+
+PROBLEM = {
+    "parameters": {"name": "cache_problem", "sense": 1, "status": 0, "sol_status": 0},
+    "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}, {"name": "y", "value": 2.0}]},
+    "constraints": [
+        {
+            "name": "c1",
+            "sense": 1,
+            "pi": None,
+            "constant": -1.0,
+            "coefficients": [{"name": "x", "value": 1.0}, {"name": "y", "value": 1.0}],
+        }
+    ],
+    "variables": [
+        {"name": "x", "lowBound": 0, "upBound": None, "cat": "Continuous"},
+        {"name": "y", "lowBound": 0, "upBound": None, "cat": "Integer"},
+    ],
+}
+
+
+def _solution(status: str = "optimal", name: str = "cache_problem") -> MIPSolution:
+    return MIPSolution(name=name, status=status, objective_value=1.0, variables={"x": 1.0, "y": 0.0})
+
+
+class CountingSolver:
+    """Fake solver that counts how often it is actually called."""
+
+    def __init__(self, status: str = "optimal"):
+        self.status = status
+        self.calls = 0
+
+    async def solve(self, problem, timeout: Optional[float] = None) -> MIPSolution:
+        self.calls += 1
+        return _solution(self.status)
+
+    async def solve_and_stream_events(self, problem, timeout: Optional[float] = None, options=None):
+        self.calls += 1
+        yield ResultEvent(timestamp="t", solution=_solution(self.status), runtime_milliseconds=5, sequence=1)
+        yield EndEvent(success=True)
+
+    def interrupt_solver(self):
+        pass
+
+
+def test_problem_key_is_canonical():
+    problem = MIPProblem.model_validate(PROBLEM)
+    key = problem_key(problem)
+
+    assert problem_key(problem.to_sparse()) == key
+    # The status PuLP reports from a previous solve does not change the problem
+    assert problem_key(MIPProblem.model_validate({**PROBLEM, "parameters": {**PROBLEM["parameters"], "status": 1}})) == key
+    assert problem_key(problem, timeout=10) != key
+    # Neither does a warm start, while a cutoff can change the outcome
+    warm = MIPProblem.model_validate(PROBLEM)
+    warm.variables[0].value = 1.0
+    assert problem_key(warm) == key
+    assert problem_key(MIPProblem.model_validate({**PROBLEM, "objective_cutoff": 0.5})) != key
+    assert problem_key(MIPProblem.model_validate({**PROBLEM, "solver_options": {"limits/gap": 0.1}})) != key
+
+
+@pytest.mark.asyncio
+async def test_only_definitive_solutions_are_cached():
+    cache = SolutionCache()
+
+    assert await cache.put("a", _solution("timelimit")) is False
+    assert await cache.get("a") is None
+    assert await cache.put("b", _solution("infeasible")) is True
+    assert (await cache.get("b")).status == "infeasible"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_spills_to_disk_and_promotes_back(tmp_path):
+    cache = SolutionCache(max_entries=1, directory=str(tmp_path))
+
+    await cache.put("a", _solution(name="a"))
+    await cache.put("b", _solution(name="b"))
+    assert os.listdir(tmp_path) == ["a.json"]
+
+    assert (await cache.get("a")).name == "a"
+    assert cache.stats()["disk_hits"] == 1
+    # "a" is back in memory, so "b" was spilled in its place
+    assert os.listdir(tmp_path) == ["b.json"]
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(tmp_path, monkeypatch):
+    cache = SolutionCache(max_entries=1, ttl=60, directory=str(tmp_path))
+    await cache.put("a", _solution())
+    await cache.put("b", _solution())
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert await cache.get("a") is None
+    assert await cache.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_service_serves_repeated_solves_from_cache():
+    solver = CountingSolver()
+    service = MIPSolverService(solver=solver, cache=SolutionCache())
+    problem = MIPProblem.model_validate(PROBLEM)
+
+    first = await service.solve(problem)
+    second = await service.solve(problem.to_sparse())
+    assert first == second
+    assert solver.calls == 1
+
+    events = [event async for event in service.solve_stream(problem)]
+    assert [type(e) for e in events] == [ResultEvent, EndEvent]
+    assert events[0].solution == first
+    assert solver.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_do_not_report_the_warm_start_of_another_request():
+    service = MIPSolverService(cache=SolutionCache())
+    warm = {**PROBLEM, "variables": [{**v, "value": 1.0} for v in PROBLEM["variables"]]}
+
+    first = await service.solve(MIPProblem.model_validate(warm))
+    assert first.warm_start_accepted is True
+    second = await service.solve(MIPProblem.model_validate(PROBLEM))
+    assert second.warm_start_accepted is None
+    assert second.variables == first.variables
+
+    events = [event async for event in service.solve_stream(MIPProblem.model_validate(PROBLEM))]
+    assert events[0].solution.warm_start_accepted is None
+
+
+@pytest.mark.asyncio
+async def test_service_does_not_cache_timeouts():
+    solver = CountingSolver(status="timelimit")
+    service = MIPSolverService(solver=solver, cache=SolutionCache())
+    problem = MIPProblem.model_validate(PROBLEM)
+
+    [event async for event in service.solve_stream(problem)]
+    await service.solve(problem)
+    assert solver.calls == 2
@@ -0,0 +1,164 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from remip.compression import CompressionMiddleware, negotiate_encoding
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.post("/echo")
+async def echo(request: Request):
+    return {"body": (await request.body()).decode(), "headers": dict(request.headers)}
+
+
+@app.get("/text")
+async def text(size: int):
+    return {"text": "x" * size}
+
+
+@app.get("/events")
+async def events():
+    async def generate():
+        for i in range(3):
+            yield f"event: log\ndata: {json.dumps({'sequence': i})}\n\n"
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("x-gzip", "gzip"),
+        ("gzip;q=0.5, zstd", "zstd"),
+        ("gzip, zstd;q=0.5", "gzip"),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "gzip"),
+        ("br", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    pytest.importorskip("zstandard")
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_negotiate_encoding_without_zstandard(monkeypatch):
+    monkeypatch.setattr("remip.compression._zstandard", lambda: None)
+    assert negotiate_encoding("zstd, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("zstd") is None
+
+
+def test_gzip_request_body():
+    body = json.dumps({"numbers": list(range(1000))})
+    response = client.post(
+        "/echo",
+        content=gzip.compress(body.encode()),
+        headers={"Content-Encoding": "gzip", "Accept-Encoding": "identity"},
+    )
+    assert response.status_code == 200
+    assert response.json()["body"] == body
+    # The endpoint sees an uncompressed request
+    assert "content-encoding" not in response.json()["headers"]
+
+
+def test_zstd_request_body():
+    zstandard = pytest.importorskip("zstandard")
+    body = "x" * 100_000
+    response = client.post(
+        "/echo", content=zstandard.ZstdCompressor().compress(body.encode()), headers={"Content-Encoding": "zstd"}
+    )
+    assert response.status_code == 200
+    assert response.json()["body"] == body
+
+
+def test_invalid_request_bodies():
+    response = client.post("/echo", content=b"plain", headers={"Content-Encoding": "br"})
+    assert response.status_code == 415
+
+    response = client.post("/echo", content=b"not gzip", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+
+    response = client.post("/echo", content=gzip.compress(b"x" * 1000)[:-20], headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+    assert "Truncated" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_request_bodies_that_expand_past_the_limit(encoding):
+    if encoding == "zstd":
+        compress = pytest.importorskip("zstandard").ZstdCompressor().compress
+    else:
+        compress = gzip.compress
+    limited = FastAPI()
+    limited.add_middleware(CompressionMiddleware, max_decompressed_size=1 << 20)
+    limited.add_api_route("/echo", echo, methods=["POST"])
+
+    # A few kilobytes that would expand to 64 MiB
+    body = compress(bytes(64 << 20))
+    assert len(body) < 100_000
+    response = TestClient(limited).post("/echo", content=body, headers={"Content-Encoding": encoding})
+    assert response.status_code == 413
+
+    response = TestClient(limited).post("/echo", content=compress(b"x" * (1 << 20)), headers={"Content-Encoding": encoding})
+    assert response.status_code == 200
+    assert len(response.json()["body"]) == 1 << 20
+
+
+def test_response_compression():
+    response = client.get("/text?size=10000", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < 1000
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == {"text": "x" * 10000}
+
+    # Small bodies are not worth compressing
+    response = client.get("/text?size=10", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/text?size=10000", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_sse_events_are_flushed_one_by_one():
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # The client stays connected
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/events",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    await app(scope, receive, send)
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # Every chunk decodes to a whole event without waiting for the rest of the stream
+    decompressor = zlib.decompressobj(31)
+    decoded = [decompressor.decompress(message["body"]).decode() for message in messages[1:]]
+    assert decoded == [f"event: log\ndata: {json.dumps({'sequence': i})}\n\n" for i in range(3)] + [""]
+    assert decompressor.eof
@@ -0,0 +1,87 @@
+import math
+import struct
+
+import pytest
+
+from remip.encoders import (
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    encode_arrow,
+    encode_msgpack,
+    negotiate_solution_media_type,
+)
+from remip.models import MIPSolution
+
+msgpack = pytest.importorskip("msgpack")
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def lp_solution():
+    return MIPSolution(
+        name="lp",
+        status="optimal",
+        objective_value=2.5,
+        variables={"x": 0.5, "y": 2.0},
+        slacks={"c1": 0.0},
+        duals={"c1": -1.0, "c2": 0.25},
+        reduced_costs={"x": 0.0, "y": 1.5},
+    )
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, JSON_MEDIA_TYPE),
+        ("*/*", JSON_MEDIA_TYPE),
+        ("application/msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/x-msgpack, application/json;q=0.5", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack;q=0.4, application/json;q=0.5", JSON_MEDIA_TYPE),
+        (f"{ARROW_MEDIA_TYPE}, application/msgpack", ARROW_MEDIA_TYPE),
+        ("text/html", JSON_MEDIA_TYPE),
+    ],
+)
+def test_negotiate_solution_media_type(accept, expected):
+    assert negotiate_solution_media_type(accept) == expected
+
+
+def test_encode_msgpack(lp_solution):
+    document = msgpack.unpackb(encode_msgpack(lp_solution))
+
+    assert document["name"] == "lp" and document["objective_value"] == 2.5
+    assert document["variable_names"] == ["x", "y"]
+    assert document["variables"] == {"dtype": "float64", "data": struct.pack("<2d", 0.5, 2.0)}
+    assert document["reduced_costs"]["data"] == struct.pack("<2d", 0.0, 1.5)
+    # Constraint names are listed once; slacks are missing for c2
+    assert document["constraint_names"] == ["c1", "c2"]
+    slacks = struct.unpack("<2d", document["slacks"]["data"])
+    assert slacks[0] == 0.0 and math.isnan(slacks[1])
+    assert struct.unpack("<2d", document["duals"]["data"]) == (-1.0, 0.25)
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [([0.0, 1.0, 1.0], "int8"), ([0.0, 300.0], "int16"), ([-1e6, 2.0], "int32"), ([1.0, 0.5], "float64")],
+)
+def test_encode_msgpack_integral_values(values, dtype):
+    solution = MIPSolution(
+        name="mip", status="optimal", objective_value=1.0, variables={f"x{i}": v for i, v in enumerate(values)}
+    )
+    document = msgpack.unpackb(encode_msgpack(solution))
+
+    assert document["variables"]["dtype"] == dtype
+    assert document["reduced_costs"] is None and document["constraint_names"] == []
+
+
+def test_encode_arrow(lp_solution):
+    table = pa.ipc.open_stream(encode_arrow(lp_solution)).read_all()
+
+    assert table.num_rows == 1
+    columns = {name: table.column(name)[0].as_py() for name in table.column_names}
+    assert columns["variable_names"] == ["x", "y"]
+    assert columns["variables"] == [0.5, 2.0]
+    assert columns["reduced_costs"] == [0.0, 1.5]
+    assert columns["constraint_names"] == ["c1", "c2"]
+    assert columns["duals"] == [-1.0, 0.25]
+    assert table.schema.metadata[b"remip.solution"].startswith(b'{"name":"lp","status":"optimal"')
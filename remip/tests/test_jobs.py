@@ -0,0 +1,230 @@
+import asyncio
+import http.server
+import json
+import threading
+import time
+from typing import Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from remip.jobs import JobManager
+from remip.main import app
+from remip.models import MIPProblem, MIPSolution
+from remip.services import MIPSolverService
+
+SIMPLE_PROBLEM = {
+    "parameters": {"name": "job_problem", "sense": 1, "status": 0, "sol_status": 0},
+    "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}]},
+    "constraints": [],
+    "variables": [{"name": "x", "lowBound": 0, "upBound": 1, "cat": "Continuous"}],
+}
+
+
+class BlockingSolverService(MIPSolverService):
+    """Solves instantly once released, recording the order in which solves start."""
+
+    def __init__(self, name: str, started: list, release: Optional[asyncio.Event] = None, fail: bool = False):
+        self.name = name
+        self.started = started
+        self.release = release
+        self.fail = fail
+        self.interrupted = False
+
+    async def solve(self, problem_data, timeout: Optional[float] = None) -> MIPSolution:
+        self.started.append(self.name)
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise RuntimeError("solver crashed")
+        return MIPSolution(name=self.name, status="optimal", objective_value=0.0, variables={})
+
+    def interrupt_solver(self):
+        self.interrupted = True
+        if self.release is not None:
+            self.release.set()
+
+
+async def _wait_until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def problem():
+    return MIPProblem(**SIMPLE_PROBLEM)
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_by_priority_class(problem):
+    manager = JobManager(num_workers=1)
+    started = []
+    release = asyncio.Event()
+    try:
+        blocker = manager.submit(problem, BlockingSolverService("blocker", started, release))
+        await _wait_until(lambda: started == ["blocker"])
+        batch = manager.submit(problem, BlockingSolverService("batch", started), priority="batch")
+        normal = manager.submit(problem, BlockingSolverService("normal", started))
+        interactive = manager.submit(problem, BlockingSolverService("interactive", started), priority="interactive")
+        assert manager.queued == 3
+
+        release.set()
+        await _wait_until(lambda: manager.get(batch.id).status == "completed")
+
+        assert started == ["blocker", "interactive", "normal", "batch"]
+        for job in (blocker, normal, interactive):
+            assert manager.get(job.id).status == "completed"
+            assert manager.get(job.id).solution.status == "optimal"
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_and_running_jobs(problem):
+    manager = JobManager(num_workers=1)
+    started = []
+    running_service = BlockingSolverService("running", started, asyncio.Event())
+    try:
+        running = manager.submit(problem, running_service)
+        queued = manager.submit(problem, BlockingSolverService("queued", started))
+        await _wait_until(lambda: started == ["running"])
+
+        assert manager.cancel(queued.id).status == "cancelled"
+        assert manager.cancel(running.id).status == "cancelled"
+        assert running_service.interrupted
+
+        await _wait_until(lambda: manager.get(running.id).finished_at is not None)
+        assert manager.get(running.id).status == "cancelled"
+        assert manager.get(running.id).solution is not None
+        await asyncio.sleep(0.05)
+        assert started == ["running"]
+        assert manager.cancel("unknown") is None
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_reports_error(problem):
+    manager = JobManager(num_workers=1)
+    try:
+        job = manager.submit(problem, BlockingSolverService("failing", [], fail=True))
+        await _wait_until(lambda: manager.get(job.id).finished_at is not None)
+        assert manager.get(job.id).status == "failed"
+        assert manager.get(job.id).error == "solver crashed"
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_evicted(problem):
+    manager = JobManager(num_workers=1, max_finished_jobs=2)
+    try:
+        jobs = [manager.submit(problem, BlockingSolverService(str(i), [])) for i in range(3)]
+        await _wait_until(lambda: manager.get(jobs[-1].id).status == "completed")
+        assert manager.get(jobs[0].id) is None
+        assert manager.get(jobs[1].id) is not None
+    finally:
+        await manager.stop()
+
+
+def test_jobs_api_with_real_solver():
+    original_overrides = app.dependency_overrides.copy()
+    app.dependency_overrides.clear()
+    try:
+        with TestClient(app) as client:
+            response = client.post("/jobs?priority=interactive", json=SIMPLE_PROBLEM)
+            assert response.status_code == 202
+            job = response.json()
+            assert job["status"] in ("queued", "running", "completed")
+            assert job["priority"] == "interactive"
+
+            deadline = time.monotonic() + 10
+            while job["status"] not in ("completed", "failed"):
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+                job = client.get(f"/jobs/{job['id']}").json()
+
+            assert job["status"] == "completed"
+            assert job["solution"]["status"] == "optimal"
+            assert job["solution"]["objective_value"] == pytest.approx(0.0)
+
+            assert client.get("/jobs/unknown").status_code == 404
+            assert client.delete("/jobs/unknown").status_code == 404
+    finally:
+        app.dependency_overrides = original_overrides
+
+
+@pytest.mark.asyncio
+async def test_webhook_receives_finished_job(problem, monkeypatch):
+    posted = []
+
+    class _Response:
+        def close(self):
+            pass
+
+    def fake_open(request, timeout):
+        posted.append((request.full_url, json.loads(request.data)))
+        return _Response()
+
+    monkeypatch.setattr("remip.jobs._webhook_opener.open", fake_open)
+    manager = JobManager(num_workers=1)
+    try:
+        job = manager.submit(problem, BlockingSolverService("hooked", []), webhook_url="http://hooks.example/done")
+        await _wait_until(lambda: len(posted) == 1)
+        url, payload = posted[0]
+        assert url == "http://hooks.example/done"
+        assert payload["id"] == job.id
+        assert payload["status"] == "completed"
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.parametrize("url", ["file:///tmp/job.json", "ftp://hooks.example/done", "not a url"])
+def test_jobs_api_rejects_webhooks_that_are_not_http(url):
+    original_overrides = app.dependency_overrides.copy()
+    app.dependency_overrides.clear()
+    try:
+        with TestClient(app) as client:
+            response = client.post("/jobs", params={"webhook_url": url}, json=SIMPLE_PROBLEM)
+            assert response.status_code == 422
+    finally:
+        app.dependency_overrides = original_overrides
+
+
+@pytest.mark.asyncio
+async def test_webhook_does_not_follow_redirects(problem):
+    requested = []
+
+    class _Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            requested.append(self.path)
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(303)
+            self.send_header("Location", "/elsewhere")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            requested.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    manager = JobManager(num_workers=1)
+    try:
+        manager.submit(problem, BlockingSolverService("hooked", []), webhook_url=f"http://127.0.0.1:{server.server_port}/done")
+        await _wait_until(lambda: len(requested) == 1)
+        await asyncio.gather(*list(manager._notifications))
+        assert requested == ["/done"]
+    finally:
+        await manager.stop()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,106 @@
+import json
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from remip.main import app
+from remip.metrics import STAGES, Counter, Gauge, Histogram, Registry
+
+PROBLEM = {
+    "parameters": {"name": "metrics_problem", "sense": 1, "status": 0, "sol_status": 0},
+    "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}]},
+    "constraints": [{"name": "c1", "sense": 1, "coefficients": [{"name": "x", "value": 1.0}], "constant": -1.0}],
+    "variables": [{"name": "x", "lowBound": 0, "upBound": 10, "cat": "Integer"}],
+}
+
+
+def _samples(text: str) -> dict:
+    """Parses the exposition format into `{'name{labels}': value}`."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_registry_renders_prometheus_text_format():
+    registry = Registry()
+    counter = Counter("requests_total", "Requests.", ["status"], registry=registry)
+    gauge = Gauge("queue_length", "Queue length.", registry=registry)
+    histogram = Histogram("duration_seconds", "Durations.", ["stage"], buckets=[0.1, 1], registry=registry)
+
+    counter.labels('a "quoted"\nvalue').inc(2)
+    gauge.set_function(lambda: 3)
+    histogram.labels("build").observe(0.05)
+    histogram.labels("build").observe(0.5)
+    histogram.labels("build").observe(5)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="a \\"quoted\\"\\nvalue"} 2' in text
+    assert "queue_length 3" in text
+    assert text.splitlines()[-5:] == [
+        'duration_seconds_bucket{stage="build",le="0.1"} 1',
+        'duration_seconds_bucket{stage="build",le="1"} 2',
+        'duration_seconds_bucket{stage="build",le="+Inf"} 3',
+        'duration_seconds_sum{stage="build"} 5.55',
+        'duration_seconds_count{stage="build"} 3',
+    ]
+    with pytest.raises(ValueError):
+        Counter("requests_total", "Again.", registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels()
+
+
+@pytest.fixture
+def client():
+    original_overrides = app.dependency_overrides.copy()
+    app.dependency_overrides.clear()
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides = original_overrides
+
+
+def test_metrics_cover_every_stage_of_a_solve(client):
+    before = _samples(client.get("/metrics").text)
+    response = client.post("/solve", json=PROBLEM)
+    assert response.json()["status"] == "optimal"
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = _samples(response.text)
+
+    for stage in STAGES:
+        key = f'remip_solve_stage_seconds_count{{stage="{stage}"}}'
+        assert after[key] == before[key] + 1
+    assert after['remip_solves_total{status="optimal"}'] == before['remip_solves_total{status="optimal"}'] + 1
+    assert after["remip_active_solves"] == 0
+    assert after["remip_queued_solves"] == 0
+    assert "remip_event_loop_lag_seconds" in after
+    assert not any(re.search(r"\bNaN\b", line) for line in response.text.splitlines())
+
+    # A streamed result is serialized as an SSE event, and the subscriber is gone once the stream ends
+    response = client.post("/solve", json=PROBLEM, params={"stream": "sse"})
+    assert "event: result" in response.text
+    streamed = _samples(client.get("/metrics").text)
+    key = 'remip_solve_stage_seconds_count{stage="serialize"}'
+    assert streamed[key] == after[key] + 1
+    assert streamed['remip_solves_total{status="optimal"}'] == after['remip_solves_total{status="optimal"}'] + 1
+    assert streamed["remip_sse_subscribers"] == 0
+
+
+def test_solution_reports_the_phases_of_its_request(client):
+    response = client.post("/solve", json=PROBLEM)
+    phases = dict(entry.split(";dur=") for entry in response.headers["server-timing"].split(", "))
+    assert list(phases) == list(STAGES)
+    assert all(float(duration) >= 0 for duration in phases.values())
+    # The body cannot include its own encoding
+    assert list(response.json()["timings_milliseconds"]) == list(STAGES[:-1])
+
+    response = client.post("/solve", json=PROBLEM, params={"stream": "sse"})
+    assert response.headers["server-timing"].startswith("validate;dur=")
+    result = next(line for line in response.text.splitlines() if line.startswith("data:") and '"result"' in line)
+    assert list(json.loads(result[len("data:") :])["solution"]["timings_milliseconds"]) == list(STAGES[:-1])
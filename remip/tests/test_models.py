@@ -1,7 +1,9 @@
+from array import array
+
 import pytest
 from pydantic import ValidationError
 
-from remip.models import MIPProblem, MIPSolution
+from remip.models import MIPProblem, MIPSolution, SparseMIPProblem
 
 
 def test_mip_problem_valid():
@@ -50,3 +52,116 @@ def test_mip_solution_with_enhancements():
     # Test deserialization
     deserialized_solution = MIPSolution(**serialized_solution)
     assert deserialized_solution.mip_gap == 0.001
+
+
+def _sparse_data():
+    return {
+        "parameters": {"name": "sparse_problem", "sense": 1, "status": 0, "sol_status": 0},
+        "variable_names": ["x", "y"],
+        "categories": ["Continuous", "Integer"],
+        "lower_bounds": [0, 0],
+        "upper_bounds": [None, 10],
+        "objective": [1.0, 2.0],
+        "constraint_names": ["c1", None],
+        "senses": [-1, 1],
+        "rhs": [4.0, 1.0],
+        "matrix": {"indptr": [0, 2, 3], "indices": [0, 1, 1], "data": [1.0, 1.0, 1.0]},
+    }
+
+
+def test_sparse_mip_problem_valid():
+    problem = SparseMIPProblem(**_sparse_data())
+    assert problem.variable_names == ["x", "y"]
+    assert problem.matrix.indptr == [0, 2, 3]
+    assert problem.to_sparse() is problem
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("categories", ["Continuous"]),
+        ("rhs", [4.0]),
+        ("senses", [-1, 2]),
+        ("matrix", {"indptr": [0, 2], "indices": [0, 1], "data": [1.0, 1.0]}),
+        ("matrix", {"indptr": [0, 2, 1], "indices": [0, 1], "data": [1.0, 1.0]}),
+        ("matrix", {"indptr": [0, 2, 3], "indices": [0, 1, 2], "data": [1.0, 1.0, 1.0]}),
+        ("matrix", {"indptr": [0, 2, 3], "indices": [0, 1, 1], "data": [1.0, 1.0]}),
+    ],
+)
+def test_sparse_mip_problem_invalid_shapes(field, value):
+    data = _sparse_data()
+    data[field] = value
+    with pytest.raises(ValidationError):
+        SparseMIPProblem(**data)
+
+
+def test_mip_problem_to_sparse():
+    problem = MIPProblem(
+        **{
+            "parameters": {"name": "test_problem", "sense": 1, "status": 0, "sol_status": 0},
+            "objective": {"name": "objective", "coefficients": [{"name": "y", "value": 3.0}]},
+            "constraints": [
+                {
+                    "name": "c1",
+                    "sense": -1,
+                    "coefficients": [
+                        {"name": "y", "value": 1.0},
+                        {"name": "x", "value": 2.0},
+                        {"name": "unknown", "value": 5.0},
+                        {"name": "y", "value": 4.0},
+                    ],
+                    "constant": -3.0,
+                },
+                {"sense": 0, "coefficients": [{"name": "x", "value": 1.0}]},
+            ],
+            "variables": [
+                {"name": "x", "lowBound": 0, "upBound": 1, "cat": "Continuous"},
+                {"name": "y", "lowBound": None, "upBound": None, "cat": "Integer"},
+            ],
+        }
+    )
+
+    sparse = problem.to_sparse()
+
+    assert sparse.variable_names == ["x", "y"]
+    assert sparse.categories == ["Continuous", "Integer"]
+    assert sparse.lower_bounds == [0, None]
+    assert sparse.upper_bounds == [1, None]
+    assert list(sparse.objective) == [0.0, 3.0]
+    assert sparse.constraint_names == ["c1", None]
+    assert sparse.senses == [-1, 0]
+    assert list(sparse.rhs) == [3.0, 0.0]
+    assert list(sparse.matrix.indptr) == [0, 2, 3]
+    assert list(sparse.matrix.indices) == [1, 0, 0]
+    assert list(sparse.matrix.data) == [4.0, 2.0, 1.0]
+    # The numeric columns are typed arrays, but serialize as lists
+    assert isinstance(sparse.matrix.data, array)
+    assert sparse.model_dump()["matrix"]["data"] == [4.0, 2.0, 1.0]
+    assert sparse.initial_values is None
+    # The converted problem is valid under the public schema as well
+    SparseMIPProblem.model_validate(sparse.model_dump())
+
+
+def test_mip_problem_to_sparse_keeps_warm_start():
+    problem = MIPProblem(
+        **{
+            "parameters": {"name": "test_problem", "sense": 1, "status": 1, "sol_status": 1},
+            "objective": {"name": "objective", "coefficients": [{"name": "x", "value": 1.0}]},
+            "constraints": [],
+            "variables": [
+                {"name": "x", "lowBound": 0, "upBound": 1, "cat": "Continuous", "varValue": 1.0},
+                {"name": "y", "lowBound": 0, "upBound": 1, "cat": "Integer", "varValue": None},
+            ],
+            "objective_cutoff": 10.0,
+        }
+    )
+
+    sparse = problem.to_sparse()
+
+    assert sparse.initial_values == [1.0, None]
+    assert sparse.objective_cutoff == 10.0
+
+
+def test_sparse_mip_problem_invalid_initial_values():
+    with pytest.raises(ValidationError):
+        SparseMIPProblem(**{**_sparse_data(), "initial_values": [1.0]})
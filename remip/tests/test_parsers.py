@@ -0,0 +1,114 @@
+import copy
+import json
+from array import array
+
+import pytest
+from pydantic import ValidationError
+
+from remip.models import MIPProblem
+from remip.parsers import _problem_from_document, parse_problem_batch_json, parse_problem_json
+
+PROBLEM = {
+    "parameters": {"name": "test_problem", "sense": 1, "status": 0, "sol_status": 0},
+    "objective": {"name": "objective", "coefficients": [{"name": "y", "value": 3}, {"name": "y", "value": 2.5}]},
+    "constraints": [
+        {
+            "name": "c1",
+            "sense": -1,
+            "coefficients": [
+                {"name": "y", "value": 1.0},
+                {"name": "x", "value": 2},
+                {"name": "unknown", "value": 5.0},
+                {"name": "y", "value": 4.0},
+            ],
+            "constant": -3,
+            "pi": None,
+        },
+        {"sense": 0, "coefficients": [{"name": "x", "value": 1.0}]},
+    ],
+    "variables": [
+        {"name": "x", "lowBound": 0, "upBound": 1, "cat": "Continuous", "varValue": 1, "dj": None},
+        {"name": "y", "lowBound": None, "upBound": None, "cat": "Integer"},
+    ],
+    "sos1": [{"x": 1, "y": 2}],
+    "solver_options": {"limits/gap": 0.1},
+    "objective_cutoff": 10,
+    "extra": "ignored",
+}
+
+
+def _patched(path, value):
+    document = copy.deepcopy(PROBLEM)
+    target = document
+    for key in path[:-1]:
+        target = target[key]
+    if value is ...:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+    return json.dumps(document).encode()
+
+
+def _expected(body: bytes) -> dict:
+    return MIPProblem.model_validate_json(body).to_sparse().model_dump()
+
+
+def test_fast_path_matches_pydantic():
+    body = json.dumps(PROBLEM).encode()
+    sparse = _problem_from_document(json.loads(body))
+
+    assert sparse.model_dump() == _expected(body)
+    assert isinstance(sparse.matrix.data, array)
+    assert list(sparse.matrix.data) == [4.0, 2.0, 1.0]
+    assert sparse.initial_values == [1.0, None]
+
+
+@pytest.mark.parametrize(
+    "path, value",
+    [
+        # Values pydantic coerces, which the fast path hands over to it
+        (("parameters", "sense"), "1"),
+        (("variables", 0, "lowBound"), "0.5"),
+        (("constraints", 0, "sense"), -1.0),
+        (("constraints", 0, "coefficients", 0, "value"), True),
+        (("variables", 1, "category"), "Continuous"),
+    ],
+)
+def test_coerced_values_match_pydantic(path, value):
+    body = _patched(path, value)
+    assert parse_problem_json(body).model_dump() == _expected(body)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not json",
+        b"[]",
+        _patched(("parameters",), ...),
+        _patched(("variables", 0, "cat"), ...),
+        _patched(("variables", 0, "name"), 1),
+        _patched(("variables", 0, "lowBound"), "low"),
+        _patched(("constraints", 0, "sense"), 0.5),
+        _patched(("constraints", 1, "coefficients"), None),
+        _patched(("constraints", 1, "coefficients", 0), ["x", 1.0]),
+        _patched(("objective", "coefficients", 0, "value"), ...),
+        _patched(("sos1",), [1]),
+        _patched(("solver_options",), []),
+        _patched(("objective_cutoff",), "none"),
+    ],
+)
+def test_validation_errors_match_pydantic(body):
+    with pytest.raises(ValidationError) as expected:
+        MIPProblem.model_validate_json(body)
+    with pytest.raises(ValidationError) as actual:
+        parse_problem_json(body)
+    assert actual.value.errors() == expected.value.errors()
+
+
+def test_batch_fast_path_matches_pydantic():
+    body = json.dumps([PROBLEM, PROBLEM]).encode()
+    assert [p.model_dump() for p in parse_problem_batch_json(body)] == [_expected(json.dumps(PROBLEM).encode())] * 2
+
+    with pytest.raises(ValidationError) as actual:
+        parse_problem_batch_json(json.dumps([PROBLEM, {}]).encode())
+    assert actual.value.errors()[0]["loc"][0] == 1
@@ -0,0 +1,156 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import threading
+import time
+
+import pytest
+import pytest_asyncio
+
+from remip.models import (
+    Constraint,
+    EndEvent,
+    LogEvent,
+    MIPProblem,
+    Objective,
+    ObjectiveCoefficient,
+    Parameters,
+    ResultEvent,
+    Variable,
+)
+from remip.services import MIPSolverService
+from remip.solvers.process_pool import SolverProcessPool, _Worker
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="solver worker mode requires POSIX signals")
+
+
+@pytest.fixture
+def simple_problem():
+    return MIPProblem(
+        parameters=Parameters(name="pool_problem", sense=-1, status=0, sol_status=0),
+        objective=Objective(
+            name="obj",
+            coefficients=[ObjectiveCoefficient(name="x", value=1.0), ObjectiveCoefficient(name="y", value=2.0)],
+        ),
+        constraints=[
+            Constraint(
+                name="c1",
+                sense=-1,
+                coefficients=[ObjectiveCoefficient(name="x", value=1.0), ObjectiveCoefficient(name="y", value=1.0)],
+                constant=-2.0,
+            )
+        ],
+        variables=[
+            Variable(name="x", lower_bound=0, upper_bound=None, category="Integer"),
+            Variable(name="y", lower_bound=0, upper_bound=1, category="Continuous"),
+        ],
+    )
+
+
+@pytest.fixture
+def hard_problem():
+    """A market split instance, which takes SCIP far longer than the tests wait."""
+    rng = random.Random(0)
+    num_vars, num_rows = 40, 5
+    rows = [[rng.randint(0, 99) for _ in range(num_vars)] for _ in range(num_rows)]
+    return MIPProblem(
+        parameters=Parameters(name="market_split", sense=1, status=0, sol_status=0),
+        objective=Objective(name="obj", coefficients=[]),
+        constraints=[
+            Constraint(
+                name=f"split_{i}",
+                sense=0,
+                coefficients=[ObjectiveCoefficient(name=f"x_{j}", value=a) for j, a in enumerate(row)],
+                constant=-(sum(row) // 2),
+            )
+            for i, row in enumerate(rows)
+        ],
+        variables=[Variable(name=f"x_{j}", lower_bound=0, upper_bound=1, category="Integer") for j in range(num_vars)],
+    )
+
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = SolverProcessPool(num_workers=2, pin_cpus=True)
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_solves_in_worker_process(pool, simple_problem):
+    solver = pool.solver()
+    solution = await MIPSolverService(solver=solver).solve(simple_problem)
+
+    assert solution.status == "optimal"
+    assert solution.objective_value == pytest.approx(3.0)
+    assert solution.variables == pytest.approx({"x": 1.0, "y": 1.0})
+    # The worker reports the time of each stage back to the server process
+    assert set(solver.timings) == {"build", "presolve", "solve", "extract"}
+
+
+@pytest.mark.asyncio
+async def test_pool_streams_events(pool, simple_problem):
+    service = MIPSolverService(solver=pool.solver())
+    events = [event async for event in service.solve_stream(simple_problem)]
+
+    assert isinstance(events[0], LogEvent)
+    assert isinstance(events[-2], ResultEvent)
+    assert events[-2].solution.objective_value == pytest.approx(3.0)
+    assert isinstance(events[-1], EndEvent)
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_solves_concurrently(pool, simple_problem):
+    solutions = await asyncio.gather(*(pool.solver().solve(simple_problem) for _ in range(4)))
+    assert [s.status for s in solutions] == ["optimal"] * 4
+
+
+@pytest.mark.asyncio
+async def test_pool_interrupts_worker(pool, hard_problem):
+    solver = pool.solver()
+    task = asyncio.create_task(solver.solve(hard_problem))
+    await asyncio.sleep(1.0)
+    start = time.monotonic()
+    solver.interrupt_solver()
+
+    solution = await asyncio.wait_for(task, timeout=10)
+    assert solution.status == "timeout"
+    assert time.monotonic() - start < 10
+
+
+@pytest.mark.asyncio
+async def test_pool_replaces_crashed_worker(pool, hard_problem, simple_problem):
+    solver = pool.solver()
+    task = asyncio.create_task(solver.solve(hard_problem))
+    await asyncio.sleep(1.0)
+    os.kill(solver.worker.process.pid, signal.SIGKILL)
+
+    with pytest.raises(RuntimeError, match="died"):
+        await asyncio.wait_for(task, timeout=10)
+
+    # The pool keeps serving requests with a fresh worker
+    solutions = await asyncio.gather(*(pool.solver().solve(simple_problem) for _ in range(2)))
+    assert [s.status for s in solutions] == ["optimal"] * 2
+
+
+@pytest.mark.asyncio
+async def test_worker_receives_large_messages_across_cancelled_reads():
+    worker = _Worker.__new__(_Worker)  # Only its end of the pipe, without a process
+    worker.conn, other = multiprocessing.Pipe()
+    worker._received = bytearray()
+    messages = [("solution", list(range(500_000))), ("done", None)]
+    sender = threading.Thread(target=lambda: [other.send(message) for message in messages])
+    sender.start()
+
+    received = []
+    while len(received) < len(messages):
+        try:
+            # Readers that give up mid-message leave what they read to the next one
+            received.append(await asyncio.wait_for(worker.recv(), timeout=0.001))
+        except asyncio.TimeoutError:
+            pass
+    sender.join()
+    assert received == messages
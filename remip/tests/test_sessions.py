@@ -0,0 +1,114 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from remip.main import app
+from remip.models import MIPProblem, ModelDelta
+from remip.sessions import SessionManager
+
+PROBLEM = {
+    "parameters": {"name": "session_problem", "sense": 1, "status": 0, "sol_status": 0},
+    "objective": {
+        "name": "objective",
+        "coefficients": [{"name": "x", "value": 1.0}, {"name": "y", "value": 2.0}, {"name": "z", "value": 3.0}],
+    },
+    "constraints": [
+        {
+            "name": "demand",
+            "sense": 1,
+            "coefficients": [{"name": "x", "value": 1.0}, {"name": "y", "value": 1.0}, {"name": "z", "value": 1.0}],
+            "constant": -5.0,
+        }
+    ],
+    "variables": [{"name": name, "lowBound": 0, "upBound": 10, "cat": "Integer"} for name in "xyz"],
+}
+
+
+@pytest.fixture
+def client():
+    original_overrides = app.dependency_overrides.copy()
+    app.dependency_overrides.clear()
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides = original_overrides
+
+
+def test_session_resolves_with_deltas(client):
+    response = client.post("/sessions", json=PROBLEM)
+    assert response.status_code == 201
+    session = response.json()
+    assert session["num_variables"] == 3
+    assert session["num_constraints"] == 1
+
+    solution = client.post(f"/sessions/{session['id']}/solve").json()
+    assert solution["status"] == "optimal"
+    assert solution["variables"] == {"x": 5.0, "y": 0.0, "z": 0.0}
+
+    solution = client.post(f"/sessions/{session['id']}/solve", json={"upper_bounds": {"x": 2}}).json()
+    assert solution["variables"] == {"x": 2.0, "y": 3.0, "z": 0.0}
+
+    # Changes accumulate over the solves of a session
+    solution = client.post(f"/sessions/{session['id']}/solve", json={"objective": {"z": 0.5}, "rhs": {"demand": 6}}).json()
+    assert solution["variables"] == {"x": 0.0, "y": 0.0, "z": 6.0}
+    assert solution["objective_value"] == pytest.approx(3.0)
+    assert solution["slacks"] == {"demand": pytest.approx(0.0)}
+
+    assert client.get(f"/sessions/{session['id']}").json()["solves"] == 3
+    assert client.delete(f"/sessions/{session['id']}").status_code == 204
+    assert client.get(f"/sessions/{session['id']}").status_code == 404
+
+
+def test_session_streams_events(client):
+    session = client.post("/sessions", json=PROBLEM).json()
+
+    response = client.post(f"/sessions/{session['id']}/solve?stream=sse", json={"lower_bounds": {"z": 1}})
+
+    assert response.status_code == 200
+    assert "event: result" in response.text
+    assert '"z":1.0' in response.text
+
+
+def test_session_rejects_invalid_deltas(client):
+    session = client.post("/sessions", json=PROBLEM).json()
+    assert client.post(f"/sessions/{session['id']}/solve", json={"objective": {"w": 1}}).status_code == 422
+    assert client.post(f"/sessions/{session['id']}/solve", json={"rhs": {"supply": 1}}).status_code == 422
+
+    session = client.post("/sessions?reoptimize=true", json=PROBLEM).json()
+    assert client.post(f"/sessions/{session['id']}/solve", json={"upper_bounds": {"x": 1}}).status_code == 422
+
+    assert client.post("/sessions/unknown/solve").status_code == 404
+    assert client.delete("/sessions/unknown").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_reoptimized_session_follows_objective_changes():
+    sessions = SessionManager()
+    session = await sessions.create(MIPProblem.model_validate(PROBLEM), reoptimize=True)
+    entry = sessions.get(session.id)
+
+    assert (await entry.solve(None)).variables == {"x": 5.0, "y": 0.0, "z": 0.0}
+    solution = await entry.solve(ModelDelta(objective={"x": 3.0, "z": 1.0}))
+    assert solution.variables == {"x": 0.0, "y": 0.0, "z": 5.0}
+    assert solution.objective_value == pytest.approx(5.0)
+
+
+@pytest.mark.asyncio
+async def test_session_manager_evicts_idle_sessions(monkeypatch):
+    sessions = SessionManager(idle_ttl=60, max_sessions=2)
+    problem = MIPProblem.model_validate(PROBLEM)
+    first = await sessions.create(problem)
+    second = await sessions.create(problem)
+
+    # The least recently used session makes room for a new one
+    sessions.get(first.id)
+    third = await sessions.create(problem)
+    assert sessions.get(second.id) is None
+    assert sessions.get(first.id) is not None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert sessions.get(first.id) is None
+    assert sessions.get(third.id) is None
@@ -1,16 +1,26 @@
+import asyncio
+import random
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 from remip.models import (
     Constraint,
+    IncumbentEvent,
+    LogEvent,
+    MetricEvent,
     MIPProblem,
     Objective,
     ObjectiveCoefficient,
     Parameters,
+    ProblemFile,
+    ResultEvent,
+    SparseMIPProblem,
+    StreamOptions,
     Variable,
 )
-from remip.solvers.scip_wrapper import ScipSolverWrapper
+from remip.solvers.scip_wrapper import ProblemFileError, ScipSolverWrapper, _LogPipe
 
 
 @pytest.fixture
@@ -125,6 +135,7 @@ async def test_solve(MockModel, solver_wrapper, sample_problem):
     mock_model_instance.getStatus.return_value = "optimal"
     mock_model_instance.getObjVal.return_value = 1.0
     mock_model_instance.getNSols.return_value = 1
+    mock_model_instance.getPresolvingTime.return_value = 0.0
     mock_model_instance.getNBinVars.return_value = 0
     mock_model_instance.getNIntVars.return_value = 0
     mock_model_instance.getConss.return_value = []
@@ -136,16 +147,18 @@ async def test_solve(MockModel, solver_wrapper, sample_problem):
     assert solution.status == "optimal"
     assert solution.objective_value == 1.0
     assert solution.variables["x"] == 1.0
-    mock_model_instance.optimize.assert_called_once()
+    mock_model_instance.optimizeNogil.assert_called_once()
 
 
 @patch("remip.solvers.scip_wrapper.Model")
 @pytest.mark.asyncio
+@pytest.mark.filterwarnings("error::pytest.PytestUnhandledThreadExceptionWarning")
 async def test_solve_and_stream_events_optimizes_model(MockModel, solver_wrapper, sample_problem):
     # Arrange
     mock_model_instance = MagicMock()
     MockModel.return_value = mock_model_instance
     mock_model_instance.getNSols.return_value = 0  # Avoid TypeError
+    mock_model_instance.getPresolvingTime.return_value = 0.0
     mock_model_instance.getStatus.return_value = "not solved"  # Avoid ValidationError
     mock_model_instance.getNBinVars.return_value = 0
     mock_model_instance.getNIntVars.return_value = 0
@@ -157,8 +170,24 @@ async def test_solve_and_stream_events_optimizes_model(MockModel, solver_wrapper
         pass
 
     # Assert
-    # In the new implementation, optimize is called instead of setMessagehdlr
-    mock_model_instance.optimize.assert_called_once()
+    # SCIP solves without holding the GIL, logging into a per-model pipe
+    mock_model_instance.optimizeNogil.assert_called_once()
+    mock_model_instance.setLogfile.assert_called_with(None)
+
+
+@patch("remip.solvers.scip_wrapper.Model")
+@pytest.mark.asyncio
+async def test_stream_ends_with_the_error_of_a_log_file_scip_cannot_open(MockModel, solver_wrapper, sample_problem):
+    mock_model_instance = MagicMock()
+    MockModel.return_value = mock_model_instance
+    mock_model_instance.setLogfile.side_effect = OSError("cannot open /dev/fd/99")
+
+    async def consume():
+        return [event async for event in solver_wrapper.solve_and_stream_events(sample_problem)]
+
+    with pytest.raises(OSError, match="cannot open"):
+        await asyncio.wait_for(consume(), timeout=5)
+    mock_model_instance.optimizeNogil.assert_not_called()
 
 
 @patch("remip.solvers.scip_wrapper.Model")
@@ -277,3 +306,312 @@ async def test_solve_mip_problem(solver_wrapper, mip_problem):
 
     assert solution.duals is None
     assert solution.reduced_costs is None
+
+
+@pytest.mark.asyncio
+async def test_build_model_adds_sparse_coefficients(solver_wrapper, lp_problem):
+    lp_problem.constraints.append(
+        Constraint(
+            name="c3",
+            sense=1,
+            coefficients=[
+                ObjectiveCoefficient(name="x", value=1.0),
+                ObjectiveCoefficient(name="unknown", value=5.0),
+                ObjectiveCoefficient(name="x", value=3.0),  # later duplicates win
+            ],
+            constant=None,
+        )
+    )
+
+    model, vars = await solver_wrapper._build_model(lp_problem)
+
+    conss = {c.name: c for c in model.getConss()}
+    assert model.getValsLinear(conss["c1"]) == {"x": -1.0, "y": 1.0}
+    assert model.getRhs(conss["c1"]) == pytest.approx(1.0)
+    assert model.getValsLinear(conss["c2"]) == {"x": 1.0, "y": 1.0}
+    assert model.getRhs(conss["c2"]) == pytest.approx(2.0)
+    assert model.getValsLinear(conss["c3"]) == {"x": 3.0}
+    assert model.getLhs(conss["c3"]) == pytest.approx(0.0)
+    assert model.getObjectiveSense() == "maximize"
+    assert vars["x"].getObj() == pytest.approx(1.0)
+    assert vars["y"].getObj() == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_solve_sparse_problem_matches_mip_problem(solver_wrapper, mip_problem):
+    expected = await solver_wrapper.solve(mip_problem)
+    solution = await solver_wrapper.solve(SparseMIPProblem.model_validate(mip_problem.to_sparse().model_dump()))
+
+    assert solution.status == expected.status
+    assert solution.objective_value == pytest.approx(expected.objective_value)
+    assert solution.variables == pytest.approx(expected.variables)
+    assert solution.slacks == pytest.approx(expected.slacks)
+
+
+def test_compute_slacks_matches_row_activities(solver_wrapper):
+    rng = random.Random(0)
+    names = [f"x{j}" for j in range(20)]
+    constraints = [
+        Constraint(
+            name=f"c{i}" if i % 4 else None,
+            sense=rng.choice([-1, 0, 1]),
+            coefficients=[ObjectiveCoefficient(name=name, value=rng.uniform(-5, 5)) for name in rng.sample(names, i % 6)],
+            constant=rng.uniform(-5, 5),
+        )
+        for i in range(30)
+    ]
+    problem = MIPProblem(
+        parameters=Parameters(name="slacks", sense=1, status=0, sol_status=0),
+        objective=Objective(name="obj", coefficients=[]),
+        constraints=constraints,
+        variables=[Variable(name=name, lower_bound=0, upper_bound=1, category="Continuous") for name in names],
+    ).to_sparse()
+    solution_vars = {name: rng.uniform(0, 1) for name in names[:15]}  # the rest default to 0
+
+    expected = {}
+    for c in constraints:
+        if c.name:
+            activity = sum(coef.value * solution_vars.get(coef.name, 0.0) for coef in c.coefficients)
+            expected[c.name] = activity + c.constant if c.sense == 1 else -c.constant - activity
+
+    assert solver_wrapper._compute_slacks(None, None, problem, solution_vars) == pytest.approx(expected)
+    values = np.array([solution_vars.get(name, 0.0) for name in names])
+    assert solver_wrapper._compute_slacks(None, None, problem, solution_vars, values) == pytest.approx(expected)
+
+
+@pytest.mark.asyncio
+async def test_solve_without_warm_start(solver_wrapper, mip_problem):
+    solution = await solver_wrapper.solve(mip_problem)
+
+    assert solution.warm_start_accepted is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "values, accepted",
+    [
+        ({"x": 1.0, "y": 1.0}, True),  # the optimum
+        ({"x": 0.0, "y": 0.0}, True),  # feasible but worse
+        ({"x": 5.0, "y": 5.0}, False),  # violates c2
+        ({"x": 1.0}, True),  # partial, completed by SCIP
+    ],
+)
+async def test_solve_with_warm_start(solver_wrapper, mip_problem, values, accepted):
+    for var in mip_problem.variables:
+        var.value = values.get(var.name)
+
+    solution = await solver_wrapper.solve(mip_problem)
+
+    assert solution.warm_start_accepted is accepted
+    assert solution.status == "optimal"
+    assert solution.objective_value == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_solve_with_objective_cutoff(solver_wrapper, mip_problem):
+    mip_problem.objective_cutoff = 2.5
+    solution = await solver_wrapper.solve(mip_problem)
+    assert solution.status == "optimal"
+    assert solution.objective_value == pytest.approx(3.0)
+
+    # Nothing beats the optimum of a maximization problem
+    mip_problem.objective_cutoff = 3.5
+    solution = await solver_wrapper.solve(mip_problem)
+    assert solution.status == "infeasible"
+
+
+MPS_PROBLEM = """NAME          mps_problem
+ROWS
+ N  OBJ
+ L  c1
+ L  c2
+COLUMNS
+    MARKER                 'MARKER'                 'INTORG'
+    x         OBJ       -1.0   c1        -1.0
+    x         c2         1.0
+    MARKER                 'MARKER'                 'INTEND'
+    y         OBJ       -2.0   c1         1.0
+    y         c2         1.0
+RHS
+    RHS       c1         1.0   c2         2.0
+ENDATA
+"""
+
+
+@pytest.mark.asyncio
+async def test_solve_problem_file(solver_wrapper, tmp_path):
+    path = tmp_path / "problem.mps"
+    path.write_text(MPS_PROBLEM)
+
+    solution = await solver_wrapper.solve(ProblemFile(path=str(path), format="mps"))
+
+    # Same model as the mip_problem fixture, minimizing the negated objective
+    assert solution.name == "mps_problem"
+    assert solution.status == "optimal"
+    assert solution.objective_value == pytest.approx(-3.0)
+    assert solution.variables["x"] == pytest.approx(1.0)
+    assert solution.variables["y"] == pytest.approx(1.0)
+    assert solution.mip_gap == pytest.approx(0.0)
+    assert solution.slacks["c1"] == pytest.approx(1.0)
+    assert solution.slacks["c2"] == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_solve_problem_file_with_sense_override(solver_wrapper, tmp_path):
+    path = tmp_path / "problem.lp"
+    path.write_text("Minimize\n obj: x + 2 y\nSubject To\n c1: - x + y <= 1\n c2: x + y <= 2\nEnd\n")
+
+    solution = await solver_wrapper.solve(ProblemFile(path=str(path), format="lp", name="lp_file", sense="maximize"))
+
+    assert solution.name == "lp_file"
+    assert solution.objective_value == pytest.approx(3.5)
+    assert solution.mip_gap is None
+    assert solution.slacks == pytest.approx({"c1": 0.0, "c2": 0.0})
+
+
+def _bound_problem(name: str, lower_bound: float) -> MIPProblem:
+    return MIPProblem(
+        parameters=Parameters(name=name, sense=1, status=0, sol_status=0),
+        objective=Objective(name="obj", coefficients=[ObjectiveCoefficient(name="x", value=1.0)]),
+        constraints=[],
+        variables=[Variable(name="x", lower_bound=lower_bound, upper_bound=100, category="Integer")],
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_solves_capture_their_own_logs(capfd):
+    async def primal_bounds(problem):
+        return [
+            event.message
+            async for event in ScipSolverWrapper().solve_and_stream_events(problem)
+            if isinstance(event, LogEvent) and event.message.startswith("Primal Bound")
+        ]
+
+    logs = await asyncio.gather(*(primal_bounds(_bound_problem(f"p{i}", lower_bound=i)) for i in range(1, 9)))
+
+    for i, lines in enumerate(logs, start=1):
+        assert len(lines) == 1
+        assert f"{float(i):.14e}" in lines[0]
+    # Nothing is written to the process' stdout/stderr
+    out, err = capfd.readouterr()
+    assert out == "" and err == ""
+
+
+@pytest.mark.asyncio
+async def test_unreadable_file_reports_scip_errors_without_printing_them(tmp_path, capfd):
+    path = tmp_path / "garbage.mps"
+    path.write_bytes(b"garbage\n")
+
+    with pytest.raises(ProblemFileError, match="could not read the MPS file: Syntax error in line 1$"):
+        await ScipSolverWrapper().solve(ProblemFile(path=str(path), format="mps"))
+    out, err = capfd.readouterr()
+    assert out == "" and err == ""
+
+
+@pytest.mark.asyncio
+async def test_log_pipe_splits_chunks_into_lines():
+    class FakeModel:
+        def setLogfile(self, path):
+            if path is None:
+                self.file.close()
+            else:
+                self.file = open(path, "wb", buffering=0)
+
+    queue = asyncio.Queue()
+    pipe = _LogPipe(asyncio.get_running_loop(), queue)
+    model = FakeModel()
+
+    pipe.attach(model)
+    for chunk in (b"first ", b"line\nsecond", b" line\r\n\n", b"third", b" line"):
+        model.file.write(chunk)
+        await asyncio.sleep(0.01)
+    pipe.detach(model)
+
+    lines = []
+    while (line := await asyncio.wait_for(queue.get(), timeout=5)) is not None:
+        lines.append(line)
+    assert lines == ["first line", "second line", "third line"]
+    assert pipe.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_metrics_come_from_solver_statistics(solver_wrapper, mip_problem):
+    options = StreamOptions(log=False, metrics_interval=0)
+    events = [event async for event in solver_wrapper.solve_and_stream_events(mip_problem, options=options)]
+
+    # Only the start message remains of the log
+    assert [event.stage for event in events if isinstance(event, LogEvent)] == ["start"]
+    metrics = [event for event in events if isinstance(event, MetricEvent)]
+    assert {"best_solution", "progress"} <= {metric.trigger for metric in metrics}
+    assert [event.sequence for event in events[:-1]] == list(range(1, len(events)))
+
+    result = next(event for event in events if isinstance(event, ResultEvent))
+    best = [metric for metric in metrics if metric.trigger == "best_solution"][-1]
+    # Exact bounds, not the rounded columns of the log table
+    assert best.objective_value == result.solution.objective_value
+    assert best.dual_bound >= best.objective_value
+    assert best.nodes >= 0 and best.iteration >= 0 and best.elapsed_seconds >= 0
+
+
+@pytest.mark.asyncio
+async def test_stream_metrics_cadence(solver_wrapper, mip_problem):
+    options = StreamOptions(metrics_interval=None)
+    events = [event async for event in solver_wrapper.solve_and_stream_events(mip_problem, options=options)]
+
+    assert {event.trigger for event in events if isinstance(event, MetricEvent)} == {"best_solution"}
+    assert any(isinstance(event, LogEvent) and event.stage == "solver_log" for event in events)
+
+
+def _knapsack_problem(num_items: int = 30) -> SparseMIPProblem:
+    """A multi-dimensional knapsack on which SCIP finds several improving solutions."""
+    rng = random.Random(1)
+    num_rows = 15
+    return SparseMIPProblem(
+        parameters=Parameters(name="knapsack", sense=-1, status=0, sol_status=0),
+        variable_names=[f"x_{j}" for j in range(num_items)],
+        categories=["Integer"] * num_items,
+        lower_bounds=[0] * num_items,
+        upper_bounds=[1] * num_items,
+        objective=[rng.randint(1, 30) for _ in range(num_items)],
+        senses=[-1] * num_rows,
+        rhs=[60] * num_rows,
+        matrix={
+            "indptr": [i * num_items for i in range(num_rows + 1)],
+            "indices": list(range(num_items)) * num_rows,
+            "data": [rng.randint(1, 20) for _ in range(num_items * num_rows)],
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_incumbents_as_deltas(solver_wrapper):
+    options = StreamOptions(log=False, metrics_interval=None, incumbents=True)
+    events = [event async for event in solver_wrapper.solve_and_stream_events(_knapsack_problem(), options=options)]
+
+    incumbents = [event for event in events if isinstance(event, IncumbentEvent)]
+    assert len(incumbents) > 1
+    # Each incumbent follows the metric of the same solution
+    best_solutions = [event for event in events if isinstance(event, MetricEvent) and event.trigger == "best_solution"]
+    assert [i.objective_value for i in incumbents] == [m.objective_value for m in best_solutions]
+
+    values = dict.fromkeys(_knapsack_problem().variable_names, 0.0)
+    for incumbent in incumbents:
+        assert all(values[name] != value for name, value in incumbent.variables.items())
+        values.update(incumbent.variables)
+    result = next(event for event in events if isinstance(event, ResultEvent))
+    assert values == result.solution.variables
+    assert incumbents[-1].objective_value == result.solution.objective_value
+
+
+@pytest.mark.asyncio
+async def test_solve_skips_log_capture_and_events(solver_wrapper, mip_problem):
+    with (
+        patch("remip.solvers.scip_wrapper._LogPipe") as log_pipe,
+        patch.object(ScipSolverWrapper, "_parse_log_line") as parse_log_line,
+    ):
+        solution = await solver_wrapper.solve(mip_problem)
+
+    assert solution.status == "optimal"
+    assert solution.objective_value == pytest.approx(3.0)
+    log_pipe.assert_not_called()
+    parse_log_line.assert_not_called()
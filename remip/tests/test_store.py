@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from remip.main import app, get_problem_store
+from remip.metrics import SOLVE_STAGE_SECONDS
+from remip.models import MIPProblem
+from remip.solvers.scip_wrapper import ScipSolverWrapper
+from remip.store import ProblemStore, body_hash
+
+PROBLEM = {
+    "parameters": {"name": "stored_problem", "sense": 1, "status": 0, "sol_status": 0},
+    "objective": {
+        "name": "objective",
+        "coefficients": [{"name": "x", "value": 1.0}, {"name": "y", "value": 2.0}, {"name": "z", "value": 3.0}],
+    },
+    "constraints": [
+        {
+            "name": "demand",
+            "sense": 1,
+            "coefficients": [{"name": "x", "value": 1.0}, {"name": "y", "value": 1.0}, {"name": "z", "value": 1.0}],
+            "constant": -5.0,
+        },
+        {"name": "x_cap", "sense": -1, "coefficients": [{"name": "x", "value": 1.0}], "constant": -2.0},
+    ],
+    "variables": [{"name": name, "lowBound": 0, "upBound": 10, "cat": "Integer"} for name in "xyz"],
+}
+
+
+def _problem(**changes) -> MIPProblem:
+    return MIPProblem.model_validate({**PROBLEM, **changes})
+
+
+def _untimed(solution) -> dict:
+    return solution.model_dump(exclude={"timings_milliseconds"})
+
+
+@pytest.mark.asyncio
+async def test_stored_problem_solves_like_the_uploaded_one(tmp_path):
+    store = ProblemStore(str(tmp_path))
+    problem = _problem(objective_cutoff=100.0).to_sparse()
+    builds = SOLVE_STAGE_SECONDS.labels("build")
+    built = sum(builds.counts)
+
+    assert await store.put("a" * 64, problem)
+    assert not await store.put("a" * 64, problem)
+    # Compiling a stored model is not part of any solve
+    assert sum(builds.counts) == built
+    assert sorted(os.listdir(tmp_path)) == ["a" * 64 + ".cip", "a" * 64 + ".json"]
+
+    stored = await store.get("a" * 64)
+    assert stored.problem.model_dump() == problem.model_dump()
+    expected = _untimed(await ScipSolverWrapper().solve(problem))
+    assert _untimed(await ScipSolverWrapper().solve(stored)) == expected
+    assert expected["variables"] == {"x": 2.0, "y": 3.0, "z": 0.0}
+
+    # Entries are read back from disk once they have left the memory tier
+    reopened = ProblemStore(str(tmp_path))
+    stored = await reopened.get("a" * 64)
+    assert stored.problem.model_dump() == problem.model_dump()
+    assert _untimed(await ScipSolverWrapper().solve(stored)) == expected
+    assert await reopened.get("b" * 64) is None
+    assert reopened.stats()["hits"] == 1 and reopened.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_store_evicts_least_recently_used_problems(tmp_path):
+    store = ProblemStore(str(tmp_path), max_bytes=0, max_memory_entries=1)
+    first, second = "1" * 64, "2" * 64
+
+    await store.put(first, _problem().to_sparse())
+    assert first in store
+    await store.put(second, _problem(parameters={**PROBLEM["parameters"], "name": "other"}).to_sparse())
+
+    # The newest problem is kept even if it alone exceeds the limit
+    assert first not in store and second in store
+    assert await store.get(first) is None
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["problems"] == 1
+
+
+@pytest.fixture
+def client(tmp_path):
+    original_overrides = app.dependency_overrides.copy()
+    app.dependency_overrides.clear()
+    store = ProblemStore(str(tmp_path))
+    app.dependency_overrides[get_problem_store] = lambda: store
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides = original_overrides
+
+
+def test_problem_api_uploads_once_and_solves(client):
+    body = json.dumps(PROBLEM).encode()
+    hash = body_hash(body)
+    headers = {"Content-Type": "application/json"}
+
+    assert client.head(f"/problems/{hash}").status_code == 404
+    assert client.post(f"/problems/{hash}/solve").status_code == 404
+    assert client.put(f"/problems/{'0' * 64}", content=body, headers=headers).status_code == 400
+    assert client.put(f"/problems/{hash}", content=body, headers=headers).status_code == 201
+    assert client.put(f"/problems/{hash}", content=body, headers=headers).status_code == 200
+    assert client.head(f"/problems/{hash}").status_code == 200
+
+    solution = client.post(f"/problems/{hash}/solve", params={"timeout": 10}).json()
+    assert solution["status"] == "optimal"
+    assert solution["variables"] == {"x": 2.0, "y": 3.0, "z": 0.0}
+    assert solution["slacks"] == {"demand": pytest.approx(0.0), "x_cap": pytest.approx(0.0)}
+
+    # Solver options can be changed per solve
+    solution = client.post(f"/problems/{hash}/solve", json={"solver_options": {"limits/solutions": 1}}).json()
+    assert solution["status"] in ("optimal", "solutionlimit")
+
+    response = client.post(f"/problems/{hash}/solve", params={"stream": "sse"})
+    assert "event: result" in response.text
+
+    assert client.get("/problems/stats").json()["stores"] == 1
+    assert client.head("/problems/not-a-hash").status_code == 422